@@ -0,0 +1,286 @@
+"""
+Benchmarks of the simulate / control / log loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench --output benchmarks/results.json
+    python -m benchmarks.bench --compare benchmarks/baseline.json --threshold 0.2
+
+Every benchmark reports the median and minimum time per call over several
+repeats. Benchmarks with a size parameter (episode length, batch size) are
+run for every size of their scaling curve. In comparison mode the exit
+status is 1 if any benchmark got slower than the baseline by more than the
+threshold.
+"""
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import tempfile
+import time
+from unittest import mock
+import numpy as np
+
+BENCHMARKS = {}
+
+
+def benchmark(name, sizes=(None,)):
+    """
+    Register a benchmark. The decorated function receives the size and
+    returns the callable to be timed.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, sizes)
+        return setup
+    return register
+
+
+def _crane():
+    from src.model.Crane1D import Crane1D
+    return Crane1D()
+
+
+def _lqr(crane, **options):
+    from src.algorithm.LQR import LQR
+    return LQR(crane.A.copy(), crane.B.copy(), np.eye(6), np.eye(2), **options)
+
+
+@benchmark('simulate_step_lsim')
+def bench_simulate_step_lsim(size):
+    crane = _crane()
+    return lambda: crane.simulate([0.1, 0.0], dt=0.01)
+
+
+@benchmark('simulate_step_zoh')
+def bench_simulate_step_zoh(size):
+    crane = _crane()
+    crane.set_backend('zoh')
+    return lambda: crane.simulate([0.1, 0.0], dt=0.01)
+
+
+@benchmark('model_step')
+def bench_model_step(size):
+    crane = _crane()
+    u = np.array([0.1, 0.0])
+    out = np.empty(6)
+    return lambda: crane.step(u, 0.01, out=out)
+
+
+@benchmark('simulate_trajectory', sizes=(100, 1000, 10000))
+def bench_simulate_trajectory(size):
+    crane = _crane()
+    t = np.linspace(0, size * 0.01, size)
+
+    def run():
+        crane.init_state(crane._init_state)
+        crane.simulate([0.1, 0.0], t=t)
+    return run
+
+
+@benchmark('simulate_trajectory_block', sizes=(1000, 100000, 1000000))
+def bench_simulate_trajectory_block(size):
+    crane = _crane()
+    u = np.random.default_rng(0).uniform(-1, 1, (size, 2))
+
+    def run():
+        crane.init_state(crane._init_state)
+        crane.simulate_trajectory(u, 0.01)
+    return run
+
+
+@benchmark('simulate_batch', sizes=(1, 16, 256))
+def bench_simulate_batch(size):
+    crane = _crane()
+    states = np.tile(crane.state, (size, 1))
+    u = np.zeros((size, 100, 2))
+    return lambda: crane.simulate_batch(states, u, 0.01)
+
+
+@benchmark('update_matrices')
+def bench_update_matrices(size):
+    crane = _crane()
+    lengths = itertools.cycle(np.linspace(0.2, 0.9, 100))
+    return lambda: crane.update_matrices(sling_length=next(lengths))
+
+
+@benchmark('evaluate_matrices_batch', sizes=(16, 256, 4096))
+def bench_evaluate_matrices_batch(size):
+    crane = _crane()
+    lengths = np.linspace(0.2, 0.9, size)
+    return lambda: crane.evaluate_matrices(l=lengths)
+
+
+@benchmark('lqr_compute_gains_cold')
+def bench_lqr_compute_gains_cold(size):
+    lqr = _lqr(_crane(), cache_size=0, warm_start_tol=0)
+    return lqr.compute_gains
+
+
+@benchmark('lqr_update_state_matrices')
+def bench_lqr_update_state_matrices(size):
+    crane = _crane()
+    lqr = _lqr(crane)
+    matrices = []
+    for length in np.linspace(0.2, 0.9, 50):
+        crane.update_matrices(sling_length=length)
+        matrices.append((crane.A.copy(), crane.B.copy()))
+    points = itertools.cycle(matrices)
+    return lambda: lqr.update_state_matrices(*next(points))
+
+
+@benchmark('lqr_compute_gains_batch', sizes=(16, 128))
+def bench_lqr_compute_gains_batch(size):
+    from src.algorithm.LQR import LQR
+    A, B, _, _ = _crane().evaluate_matrices(l=np.linspace(0.2, 0.9, size))
+    return lambda: LQR.compute_gains_batch(A, B, np.eye(6), np.eye(2))
+
+
+@benchmark('get_signal_info')
+def bench_get_signal_info(size):
+    from src.utils.helpers import get_signal_info
+    crane = _crane()
+    return lambda: get_signal_info(crane.output)
+
+
+@benchmark('append_new_values', sizes=(100, 1000, 10000))
+def bench_append_new_values(size):
+    from src.utils.helpers import append_new_values
+    crane = _crane()
+    values = dict(zip(crane.output_info.names, crane.state))
+
+    def run():
+        _, log = crane.create_init_dict()
+        for _ in range(size):
+            append_new_values(log, values)
+    return run
+
+
+@benchmark('aggregate_simulation_data', sizes=(100, 1000))
+def bench_aggregate_simulation_data(size):
+    from src.utils import aggregation
+    crane = _crane()
+    t = np.linspace(0, size * 0.01, size)
+    control, results = crane.simulate([0.1, 0.0], t=t)
+    directory = tempfile.mkdtemp()
+    paths = iter(f'{directory}/{i}_' for i in range(10 ** 6))
+
+    def run():
+        with mock.patch.object(aggregation, 'create_new_directory_and_get_its_path', lambda: next(paths)):
+            aggregation.aggregate_simulation_data([control, results], [crane.input, crane.output],
+                                                  ['input', 'output'])
+    return run
+
+
+def measure(function, min_time=0.2, repeat=5):
+    """
+    Time a callable.
+
+    Parameters:
+    function (callable): Timed function without arguments.
+    min_time (float): Minimal duration of one repeat in seconds.
+    repeat (int): Number of repeats.
+
+    Returns:
+    dict: Median and minimum seconds per call, calls per repeat.
+    """
+    function()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10 or number >= 10 ** 6:
+            break
+        number *= 10
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+    return {'median': statistics.median(times), 'min': min(times), 'number': number}
+
+
+def run_benchmarks(names=None, min_time=0.2, repeat=5, quick=False):
+    """
+    Run the registered benchmarks.
+
+    Parameters:
+    names (list): Benchmarks to run, all by default.
+    min_time (float): Minimal duration of one repeat in seconds.
+    repeat (int): Number of repeats.
+    quick (bool): Only run the smallest size of every scaling curve.
+
+    Returns:
+    dict: Results keyed by 'name' or 'name[size]'.
+    """
+    results = {}
+    for name, (setup, sizes) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        for size in sizes[:1] if quick else sizes:
+            key = name if size is None else f'{name}[{size}]'
+            result = measure(setup(size), min_time, repeat)
+            result['size'] = size
+            results[key] = result
+    return results
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Compare results with a baseline.
+
+    Parameters:
+    results (dict): Results of run_benchmarks.
+    baseline (dict): Stored results of run_benchmarks.
+    threshold (float): Relative slowdown of the median reported as regression.
+
+    Returns:
+    list: (name, baseline median, median, ratio, regression) for benchmarks in both.
+    """
+    rows = []
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result['median'] / baseline[name]['median']
+            rows.append((name, baseline[name]['median'], result['median'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('names', nargs='*', help='benchmarks to run, all by default')
+    parser.add_argument('--output', help='save results as JSON')
+    parser.add_argument('--compare', help='JSON baseline to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative slowdown flagged as regression')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per repeat')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help='only the smallest size of scaling curves')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.names, args.min_time, args.repeat, args.quick)
+    for name, result in results.items():
+        print(f"{name:40s} {result['median'] * 1e6:12.2f} us  (min {result['min'] * 1e6:.2f} us)")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'python': platform.python_version(), 'numpy': np.__version__,
+                       'machine': platform.machine(), 'results': results}, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+        regressions = 0
+        print()
+        for name, old, new, ratio, regression in compare(results, baseline, args.threshold):
+            regressions += regression
+            flag = 'REGRESSION' if regression else ''
+            print(f"{name:40s} {old * 1e6:12.2f} -> {new * 1e6:12.2f} us  x{ratio:.2f} {flag}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,16 +1,46 @@
 import numpy as np
 from abc import ABC, abstractmethod
-from src.utils.helpers import get_signal_info, append_new_values
+from src.utils.helpers import describe_signals, append_new_values
+from src.utils.ringbuffer import RingBufferLogger
 from src.model.Model import Signal
+from src.utils.profiling import ALGORITHM_STAGES, LOGGER_STAGES, Profiler
+
+
+def gain_signals(model_signals):
+    """
+    Describe gains of the model signals in the form of Signal dataclass.
+    """
+    return [Signal('$K_{'+ sig.symbol + '}$', '-', -np.inf, np.inf, '-') for sig in model_signals]
 
 
 class Algorithm(ABC):
-    def __init__(self, model_signals):
+    _gain = None
+    # Cached (Signal.revision, SignalInfo) of the gain signals
+    _gain_info = None
+    profiler = None
+
+    def __init__(self, model_signals, profiler=None):
         self.gain = None
         self.K = None
 
         if model_signals is not None:
             self.create_gain_description(model_signals)
+        if profiler is not None:
+            self.set_profiler(profiler)
+
+    def set_profiler(self, profiler):
+        """
+        Time gain computation, control law and gain logging with a Profiler,
+        or stop timing with None. Without a profiler the methods run unwrapped.
+        """
+        if self.profiler is not None:
+            self.profiler.uninstrument(self, ALGORITHM_STAGES)
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.instrument(self, ALGORITHM_STAGES)
+
+    def __getstate__(self):
+        return Profiler.unprofiled_state(self, ALGORITHM_STAGES)
 
     @abstractmethod
     def compute_gains(self):
@@ -26,6 +56,27 @@ class Algorithm(ABC):
         """
         pass
 
+    @property
+    def gain(self):
+        """Gain signals, assign a new list to change them"""
+        return self._gain
+
+    @gain.setter
+    def gain(self, signals):
+        self._gain = signals
+        self._gain_info = None
+
+    @property
+    def gain_info(self):
+        """
+        Precomputed SignalInfo of the gains, rebuilt when self.gain is
+        assigned or when any Signal is created or changed, since Signal.revision
+        is class-global.
+        """
+        if self._gain_info is None or self._gain_info[0] != Signal.revision:
+            self._gain_info = (Signal.revision, describe_signals(self.gain))
+        return self._gain_info[1]
+
     def create_gain_description(self, model_signals):
         """
         Create gain variable with description of signals in the
@@ -34,8 +85,7 @@ class Algorithm(ABC):
         Parameters:
         model_signals (dataclass Signal): Model signals information.
         """
-        signal_info = get_signal_info(model_signals)
-        self.gain = [Signal('$K_{'+ symbol + '}$', '-', -np.inf, np.inf, '-') for symbol in signal_info['symbol']]
+        self.gain = gain_signals(model_signals)
 
     def create_init_dict(self):
         """
@@ -47,8 +97,22 @@ class Algorithm(ABC):
         Returns:
         dict: Empty dict of gain values.
         """
-        signal_info = get_signal_info(self.gain)
-        return {name: [] for name in signal_info['name']}
+        return {name: [] for name in self.gain_info.names}
+
+    def create_logger(self, capacity):
+        """
+        Create a preallocated ring-buffer logger for gain values.
+
+        Parameters:
+        capacity (int): Number of steps kept by the logger.
+
+        Returns:
+        RingBufferLogger: Logger with one column per gain signal.
+        """
+        logger = RingBufferLogger(self.gain, capacity)
+        if self.profiler is not None:
+            self.profiler.instrument(logger, LOGGER_STAGES)
+        return logger
 
     def filter_gains(self, tol=1e-10):
         """
@@ -62,8 +126,7 @@ class Algorithm(ABC):
         """
         flattened = self.K.flatten()
         filtered = np.round(flattened[np.abs(flattened) > tol], 4)
-        gain_info = get_signal_info(self.gain)
-        return dict(zip(gain_info['name'].to_list(), filtered))
+        return dict(zip(self.gain_info.names, filtered))
 
 # Example usage
 if __name__ == "__main__":
@@ -78,7 +141,7 @@ if __name__ == "__main__":
     dt = 0.1
 
     # Create LQR controller
-    lqr = LQR(obj.sys.A, obj.sys.B, Q, R, obj.output)
+    lqr = LQR(obj.A, obj.B, Q, R, obj.output)
     # Set desired parameters
     desired_x = 2   # [m]
     desired_l = 0.5 # [m]
@@ -94,12 +157,12 @@ if __name__ == "__main__":
         control = desired - feedback
 
         # Simulate object
-        u_new, y_new = obj.simulate(control, dt=dt)
+        u_new, y_new = obj.simulate(control, dt=dt, method='zoh')
 
         # Update state-space matrices
         obj.update_matrices(sling_length=obj.state[4])
-        A_new = obj.sys.A
-        B_new = obj.sys.B
+        A_new = obj.A
+        B_new = obj.B
         lqr.update_state_matrices(A_new, B_new)
 
         append_new_values(u, u_new)
@@ -0,0 +1,51 @@
+import numpy as np
+from scipy.linalg import solve_discrete_are
+from src.algorithm.LQR import LQR
+from src.utils.discretization import zoh_discretize
+from src.utils.riccati import quantized_key
+
+
+class DLQR(LQR):
+    def __init__(self, A, B, Q, R, dt, model_signals=None, cache_size=128, profiler=None,
+                 cache_tol=1e-9):
+        """
+        Initialize the discrete-time LQR controller for the zero-order-hold
+        discretization of the continuous system (A, B).
+
+        Parameters:
+        A (numpy.ndarray): Continuous system dynamics matrix.
+        B (numpy.ndarray): Continuous input matrix.
+        Q (numpy.ndarray): State cost matrix.
+        R (numpy.ndarray): Input cost matrix.
+        dt (float): Sampling time of the control loop.
+        model_signals (dataclass Signal): Model signals information.
+        cache_size (int): Number of Riccati solutions kept in the LRU cache (0 disables it).
+        profiler (Profiler): Optional profiler timing gain computation and the control law.
+        cache_tol (float): Quantization step of the matrix entries in the cache key.
+        """
+        self.dt = dt
+        self.Ad = None
+        self.Bd = None
+        super().__init__(A, B, Q, R, model_signals, cache_size=cache_size, warm_start_tol=0,
+                         profiler=profiler, cache_tol=cache_tol)
+
+    def compute_gains(self):
+        """
+        Compute the optimal gain matrix K and solution to the discrete Riccati
+        equation P, memoized like LQR.compute_gains. K and P are read-only.
+        """
+        self.Ad, self.Bd = zoh_discretize(self.A, self.B, self.dt)
+        key = quantized_key(self.A, self.B, self.Q, self.R, tol=self.cache_tol) + (self.dt,)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.K, self.P = cached
+            return
+
+        # Solve the discrete-time algebraic Riccati equation (DARE)
+        P = solve_discrete_are(self.Ad, self.Bd, self.Q, self.R)
+        BtP = self.Bd.T @ P
+        K = np.linalg.solve(self.R + BtP @ self.Bd, BtP @ self.Ad)
+        K.flags.writeable = False
+        P.flags.writeable = False
+        self.K, self.P = K, P
+        self.cache.put(key, (K, P))
@@ -0,0 +1,339 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.algorithm.Algorithm import Algorithm
+from src.algorithm.MPC import MPC
+
+
+# Controller solving the cell QPs, the lattice of the region and the online
+# solutions at its points, set once per worker process by the pool initializer
+_worker_mpc = None
+_worker_grid = None
+_worker_solutions = None
+
+
+def affine_law(mpc, x, dual_tol=1e-6, bound_tol=1e-4):
+    """
+    Affine law u_0 = gain @ x + offset of the MPC around the state x.
+
+    The QP is solved at x and the constraints that are active there are kept
+    as equalities; the KKT system of this equality-constrained QP is affine
+    in x. If the law does not reproduce the solution at x (degenerate active
+    set), the constant input of the solution is returned instead.
+
+    Parameters:
+    mpc (MPC): Online controller.
+    x (numpy.ndarray): State of the solve.
+    dual_tol (float): Minimal magnitude of the multiplier of an active constraint.
+    bound_tol (float): Maximal distance of an active constraint from its bound.
+
+    Returns:
+    tuple: gain (m, n), offset (m,) and whether the solver converged, which
+    fails when the constraints cannot be met from x.
+    """
+    mpc.reset()
+    U = mpc.solve(x).ravel()
+    qp = mpc.qp
+    n = len(x)
+    m = qp['K'].shape[0]
+    G = qp['G']
+    lower, upper = mpc.constraint_bounds(x)
+    GU = G @ U
+    duals = mpc.duals
+    active_upper = (duals > dual_tol) & (upper - GU <= bound_tol)
+    active_lower = (duals < -dual_tol) & (GU - lower <= bound_tol)
+    active = np.flatnonzero(active_upper | active_lower)
+
+    # Bounds of the active rows as affine functions of x: bound - S x
+    S = np.vstack((np.zeros((qp['n_inputs'], n)), qp['Sx']))[active]
+    bounds = np.where(active_upper, qp['upper'], qp['lower'])[active]
+    G_active = G[active]
+    size = len(U)
+    kkt = np.zeros((size + len(active), size + len(active)))
+    kkt[:size, :size] = qp['H']
+    kkt[:size, size:] = G_active.T
+    kkt[size:, :size] = G_active
+    rhs = np.zeros((size + len(active), n + 1))
+    rhs[:size, :n] = -qp['F']
+    rhs[:size, n] = qp['W'] @ mpc.reference
+    rhs[size:, :n] = -S
+    rhs[size:, n] = bounds
+    solution = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+    gain = solution[:m, :n]
+    offset = solution[:m, n]
+    if not np.allclose(gain @ x + offset, U[:m], atol=1e-3 * max(1.0, np.max(np.abs(U[:m])))):
+        return np.zeros((m, n)), U[:m].copy(), mpc.converged
+    return gain, offset, mpc.converged
+
+
+def _init_worker(mpc, grid):
+    global _worker_mpc, _worker_grid, _worker_solutions
+    _worker_mpc = mpc
+    _worker_grid = grid
+    _worker_solutions = {}
+
+
+def _online_input(point):
+    """Online u_0 and convergence at a lattice point, shared by the cells of a worker"""
+    key = tuple(point)
+    if key not in _worker_solutions:
+        _worker_mpc.reset()
+        u = _worker_mpc.solve(_worker_grid['lower'] + point * _worker_grid['unit'])[0].copy()
+        _worker_solutions[key] = (u, _worker_mpc.converged)
+    return _worker_solutions[key]
+
+
+def _tabulate_box(lo, hi, depth, nodes):
+    """
+    Append the law of the lattice box [lo, hi] to nodes and split the box in
+    two halves while the law misses the online solution at a vertex by more
+    than tol. Returns the node index of the box.
+    """
+    grid = _worker_grid
+    mpc = _worker_mpc
+    gain, offset, feasible = affine_law(mpc, grid['lower'] + (lo + hi) / 2 * grid['unit'])
+    corners = grid['corners']
+    errors = np.zeros(len(corners))
+    for i, corner in enumerate(corners):
+        vertex = lo + corner * (hi - lo)
+        u, converged = _online_input(vertex)
+        if converged:
+            x = grid['lower'] + vertex * grid['unit']
+            errors[i] = np.max(np.abs(np.clip(gain @ x + offset, mpc.u_min, mpc.u_max) - u))
+    error = float(errors.max())
+    index = len(nodes)
+    nodes.append([gain, offset, feasible, error, -1, 0.0, (-1, -1)])
+    if error > grid['tol'] and depth < grid['max_depth']:
+        # Halve the box along the state that separates large from small vertex
+        # errors the most, weighted by its extent as a fraction of the region
+        dim = int(np.argmax(np.abs(errors @ (2 * corners - 1)) * (hi - lo) / grid['resolution']))
+        middle = lo[dim] + (hi[dim] - lo[dim]) // 2
+        left_hi = hi.copy()
+        left_hi[dim] = middle
+        right_lo = lo.copy()
+        right_lo[dim] = middle
+        left = _tabulate_box(lo, left_hi, depth + 1, nodes)
+        right = _tabulate_box(right_lo, hi, depth + 1, nodes)
+        nodes[index][4:] = [dim, grid['lower'][dim] + middle * grid['unit'][dim], (left, right)]
+    return index
+
+
+def _solve_cells(boxes):
+    trees = []
+    for lo, hi in boxes:
+        nodes = []
+        _tabulate_box(lo, hi, 0, nodes)
+        trees.append(nodes)
+    return trees
+
+
+class ExplicitMPC(Algorithm):
+    # Arrays of the tabulated law, stored by save
+    LAW_ARRAYS = ('gains', 'offsets', 'feasible', 'errors', 'roots', 'split_dim', 'split_value',
+                  'children', 'u_min', 'u_max', 'K')
+
+    def __init__(self, mpc, lower, upper, resolution=3, model_signals=None,
+                 max_workers=None, chunksize=64, tol=1e-2, max_depth=4, laws=None):
+        """
+        Initialize the explicit MPC, a piecewise-affine control law
+        precomputed on a regular grid of cells over a bounded state region.
+
+        Every cell uses the law of the active set at its center. The law is
+        compared with the online solution at the cell vertices, and cells
+        missing it by more than tol are halved (k-d tree) up to max_depth
+        times. control_input is a grid lookup, a short tree descent and one
+        affine evaluation clipped to the input bounds. States outside the
+        region use the nearest boundary cell.
+
+        Parameters:
+        mpc (MPC): Online controller whose law is tabulated, None for loaded laws.
+        lower (numpy.ndarray): Lower corner of the region.
+        upper (numpy.ndarray): Upper corner of the region.
+        resolution (int or list): Number of cells per state.
+        model_signals (dataclass Signal): Model signals information.
+        max_workers (int): Processes of the offline generation, 0 runs in the current process.
+        chunksize (int): Number of cells per task.
+        tol (float): Largest error of u_0 at the vertices of a cell before it is split.
+        max_depth (int): Maximal number of splits of a grid cell.
+        laws (dict): Precomputed law and tree arrays, used by load.
+        """
+        super().__init__(model_signals)
+        self.mpc = mpc
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        if not np.all(np.isfinite(self.lower) & np.isfinite(self.upper)):
+            raise ValueError("The region must be bounded!")
+        self.resolution = np.broadcast_to(np.asarray(resolution, dtype=int), self.lower.shape).copy()
+        self.cell_size = (self.upper - self.lower) / self.resolution
+        # Flat cell index = (integer cell coordinates) @ strides
+        self.strides = np.append(np.cumprod(self.resolution[::-1])[-2::-1], 1)
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+        self.tol = tol
+        self.max_depth = max_depth
+        self.gains = None
+        self.offsets = None
+        # Cells whose center QP was solved, the others keep the best-effort input
+        self.feasible = None
+        # Largest error of u_0 at the cell vertices
+        self.errors = None
+        # Tree of every grid cell: root node, split state and value, children
+        # (left below the value, right above) and -1 split state for leaves
+        self.roots = None
+        self.split_dim = None
+        self.split_value = None
+        self.children = None
+
+        if laws is None:
+            self.u_min = mpc.u_min
+            self.u_max = mpc.u_max
+            self.compute_gains()
+        else:
+            for name, value in laws.items():
+                setattr(self, name, value)
+
+    @classmethod
+    def from_model(cls, model, Q, R, dt, horizon=20, resolution=3, infinite_bound=1.0,
+                   max_workers=None, chunksize=64, tol=1e-2, max_depth=4, **mpc_options):
+        """
+        Build the explicit MPC over the region given by the min/max of the
+        output signals of a model; infinite limits are clipped to +-infinite_bound.
+
+        Parameters:
+        model (Model): Controlled model.
+        infinite_bound (float): Replacement of infinite signal limits.
+        mpc_options: Further keyword arguments of MPC.
+
+        Returns:
+        ExplicitMPC: Controller of the model.
+        """
+        mpc = MPC.from_model(model, Q, R, dt, horizon, **mpc_options)
+        lower = np.clip(model.output_info.min, -infinite_bound, None)
+        upper = np.clip(model.output_info.max, None, infinite_bound)
+        return cls(mpc, lower, upper, resolution, model.output, max_workers, chunksize, tol, max_depth)
+
+    def cell_centers(self):
+        """Centers of all grid cells in flat index order, shape (cells, n)"""
+        indices = np.indices(self.resolution).reshape(len(self.resolution), -1).T
+        return self.lower + (indices + 0.5) * self.cell_size
+
+    def compute_gains(self):
+        """
+        Tabulate and refine the affine laws of every cell, in a process pool
+        unless max_workers is 0. Cells are boxes of an integer lattice, fine
+        enough for max_depth splits, so that vertex solves are shared exactly.
+        """
+        if self.mpc is None:
+            raise ValueError("Laws loaded from disk cannot be recomputed without an MPC!")
+        n = len(self.resolution)
+        scale = 2 ** self.max_depth
+        grid = {'lower': self.lower, 'unit': self.cell_size / scale, 'resolution': self.resolution,
+                'tol': self.tol, 'max_depth': self.max_depth,
+                'corners': np.array(list(itertools.product((0, 1), repeat=n)))}
+        indices = np.indices(self.resolution).reshape(n, -1).T * scale
+        boxes = [(lo, lo + scale) for lo in indices]
+        chunks = [boxes[i:i + self.chunksize] for i in range(0, len(boxes), self.chunksize)]
+        if self.max_workers == 0:
+            _init_worker(self.mpc, grid)
+            results = [_solve_cells(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(self.mpc, grid)) as executor:
+                results = list(executor.map(_solve_cells, chunks))
+
+        roots = []
+        nodes = []
+        children = []
+        for tree in itertools.chain.from_iterable(results):
+            root = len(nodes)
+            roots.append(root)
+            children.extend([child + root if child >= 0 else -1 for child in node[6]] for node in tree)
+            nodes.extend(tree)
+        self.gains, self.offsets, self.feasible, self.errors, self.split_dim, self.split_value = (
+            np.array([node[i] for node in nodes]) for i in range(6))
+        self.roots = np.array(roots)
+        self.children = np.array(children)
+        self.K = self.mpc.K
+
+    def cell_index(self, x):
+        """
+        Flat index of the grid cell holding the state x (n,) or each state of a batch (N, n).
+        """
+        cells = np.floor((np.asarray(x, dtype=float) - self.lower) / self.cell_size).astype(int)
+        np.clip(cells, 0, self.resolution - 1, out=cells)
+        return cells @ self.strides
+
+    def law_index(self, x):
+        """
+        Index of the law (tree leaf) holding the state x (n,) or each state of a batch (N, n).
+        """
+        x = np.asarray(x, dtype=float)
+        node = self.roots[self.cell_index(x)]
+        dim = self.split_dim[node]
+        while np.any(dim >= 0):
+            value = np.take_along_axis(x, np.maximum(dim, 0)[..., None], axis=-1)[..., 0]
+            child = self.children[node, (value >= self.split_value[node]).astype(int)]
+            node = np.where(dim >= 0, child, node)
+            dim = self.split_dim[node]
+        return node
+
+    def control_input(self, x, out=None):
+        """
+        Compute the feedback -u_0 of the law holding x, with u_0 clipped to
+        the input bounds, following the LQR.control_input convention
+        control = desired - feedback.
+
+        Parameters:
+        x (numpy.ndarray): Current state (n,) or batch of states (N, n).
+        out (numpy.ndarray): Optional preallocated array for the result.
+
+        Returns:
+        numpy.ndarray: Feedback vector, or one per state of the batch.
+        """
+        if self.gains is None:
+            raise ValueError("The control law has not been computed.")
+        law = self.law_index(x)
+        u = np.einsum('...ij,...j->...i', self.gains[law], x) + self.offsets[law]
+        np.clip(u, self.u_min, self.u_max, out=u)
+        if out is None:
+            return -u
+        return np.negative(u, out=out)
+
+    def error_bound(self):
+        """
+        Compare the tabulated laws with the online solutions at the vertices
+        of their cells, where the error of an affine law is largest within
+        its active set. The errors are recorded during the tabulation.
+
+        Returns:
+        dict: Maximal absolute error of u_0, the number of cells and the
+        number of cells above tol after max_depth splits.
+        """
+        leaves = self.split_dim < 0
+        errors = self.errors[leaves]
+        return {'max_abs': float(errors.max()), 'cells': int(leaves.sum()),
+                'failed': int(np.count_nonzero(errors > self.tol))}
+
+    def save(self, path):
+        """
+        Save the tabulated law with numpy.savez.
+
+        Parameters:
+        path (str): File path, '.npz' is appended by numpy if missing.
+        """
+        np.savez(path, lower=self.lower, upper=self.upper, resolution=self.resolution,
+                 tol=self.tol, max_depth=self.max_depth,
+                 **{name: getattr(self, name) for name in self.LAW_ARRAYS})
+
+    @classmethod
+    def load(cls, path, model_signals=None):
+        """
+        Load a law saved with save. The loaded controller has no online MPC.
+
+        Returns:
+        ExplicitMPC: Controller with the stored law.
+        """
+        with np.load(path) as data:
+            laws = {name: data[name] for name in cls.LAW_ARRAYS}
+            return cls(None, data['lower'], data['upper'], data['resolution'], model_signals,
+                       tol=float(data['tol']), max_depth=int(data['max_depth']), laws=laws)
@@ -0,0 +1,106 @@
+import numpy as np
+from src.algorithm.Algorithm import Algorithm
+from src.utils.discretization import zoh_discretize_batch
+
+
+class FiniteHorizonLQR(Algorithm):
+    def __init__(self, A, B, Q, R, dt, horizon=None, Qf=None, model_signals=None):
+        """
+        Initialize the finite-horizon, time-varying discrete LQR controller.
+
+        The whole gain sequence K_0..K_{T-1} is computed offline in one
+        backward Riccati sweep over the stacked, zero-order-hold discretized
+        systems, so no Riccati equation is solved in the control loop.
+
+        Parameters:
+        A (numpy.ndarray): Continuous system matrix (n, n) or one per step (T, n, n), copied.
+        B (numpy.ndarray): Continuous input matrix (n, m) or one per step (T, n, m), copied.
+        Q (numpy.ndarray): State cost matrix.
+        R (numpy.ndarray): Input cost matrix.
+        dt (float): Sampling time of the control loop.
+        horizon (int): Number of steps T, required when A and B are not stacked.
+        Qf (numpy.ndarray): Terminal state cost, Q by default.
+        model_signals (dataclass Signal): Model signals information.
+        """
+        super().__init__(model_signals)
+        A = np.array(A, dtype=float)
+        B = np.array(B, dtype=float)
+        if horizon is None:
+            if A.ndim != 3 and B.ndim != 3:
+                raise ValueError("Horizon required for time-invariant matrices!")
+            horizon = A.shape[0] if A.ndim == 3 else B.shape[0]
+        self.A = np.broadcast_to(A, (horizon,) + A.shape[-2:])
+        self.B = np.broadcast_to(B, (horizon,) + B.shape[-2:])
+        self.Q = np.asarray(Q, dtype=float)
+        self.R = np.asarray(R, dtype=float)
+        self.Qf = self.Q if Qf is None else np.asarray(Qf, dtype=float)
+        self.dt = dt
+        self.horizon = horizon
+        self.K_seq = None
+        self.P_seq = None
+
+        self.compute_gains()
+
+    @classmethod
+    def from_schedule(cls, model, Q, R, dt, schedule, Qf=None, model_signals=None):
+        """
+        Build the controller for a known schedule of model parameters.
+
+        Parameters:
+        model (Model): Model whose update_matrices accepts the scheduled values as keywords.
+        schedule (dict): Keyword -> array of T values, e.g. sling_length=np.linspace(0.2, 0.8, T).
+
+        Returns:
+        FiniteHorizonLQR: Controller with one system per step.
+        """
+        names = list(schedule)
+        values = [np.asarray(schedule[name], dtype=float) for name in names]
+        A, B = [], []
+        with model.preserved():
+            for point in zip(*values):
+                model.update_matrices(**dict(zip(names, point)))
+                A.append(model.A.copy())
+                B.append(model.B.copy())
+        return cls(np.array(A), np.array(B), Q, R, dt, Qf=Qf, model_signals=model_signals)
+
+    def compute_gains(self):
+        """
+        Compute the gain sequence K_0..K_{T-1} and cost-to-go matrices P_0..P_T.
+        """
+        Ad, Bd = zoh_discretize_batch(self.A, self.B, self.dt)
+        n_states = Ad.shape[1]
+        n_inputs = Bd.shape[2]
+        self.K_seq = np.empty((self.horizon, n_inputs, n_states))
+        self.P_seq = np.empty((self.horizon + 1, n_states, n_states))
+        P = self.Qf
+        self.P_seq[-1] = P
+        for k in range(self.horizon - 1, -1, -1):
+            BtP = Bd[k].T @ P
+            K = np.linalg.solve(self.R + BtP @ Bd[k], BtP @ Ad[k])
+            P = self.Q + Ad[k].T @ P @ (Ad[k] - Bd[k] @ K)
+            P = (P + P.T) / 2
+            self.K_seq[k] = K
+            self.P_seq[k] = P
+        self.K = self.K_seq[0]
+        self.P = self.P_seq[0]
+
+    def control_input(self, x, k=0, out=None):
+        """
+        Compute the control input at step k of the horizon. self.K stays the
+        gain of step 0.
+
+        Parameters:
+        x (numpy.ndarray): Current state vector.
+        k (int): Step index, the last gain is kept after the horizon ends.
+        out (numpy.ndarray): Optional preallocated array for the result.
+
+        Returns:
+        numpy.ndarray: Control input vector.
+        """
+        if self.K_seq is None:
+            raise ValueError("The gain sequence has not been computed.")
+
+        K = self.K_seq[min(k, self.horizon - 1)]
+        if out is None:
+            return K @ x
+        return np.dot(K, x, out=out)
@@ -0,0 +1,143 @@
+import itertools
+import numpy as np
+from scipy.linalg import solve_continuous_are
+from src.algorithm.Algorithm import Algorithm
+
+
+class GainScheduledLQR(Algorithm):
+    def __init__(self, model, Q, R, grid, model_signals=None):
+        """
+        Initialize the gain-scheduled LQR controller.
+
+        The Riccati equation is solved offline for every point of the grid of
+        scheduling variables and the gains are interpolated at runtime.
+
+        Parameters:
+        model (Model): Model whose update_matrices accepts the scheduling variables as keywords.
+        Q (numpy.ndarray): State cost matrix.
+        R (numpy.ndarray): Input cost matrix.
+        grid (dict): Scheduling variable name -> increasing 1D array of grid values.
+        model_signals (dataclass Signal): Model signals information.
+        """
+        super().__init__(model_signals)
+        self.model = model
+        self.Q = Q
+        self.R = R
+        self.names = tuple(grid)
+        self.grid = tuple(np.asarray(values, dtype=float) for values in grid.values())
+        for values in self.grid:
+            if values.ndim != 1 or len(values) < 2 or np.any(np.diff(values) <= 0):
+                raise ValueError("Grid values must be increasing with at least two points!")
+        self.K_table = None
+        self.P_table = None
+        self.P = None
+
+        self.compute_gains()
+        self.update_schedule(**{name: values[0] for name, values in zip(self.names, self.grid)})
+
+    def _system_matrices(self, **schedule):
+        self.model.update_matrices(**schedule)
+        return self.model.A.copy(), self.model.B.copy()
+
+    def _exact_gains(self, A, B):
+        P = solve_continuous_are(A, B, self.Q, self.R)
+        return np.linalg.solve(self.R, B.T @ P), P
+
+    def compute_gains(self):
+        """
+        Solve the Riccati equation for every grid point and store K and P tables.
+        """
+        with self.model.preserved():
+            shape = tuple(len(values) for values in self.grid)
+            for index in itertools.product(*(range(n) for n in shape)):
+                point = {name: values[i] for name, values, i in zip(self.names, self.grid, index)}
+                K, P = self._exact_gains(*self._system_matrices(**point))
+                if self.K_table is None:
+                    self.K_table = np.empty(shape + K.shape)
+                    self.P_table = np.empty(shape + P.shape)
+                self.K_table[index] = K
+                self.P_table[index] = P
+
+    def _interpolate(self, table, point):
+        # Multilinear interpolation over the 2^d corners of the enclosing cell
+        lower = []
+        weights = []
+        for values, x in zip(self.grid, point):
+            i = int(np.clip(np.searchsorted(values, x) - 1, 0, len(values) - 2))
+            w = (x - values[i]) / (values[i + 1] - values[i])
+            lower.append(i)
+            weights.append(min(max(w, 0.0), 1.0))
+        result = np.zeros(table.shape[len(self.grid):])
+        for corner in itertools.product((0, 1), repeat=len(self.grid)):
+            weight = 1.0
+            for c, w in zip(corner, weights):
+                weight *= w if c else 1.0 - w
+            if weight:
+                result += weight * table[tuple(i + c for i, c in zip(lower, corner))]
+        return result
+
+    def update_schedule(self, **schedule):
+        """
+        Interpolate the gain matrix K and Riccati solution P at a scheduling point.
+
+        Values outside of the grid are clamped to its boundary.
+
+        Parameters:
+        schedule: Value of every scheduling variable, e.g. sling_length=0.5.
+        """
+        point = [schedule[name] for name in self.names]
+        self.K = self._interpolate(self.K_table, point)
+        self.P = self._interpolate(self.P_table, point)
+
+    def control_input(self, x, out=None):
+        """
+        Compute the control input based on the current state x.
+
+        Parameters:
+        x (numpy.ndarray): Current state vector.
+        out (numpy.ndarray): Optional preallocated array for the result.
+
+        Returns:
+        numpy.ndarray: Control input vector.
+        """
+        if self.K is None:
+            raise ValueError("The gain matrix K has not been computed.")
+
+        if out is None:
+            return self.K @ x
+        return np.dot(self.K, x, out=out)
+
+    def error_bound(self):
+        """
+        Compare interpolated gains with exact solves at the centre of every grid cell,
+        where the interpolation error of the table is largest.
+
+        Returns:
+        dict: Maximal absolute and relative (Frobenius norm) errors of K.
+        """
+        max_abs = 0.0
+        max_rel = 0.0
+        with self.model.preserved():
+            midpoints = [(values[:-1] + values[1:]) / 2 for values in self.grid]
+            for point in itertools.product(*midpoints):
+                K_exact, _ = self._exact_gains(*self._system_matrices(**dict(zip(self.names, point))))
+                error = np.linalg.norm(self._interpolate(self.K_table, point) - K_exact)
+                max_abs = max(max_abs, error)
+                max_rel = max(max_rel, error / np.linalg.norm(K_exact))
+        return {'max_abs': float(max_abs), 'max_rel': float(max_rel)}
+
+
+# Example usage
+if __name__ == "__main__":
+    from src.model.Crane1D import Crane1D
+
+    obj = Crane1D()
+    Q = np.eye(6)
+    R = np.eye(2)
+    grid = {'sling_length': np.linspace(0.1, 1, 19),
+            'payload_mass': np.linspace(1, 3, 5)}
+    lqr = GainScheduledLQR(obj, Q, R, grid, obj.output)
+    print(lqr.error_bound())
+
+    lqr.update_schedule(sling_length=0.37, payload_mass=2)
+    print(lqr.K)
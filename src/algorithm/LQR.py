@@ -1,28 +1,45 @@
 import numpy as np
-from scipy.linalg import solve_continuous_are
-from src.utils.helpers import get_signal_info, append_new_values
+from scipy.linalg import solve_continuous_are, cho_factor, cho_solve
+from src.utils.helpers import append_new_values
 from src.model.Model import Signal
-from src.algorithm.Algorithm import Algorithm
+from src.algorithm.Algorithm import Algorithm, gain_signals
+from src.utils.riccati import RiccatiCache, quantized_key, newton_kleinman, solve_care_batch
 
 class LQR(Algorithm):
-    def __init__(self, A, B, Q, R, model_signals=None):
-        super().__init__(model_signals)
+    def __init__(self, A, B, Q, R, model_signals=None, cache_size=128, warm_start_tol=0.1,
+                 profiler=None, cache_tol=1e-9):
         """
         Initialize the LQR controller.
 
+        The gain K and Riccati solution P are shared with the solution cache
+        and are read-only arrays; copy them before modifying.
+
         Parameters:
-        A (numpy.ndarray): System dynamics matrix.
-        B (numpy.ndarray): Input matrix.
+        A (numpy.ndarray): System dynamics matrix, copied (model.A is updated in place).
+        B (numpy.ndarray): Input matrix, copied.
         Q (numpy.ndarray): State cost matrix.
         R (numpy.ndarray): Input cost matrix.
+        cache_size (int): Number of Riccati solutions kept in the LRU cache (0 disables it).
+        warm_start_tol (float): Maximal relative change of A and B for which the previous
+            solution seeds Newton-Kleinman iterations instead of a full solve (0 disables it).
+        profiler (Profiler): Optional profiler timing gain computation and the control law.
+        cache_tol (float): Quantization step of the matrix entries in the cache key,
+            systems closer than this share one solution.
         """
-        self.A = A
-        self.B = B
+        super().__init__(model_signals, profiler)
+        self.cache_tol = cache_tol
+        self.A = np.array(A, dtype=float)
+        self.B = np.array(B, dtype=float)
         self.Q = Q
         self.R = R
         self.K = None
         self.P = None
         self.gain = None
+        self.cache = RiccatiCache(cache_size)
+        self.warm_start_tol = warm_start_tol
+        self._R_factor = None
+        self._R_key = None
+        self._solved = None
 
         self.compute_gains()
         if model_signals is not None:
@@ -31,19 +48,63 @@ class LQR(Algorithm):
     def compute_gains(self):
         """
         Compute the optimal gain matrix K and solution to the Riccati equation P.
+
+        Solutions are memoized on (A, B, Q, R) quantized to cache_tol. For small
+        changes of A and B the previous solution seeds Newton-Kleinman
+        iterations, with a fallback to the full solve. K and P are read-only.
         """
-        # Solve the continuous-time algebraic Riccati equation (ARE)
-        self.P = solve_continuous_are(self.A, self.B, self.Q, self.R)
+        key = quantized_key(self.A, self.B, self.Q, self.R, tol=self.cache_tol)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.K, self.P, A_solved, B_solved = cached
+            self._solved = (A_solved, B_solved, key[4:])
+            return
+
+        A = np.asarray(self.A, dtype=float)
+        B = np.asarray(self.B, dtype=float)
+        R_factor = self._factor_input_cost()
+
+        P = None
+        if self._warm_start_possible(A, B):
+            P = newton_kleinman(A, B, self.Q, self.R, R_factor, self.P)
+        if P is None:
+            # Solve the continuous-time algebraic Riccati equation (ARE)
+            P = solve_continuous_are(A, B, self.Q, self.R)
 
         # Compute the LQR gain K
-        self.K = np.linalg.inv(self.R) @ self.B.T @ self.P
-
-    def control_input(self, x):
+        K = cho_solve(R_factor, B.T @ P)
+        K.flags.writeable = False
+        P.flags.writeable = False
+        self.K, self.P = K, P
+        self._solved = (A.copy(), B.copy(), key[4:])
+        self.cache.put(key, (K, P) + self._solved[:2])
+
+    def _factor_input_cost(self):
+        # Cholesky factor of R is reused until R changes
+        R_key = quantized_key(self.R, tol=self.cache_tol)
+        if R_key != self._R_key:
+            self._R_factor = cho_factor(self.R)
+            self._R_key = R_key
+        return self._R_factor
+
+    def _warm_start_possible(self, A, B):
+        if self._solved is None or self.P is None or self.warm_start_tol <= 0:
+            return False
+        A_prev, B_prev, cost_key = self._solved
+        if A.shape != A_prev.shape or B.shape != B_prev.shape \
+                or cost_key != quantized_key(self.Q, self.R, tol=self.cache_tol):
+            return False
+        change = np.linalg.norm(A - A_prev) + np.linalg.norm(B - B_prev)
+        scale = np.linalg.norm(A_prev) + np.linalg.norm(B_prev)
+        return change <= self.warm_start_tol * scale
+
+    def control_input(self, x, out=None):
         """
         Compute the control input based on the current state x.
 
         Parameters:
         x (numpy.ndarray): Current state vector.
+        out (numpy.ndarray): Optional preallocated array for the result.
 
         Returns:
         numpy.ndarray: Control input vector.
@@ -51,20 +112,60 @@ class LQR(Algorithm):
         if self.K is None:
             raise ValueError("The gain matrix K has not been computed.")
 
-        return self.K @ x
+        if out is None:
+            return self.K @ x
+        return np.dot(self.K, x, out=out)
 
     def update_state_matrices(self, A, B):
         """
         Update the state-space matrices and recompute the LQR gains.
 
         Parameters:
-        A (numpy.ndarray): New system dynamics matrix.
-        B (numpy.ndarray): New input matrix.
+        A (numpy.ndarray): New system dynamics matrix, copied.
+        B (numpy.ndarray): New input matrix, copied.
         """
-        self.A = A
-        self.B = B
+        self.A = np.array(A, dtype=float)
+        self.B = np.array(B, dtype=float)
         self.compute_gains()
 
+    @staticmethod
+    def compute_gains_batch(A, B, Q, R, max_workers=None):
+        """
+        Compute LQR gains for a stack of systems at once.
+
+        Parameters:
+        A (numpy.ndarray): System dynamics matrices (N, n, n).
+        B (numpy.ndarray): Input matrices (N, n, m).
+        Q (numpy.ndarray): State cost matrix (n, n) or stack (N, n, n).
+        R (numpy.ndarray): Input cost matrix (m, m) or stack (N, m, m).
+        max_workers (int): Threads used for systems the batched solver cannot handle.
+
+        Returns:
+        tuple: Gains K (N, m, n) and Riccati solutions P (N, n, n).
+        """
+        return solve_care_batch(A, B, Q, R, max_workers=max_workers)
+
+    @staticmethod
+    def filter_gains_batch(K, model_signals, tol=1e-10):
+        """
+        Label a stack of gains like filter_gains, with the near-zero pattern
+        determined once for the whole batch.
+
+        Parameters:
+        K (numpy.ndarray): Gains (N, m, n).
+        model_signals (dataclass Signal): Model signals information.
+        tol (float): Entries with magnitude below tol in every system are removed.
+
+        Returns:
+        pandas.DataFrame: One row per system, one column per gain signal.
+        """
+        import pandas as pd
+        flattened = K.reshape(len(K), -1)
+        kept = np.flatnonzero(np.any(np.abs(flattened) > tol, axis=0))
+        names = [sig.name for sig in gain_signals(model_signals)]
+        kept = kept[:len(names)]
+        return pd.DataFrame(np.round(flattened[:, kept], 4), columns=names[:len(kept)])
+
     def filter_gains(self, tol=1e-10):
         """
         Flattens an ndarray of gains and removes values close to zero.
@@ -77,8 +178,7 @@ class LQR(Algorithm):
         """
         flattened = self.K.flatten()
         filtered = np.round(flattened[np.abs(flattened) > tol], 4)
-        gain_info = get_signal_info(self.gain)
-        return dict(zip(gain_info['name'].to_list(), filtered))
+        return dict(zip(self.gain_info.names, filtered))
 
 # Example usage
 if __name__ == "__main__":
@@ -93,7 +193,7 @@ if __name__ == "__main__":
     dt = 0.1
 
     # Create LQR controller
-    lqr = LQR(obj.sys.A, obj.sys.B, Q, R, obj.output)
+    lqr = LQR(obj.A, obj.B, Q, R, obj.output)
     # Set desired parameters
     desired_x = 2   # [m]
     desired_l = 0.5 # [m]
@@ -109,12 +209,12 @@ if __name__ == "__main__":
         control = desired - feedback
 
         # Simulate object
-        u_new, y_new = obj.simulate(control, dt=dt)
+        u_new, y_new = obj.simulate(control, dt=dt, method='zoh')
 
         # Update state-space matrices
         obj.update_matrices(sling_length=obj.state[4])
-        A_new = obj.sys.A
-        B_new = obj.sys.B
+        A_new = obj.A
+        B_new = obj.B
         lqr.update_state_matrices(A_new, B_new)
 
         append_new_values(u, u_new)
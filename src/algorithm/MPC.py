@@ -0,0 +1,362 @@
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve, eigh
+from src.algorithm.Algorithm import Algorithm
+from src.utils.discretization import zoh_discretize
+from src.utils.riccati import RiccatiCache, quantized_key
+
+
+def state_powers(Ad, horizon):
+    """
+    Powers Ad^0, ..., Ad^N of the discrete dynamics matrix.
+
+    Returns:
+    numpy.ndarray: Powers, shape (N+1, n, n).
+    """
+    n = len(Ad)
+    powers = np.empty((horizon + 1, n, n))
+    powers[0] = np.eye(n)
+    for k in range(horizon):
+        np.dot(Ad, powers[k], out=powers[k + 1])
+    return powers
+
+
+def condensed_matrices(Ad, Bd, horizon, powers=None):
+    """
+    Prediction matrices of the stacked states X = [x_1, ..., x_N] = Sx x_0 + Su U
+    for the stacked inputs U = [u_0, ..., u_{N-1}].
+
+    Parameters:
+    Ad (numpy.ndarray): Discrete dynamics matrix.
+    Bd (numpy.ndarray): Discrete input matrix.
+    horizon (int): Number of predicted steps N.
+    powers (numpy.ndarray): state_powers(Ad, N), reused when only Bd changed.
+
+    Returns:
+    tuple: Sx (N*n, n) and Su (N*n, N*m).
+    """
+    n, m = Bd.shape
+    if powers is None:
+        powers = state_powers(Ad, horizon)
+    # Block (k, j) of Su is Ad^(k-j) Bd below the diagonal and zero above it
+    impulse = np.zeros((horizon + 1, n, m))
+    np.matmul(powers[:horizon], Bd, out=impulse[:horizon])
+    lag = np.subtract.outer(np.arange(horizon), np.arange(horizon))
+    Su = impulse[np.where(lag >= 0, lag, horizon)].transpose(0, 2, 1, 3)
+    return powers[1:].reshape(horizon * n, n), Su.reshape(horizon * n, horizon * m)
+
+
+def _shift(values, width):
+    """Move stacked per-step values one step forward and repeat the last step"""
+    if width == 0:
+        return values.copy()
+    shifted = np.empty_like(values)
+    shifted[:-width] = values[width:]
+    shifted[-width:] = values[-width:]
+    return shifted
+
+
+class MPC(Algorithm):
+    def __init__(self, A, B, Q, R, dt, horizon=20, Qf=None, u_min=None, u_max=None,
+                 x_min=None, x_max=None, model_signals=None, rho=None, sigma=1e-6,
+                 max_iter=500, tol=1e-4, cache_size=16, cache_tol=1e-9, alpha=1.6, rho_interval=10):
+        """
+        Initialize the model predictive controller for the zero-order-hold
+        discretization of the continuous system (A, B).
+
+        The condensed QP over the stacked inputs of the horizon is solved with
+        over-relaxed ADMM. Every solve starts with the penalty rho estimated
+        for the fastest rate on the first constrained system, and rho adapts
+        to the ratio of the primal and dual residuals during the solve
+        (residual balancing). Prediction
+        matrices, the QP Hessian and the ADMM system inverses are cached per
+        system; after a change of A or B only the system-dependent terms are
+        rebuilt, and the powers of Ad are kept when only B changed. Every solve is warm-started from the previous
+        solution shifted by one step. Infinite bounds are not constrained.
+
+        Parameters:
+        A (numpy.ndarray): Continuous system dynamics matrix, copied (model.A is updated in place).
+        B (numpy.ndarray): Continuous input matrix, copied.
+        Q (numpy.ndarray): State cost matrix.
+        R (numpy.ndarray): Input cost matrix.
+        dt (float): Sampling time of the control loop.
+        horizon (int): Number of predicted steps N.
+        Qf (numpy.ndarray): Terminal state cost, Q by default.
+        u_min, u_max (numpy.ndarray): Input bounds.
+        x_min, x_max (numpy.ndarray): State bounds.
+        model_signals (dataclass Signal): Model signals information.
+        rho (float): Initial ADMM penalty parameter, estimated for the first constrained solve if None.
+        sigma (float): ADMM regularization of the inputs.
+        max_iter (int): Maximal number of ADMM iterations per solve.
+        tol (float): Tolerance of the primal and dual residuals.
+        cache_size (int): Number of systems whose condensed QP data is kept.
+        cache_tol (float): Quantization step of the matrix entries in the cache key.
+        alpha (float): ADMM relaxation parameter in (0, 2).
+        rho_interval (int): Iterations between updates of rho, 0 keeps rho fixed.
+        """
+        self.A = np.array(A, dtype=float)
+        self.B = np.array(B, dtype=float)
+        self.Q = np.asarray(Q, dtype=float)
+        self.R = np.asarray(R, dtype=float)
+        self.Qf = self.Q if Qf is None else np.asarray(Qf, dtype=float)
+        self.dt = dt
+        self.horizon = horizon
+        n_states, n_inputs = np.shape(B)
+        self.u_min = np.full(n_inputs, -np.inf) if u_min is None else np.asarray(u_min, dtype=float)
+        self.u_max = np.full(n_inputs, np.inf) if u_max is None else np.asarray(u_max, dtype=float)
+        self.x_min = np.full(n_states, -np.inf) if x_min is None else np.asarray(x_min, dtype=float)
+        self.x_max = np.full(n_states, np.inf) if x_max is None else np.asarray(x_max, dtype=float)
+        self.reference = np.zeros(n_states)
+        self.rho = rho
+        self.sigma = sigma
+        self.alpha = alpha
+        self.rho_interval = rho_interval
+        self.max_iter = max_iter
+        self.tol = tol
+        self.cache = RiccatiCache(cache_size)
+        self.cache_tol = cache_tol
+        self.qp = None
+        self.U = None
+        self.iterations = 0
+        self.converged = True
+        self._y = None
+        # Penalty at the start of every solve
+        self._rho = rho
+        # Cost and constraint terms of the QP that do not depend on A and B
+        self._layout = None
+        # Last discrete dynamics matrix and its powers
+        self._powers = None
+        super().__init__(model_signals)
+
+        self.compute_gains()
+
+    @classmethod
+    def from_model(cls, model, Q, R, dt, horizon=20, **options):
+        """
+        Build the controller for the current matrices of a model, bounded by
+        the min/max of its input and output signals (the outputs are the
+        states of the model).
+
+        Parameters:
+        model (Model): Controlled model.
+        options: Further keyword arguments of MPC.
+
+        Returns:
+        MPC: Controller of the model.
+        """
+        options.setdefault('model_signals', model.output)
+        return cls(model.A, model.B, Q, R, dt, horizon,
+                   u_min=model.input_info.min, u_max=model.input_info.max,
+                   x_min=model.output_info.min, x_max=model.output_info.max, **options)
+
+    def _qp_layout(self, key, n, m):
+        """Cost weights and constraint rows of the QP, rebuilt only when costs, bounds or N change"""
+        if self._layout is not None and self._layout[0] == key:
+            return self._layout[1]
+        N = self.horizon
+        weights = np.zeros((N, n, n))
+        weights[:-1] = self.Q
+        weights[-1] = self.Qf
+        input_rows = np.flatnonzero(np.tile(np.isfinite(self.u_min) | np.isfinite(self.u_max), N))
+        state_rows = np.flatnonzero(np.tile(np.isfinite(self.x_min) | np.isfinite(self.x_max), N))
+        layout = {'weights': weights, 'R': np.kron(np.eye(N), self.R),
+                  'input_rows': input_rows, 'state_rows': state_rows,
+                  'G_inputs': np.eye(N * m)[input_rows],
+                  'lower': np.concatenate((np.tile(self.u_min, N)[input_rows], np.tile(self.x_min, N)[state_rows])),
+                  'upper': np.concatenate((np.tile(self.u_max, N)[input_rows], np.tile(self.x_max, N)[state_rows]))}
+        self._layout = (key, layout)
+        return layout
+
+    def _condense(self, layout_key):
+        Ad, Bd = zoh_discretize(np.asarray(self.A, dtype=float), np.asarray(self.B, dtype=float), self.dt)
+        n, m = Bd.shape
+        N = self.horizon
+        layout = self._qp_layout(layout_key, n, m)
+        if self._powers is None or len(self._powers[1]) != N + 1 or not np.array_equal(self._powers[0], Ad):
+            self._powers = (Ad, state_powers(Ad, N))
+        Sx, Su = condensed_matrices(Ad, Bd, N, self._powers[1])
+        QSu = (layout['weights'] @ Su.reshape(N, n, N * m)).reshape(N * n, N * m)
+        H = Su.T @ QSu
+        H += layout['R']
+        H = (H + H.T) / 2
+        # Linear term f = F x0 - W reference, the x_0 stage cost does not depend on U
+        F = QSu.T @ Sx
+        W = QSu.reshape(N, n, N * m).sum(axis=0).T
+
+        # Constraint rows: all bounded inputs, then bounded states of every step
+        state_rows = layout['state_rows']
+        G = np.vstack((layout['G_inputs'], Su[state_rows]))
+
+        H_factor = cho_factor(H)
+        K = cho_solve(H_factor, F)[:m]
+        K.flags.writeable = False
+        return {'Sx': Sx[state_rows], 'G': G, 'lower': layout['lower'], 'upper': layout['upper'],
+                'n_inputs': len(layout['input_rows']), 'widths': (len(layout['input_rows']) // N, len(state_rows) // N),
+                'H': H, 'F': F, 'W': W, 'H_factor': H_factor, 'K': K, 'admm_inverses': {}}
+
+    def _initial_rho(self):
+        """
+        Penalty 1 / sqrt(l_min l_max) of the nonzero eigenvalues of G H^-1 G^T,
+        which optimizes the ADMM convergence rate of the equality-constrained
+        QP (Ghadimi et al.); the same eigenvalues as the pencil (G^T G, H).
+        """
+        eigenvalues = eigh(self.qp['G'].T @ self.qp['G'], self.qp['H'], eigvals_only=True)
+        eigenvalues = eigenvalues[eigenvalues > 1e-10 * eigenvalues[-1]]
+        return float(1 / np.sqrt(eigenvalues[0] * eigenvalues[-1]))
+
+    def _admm_inverse(self, rho):
+        """Inverse of the ADMM system matrix for the penalty rho, kept per system"""
+        inverses = self.qp['admm_inverses']
+        if rho not in inverses:
+            G = self.qp['G']
+            factor = cho_factor(self.qp['H'] + self.sigma * np.eye(G.shape[1]) + rho * G.T @ G)
+            inverses[rho] = cho_solve(factor, np.eye(G.shape[1]))
+        return inverses[rho]
+
+    def compute_gains(self):
+        """
+        Build or fetch the condensed QP data of the current system and set K
+        to the gain of the unconstrained solution, u_0 = -K x. K is shared
+        with the cache and read-only.
+        """
+        layout_key = quantized_key(self.Q, self.R, self.Qf, self.u_min, self.u_max, self.x_min, self.x_max,
+                                   tol=self.cache_tol) + (self.horizon,)
+        key = quantized_key(self.A, self.B, tol=self.cache_tol) + layout_key + (self.dt, self.sigma)
+        qp = self.cache.get(key)
+        if qp is None:
+            qp = self._condense(layout_key)
+            self.cache.put(key, qp)
+        if self.qp is not None and len(qp['G']) != len(self.qp['G']):
+            self._y = None
+        self.qp = qp
+        self.K = qp['K']
+
+    def update_state_matrices(self, A, B):
+        """
+        Update the state-space matrices, the warm start of the solver is kept.
+
+        Parameters:
+        A (numpy.ndarray): New system dynamics matrix, copied.
+        B (numpy.ndarray): New input matrix, copied.
+        """
+        self.A = np.array(A, dtype=float)
+        self.B = np.array(B, dtype=float)
+        self.compute_gains()
+
+    def reset(self):
+        """Forget the warm start."""
+        self.U = None
+        self._y = None
+
+    @property
+    def duals(self):
+        """Multipliers of the constraint rows of the last solve, positive for active upper bounds"""
+        return self._y
+
+    def constraint_bounds(self, x):
+        """
+        Bounds of the constraint rows G U for the state x. Bounds of the
+        predicted states move with the free response Sx x.
+
+        Returns:
+        tuple: Lower and upper bounds.
+        """
+        qp = self.qp
+        free = np.concatenate((np.zeros(qp['n_inputs']), qp['Sx'] @ x))
+        return qp['lower'] - free, qp['upper'] - free
+
+    def solve(self, x):
+        """
+        Solve the constrained QP for the current state.
+
+        Parameters:
+        x (numpy.ndarray): Current state vector.
+
+        Returns:
+        numpy.ndarray: Optimal inputs of the horizon (N, n_inputs).
+        """
+        qp = self.qp
+        m = qp['K'].shape[0]
+        x = np.asarray(x, dtype=float)
+        f = qp['F'] @ x - qp['W'] @ self.reference
+        G = qp['G']
+        lower, upper = self.constraint_bounds(x)
+
+        # The unconstrained optimum is the solution when it is feasible
+        U = -cho_solve(qp['H_factor'], f)
+        GU = G @ U
+        if np.all(GU >= lower) and np.all(GU <= upper):
+            self.iterations = 0
+            self.converged = True
+            return self._store(U, np.zeros(len(G)), m)
+
+        if self.U is not None and self._y is not None:
+            U = _shift(self.U, m)
+            z = np.clip(G @ U, lower, upper)
+            n_inputs = qp['n_inputs']
+            y = np.concatenate((_shift(self._y[:n_inputs], qp['widths'][0]),
+                                _shift(self._y[n_inputs:], qp['widths'][1])))
+        else:
+            z = np.clip(GU, lower, upper)
+            y = np.zeros(len(G))
+        if self._rho is None:
+            self._rho = self._initial_rho()
+        # Adapted values are not kept, infeasible states would drive them away
+        rho = self._rho
+        inverse = self._admm_inverse(rho)
+        H = qp['H']
+        alpha = self.alpha
+        sigma = self.sigma
+        self.converged = False
+        for iteration in range(1, self.max_iter + 1):
+            U = inverse @ (sigma * U - f + G.T @ (rho * z - y))
+            GU = G @ U
+            relaxed = alpha * GU + (1 - alpha) * z
+            z = np.clip(relaxed + y / rho, lower, upper)
+            y += rho * (relaxed - z)
+            primal = np.max(np.abs(GU - z))
+            adapt = self.rho_interval and iteration % self.rho_interval == 0
+            if primal > self.tol and not adapt:
+                continue
+            # Dual residual of the KKT conditions, only needed for the checks
+            Gy = G.T @ y
+            HU = H @ U
+            dual = np.max(np.abs(HU + f + Gy))
+            if primal <= self.tol and dual <= self.tol:
+                self.converged = True
+                break
+            if adapt:
+                # Residual balancing: a large primal residual asks for a larger penalty
+                ratio = np.sqrt(primal / max(dual, 1e-12))
+                if ratio > 5 or ratio < 0.2:
+                    # Quarter decades, so inverses are reused across solves
+                    rho = 10 ** (np.round(4 * np.log10(np.clip(rho * ratio, 1e-6, 1e6))) / 4)
+                    inverse = self._admm_inverse(rho)
+        self.iterations = iteration
+        return self._store(U, y, m)
+
+    def _store(self, U, y, m):
+        # Kept for the warm start of the next solve
+        self.U = U
+        self._y = y
+        return U.reshape(self.horizon, m)
+
+    def control_input(self, x, out=None):
+        """
+        Compute the feedback for the current state x. Like LQR.control_input
+        it returns -u_0, so the applied input is control = desired - feedback
+        with desired = 0 (set self.reference to move the regulated state).
+
+        Parameters:
+        x (numpy.ndarray): Current state vector.
+        out (numpy.ndarray): Optional preallocated array for the result.
+
+        Returns:
+        numpy.ndarray: Feedback vector -u_0.
+        """
+        if self.qp is None:
+            raise ValueError("The QP matrices have not been computed.")
+        feedback = -self.solve(x)[0]
+        if out is None:
+            return feedback
+        np.copyto(out, feedback)
+        return out
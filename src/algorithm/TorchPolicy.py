@@ -0,0 +1,172 @@
+import warnings
+import numpy as np
+import torch
+from src.algorithm.Algorithm import Algorithm
+from src.model.Crane1D import Crane1D
+from src.utils.integrators import rk4_step
+
+
+def as_tensor(array):
+    """
+    Share the memory of a NumPy array with a CPU tensor (torch.from_numpy).
+    Read-only arrays such as the cached LQR gains are shared as well, the
+    returned tensor must then not be modified in place.
+    """
+    array = np.asarray(array)
+    if array.flags.writeable:
+        return torch.from_numpy(array)
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='The given NumPy array is not writable')
+        return torch.from_numpy(array)
+
+
+class TorchPolicy(Algorithm):
+    def __init__(self, algorithm, residual=None, model_signals=None):
+        """
+        Evaluate the feedback of an Algorithm, plus an optional learned
+        residual policy, on batches of states held in torch tensors.
+
+        The gain of the wrapped algorithm is shared with torch without
+        copying, so a gain update of the algorithm only changes which array
+        is wrapped. The applied input is u = -K x + residual(x), returned as
+        feedback K x - residual(x) so that control = desired - feedback like
+        for LQR.control_input.
+
+        Parameters:
+        algorithm (Algorithm): Controller providing the gain K, e.g. LQR.
+        residual (callable): residual(x) -> (N, n_inputs) tensor, e.g. a torch.nn.Module.
+        model_signals (dataclass Signal): Model signals information.
+        """
+        super().__init__(model_signals)
+        self.algorithm = algorithm
+        self.residual = residual
+        self._K_tensor = None
+        self.K = algorithm.K
+
+    @property
+    def K_tensor(self):
+        """Gain of the wrapped algorithm as a tensor sharing its memory"""
+        K = self.algorithm.K
+        if self._K_tensor is None or self._K_tensor[0] is not K:
+            self._K_tensor = (K, as_tensor(K))
+        return self._K_tensor[1]
+
+    def compute_gains(self):
+        """
+        Recompute the gains of the wrapped algorithm.
+        """
+        self.algorithm.compute_gains()
+        self.K = self.algorithm.K
+
+    def update_state_matrices(self, A, B):
+        """
+        Update the state-space matrices of the wrapped algorithm.
+
+        Parameters:
+        A (numpy.ndarray): New system dynamics matrix.
+        B (numpy.ndarray): New input matrix.
+        """
+        self.algorithm.update_state_matrices(A, B)
+        self.K = self.algorithm.K
+
+    def control_input(self, x, out=None):
+        """
+        Compute the feedback for a state (n,) or batch of states (N, n).
+
+        NumPy states are wrapped without copying and the result is returned
+        as a NumPy array; tensors stay tensors.
+
+        Parameters:
+        x (numpy.ndarray or torch.Tensor): Current states.
+        out (numpy.ndarray or torch.Tensor): Optional preallocated result of the same type as x.
+
+        Returns:
+        numpy.ndarray or torch.Tensor: Feedback K x - residual(x).
+        """
+        is_numpy = isinstance(x, np.ndarray)
+        states = as_tensor(x) if is_numpy else x
+        K = self.K_tensor.to(states.dtype)
+        feedback = states @ K.T
+        if self.residual is not None:
+            feedback = feedback - self.residual(states)
+        if out is not None:
+            (as_tensor(out) if is_numpy else out).copy_(feedback)
+            return out
+        return feedback.detach().numpy() if is_numpy else feedback
+
+
+def crane_dynamics(model):
+    """
+    Nonlinear Crane1D dynamics evaluated on tensors, sharing the physics of
+    Crane1D.dynamics through its array namespace and using the current
+    masses of the model.
+
+    Parameters:
+    model (Crane1D): Crane model, other models raise TypeError.
+
+    Returns:
+    callable: rhs(states (N, 6), inputs (N, 2)) -> derivatives (N, 6).
+    """
+    if not isinstance(model, Crane1D):
+        raise TypeError(f"The nonlinear rollout needs a Crane1D model, got {type(model).__name__}!")
+    payload_mass = model.get_param('Payload mass')
+    cart_mass = model.get_param('Cart mass')
+
+    def rhs(states, inputs):
+        return model.dynamics(states, inputs, payload_mass=payload_mass, cart_mass=cart_mass, xp=torch)
+    return rhs
+
+
+def rollout(policy, model, states, steps, dt, method='rk4', substeps=1, desired=None):
+    """
+    Closed-loop rollout of N model instances kept in torch for the whole episode.
+
+    Inputs control = desired - policy.control_input(x) are saturated to the
+    input signal bounds. 'rk4' integrates the nonlinear Crane1D dynamics
+    (TypeError for other models), 'zoh' steps the zero-order-hold discretization of the current linear model.
+    Without torch.no_grad the episode stays differentiable, e.g. for a residual policy.
+
+    Parameters:
+    policy (TorchPolicy): Policy evaluated on the state batch.
+    model (Model): Model providing the dynamics, bounds and matrices.
+    states (torch.Tensor): Initial states (N, n).
+    steps (int): Number of control steps.
+    dt (float): Control step.
+    method (str): 'rk4' or 'zoh'.
+    substeps (int): RK4 steps per control step.
+    desired (torch.Tensor): Desired input offset, zeros by default.
+
+    Returns:
+    tuple: Inputs (N, steps, n_inputs) and states after every step (N, steps, n).
+    """
+    dtype = states.dtype
+    u_min = torch.as_tensor(model.input_info.min, dtype=dtype)
+    u_max = torch.as_tensor(model.input_info.max, dtype=dtype)
+    match method:
+        case 'rk4':
+            rhs = crane_dynamics(model)
+            h = dt / substeps
+
+            def advance(x, u):
+                for _ in range(substeps):
+                    x = rk4_step(rhs, x, u, h)
+                return x
+        case 'zoh':
+            Ad, Bd = (torch.as_tensor(matrix, dtype=dtype) for matrix in model.discretize(dt))
+
+            def advance(x, u):
+                return x @ Ad.T + u @ Bd.T
+        case _:
+            raise ValueError(f"Unknown rollout method '{method}'!")
+
+    inputs = []
+    trajectory = []
+    x = states
+    for _ in range(steps):
+        feedback = policy.control_input(x)
+        u = -feedback if desired is None else desired - feedback
+        u = torch.clamp(u, u_min, u_max)
+        x = advance(x, u)
+        inputs.append(u)
+        trajectory.append(x)
+    return torch.stack(inputs, dim=1), torch.stack(trajectory, dim=1)
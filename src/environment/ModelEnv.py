@@ -0,0 +1,73 @@
+import numpy as np
+import gym
+from gym import spaces
+
+
+def signal_space(signal_info):
+    """Box space bounded by the min/max values of the signals"""
+    return spaces.Box(low=np.array(signal_info.min), high=np.array(signal_info.max), dtype=np.float64)
+
+
+def quadratic_reward(y, u, target, Q, R):
+    """
+    Negative quadratic cost of the tracking error and the input.
+    Works for single vectors and for (K, n) batches.
+    """
+    error = y - target
+    return -(np.einsum('...i,ij,...j->...', error, Q, error) + np.einsum('...i,ij,...j->...', u, R, u))
+
+
+class ModelEnv(gym.Env):
+    metadata = {'render_modes': []}
+
+    def __init__(self, model, dt=0.1, target=None, Q=None, R=None, max_steps=200):
+        """
+        Gym environment stepping a Model with zero-order-hold discretization.
+
+        Observations are the model outputs and actions its inputs, both
+        bounded by the min/max values of the Signal descriptions. Actions are
+        clipped to the input bounds and an episode terminates when the
+        output leaves its bounds.
+
+        Parameters:
+        model (Model): Simulated model.
+        dt (float): Sampling time.
+        target (numpy.ndarray): Desired output, zeros by default.
+        Q (numpy.ndarray): Output error weight of the reward, identity by default.
+        R (numpy.ndarray): Input weight of the reward, identity by default.
+        max_steps (int): Number of steps after which the episode is truncated.
+        """
+        self.model = model
+        self.dt = dt
+        n_outputs = len(model.output_info)
+        n_inputs = len(model.input_info)
+        self.target = np.zeros(n_outputs) if target is None else np.asarray(target, dtype=float)
+        self.Q = np.eye(n_outputs) if Q is None else np.asarray(Q, dtype=float)
+        self.R = np.eye(n_inputs) if R is None else np.asarray(R, dtype=float)
+        self.max_steps = max_steps
+        self.observation_space = signal_space(model.output_info)
+        self.action_space = signal_space(model.input_info)
+        self.steps = 0
+        self._action = np.zeros(n_inputs)
+        self._observation = np.zeros(n_outputs)
+
+    def reset(self, *, seed=None, options=None):
+        """
+        Reset the model to its initial state, or to options['state'] if given.
+        """
+        super().reset(seed=seed)
+        state = self.model._init_state if options is None else options.get('state', self.model._init_state)
+        self.model.init_state(np.array(state, dtype=float))
+        self.steps = 0
+        self._observation = self.model.C @ self.model.state
+        return self._observation.copy(), {}
+
+    def step(self, action):
+        np.clip(action, self.action_space.low, self.action_space.high, out=self._action)
+        self.model.step(self._action, self.dt, out=self._observation)
+        self.steps += 1
+        reward = float(quadratic_reward(self._observation, self._action, self.target, self.Q, self.R))
+        terminated = bool(np.any(self._observation < self.observation_space.low)
+                          or np.any(self._observation > self.observation_space.high))
+        truncated = self.steps >= self.max_steps
+        return self._observation.copy(), reward, terminated, truncated, {}
@@ -0,0 +1,97 @@
+import numpy as np
+from gym.vector import VectorEnv
+from src.environment.ModelEnv import signal_space, quadratic_reward
+from src.utils.discretization import zoh_discretize, zoh_discretize_batch
+
+
+class VectorModelEnv(VectorEnv):
+    def __init__(self, model, num_envs, dt=0.1, target=None, Q=None, R=None, max_steps=200, A=None, B=None):
+        """
+        Vectorized environment stepping num_envs instances of a Model in one
+        batched NumPy call, with automatic reset of finished instances.
+
+        The reward, bounds and termination rules are the same as in ModelEnv.
+        Finished instances are reset to the initial state of the model and
+        their last observation is returned in infos['final_observation'].
+
+        Parameters:
+        model (Model): Model providing signals, initial state and matrices.
+        num_envs (int): Number of instances.
+        dt (float): Sampling time.
+        target (numpy.ndarray): Desired output, zeros by default.
+        Q (numpy.ndarray): Output error weight of the reward, identity by default.
+        R (numpy.ndarray): Input weight of the reward, identity by default.
+        max_steps (int): Number of steps after which an episode is truncated.
+        A (numpy.ndarray): Optional per-instance system matrices (num_envs, n, n).
+        B (numpy.ndarray): Optional per-instance input matrices (num_envs, n, m).
+        """
+        super().__init__(num_envs, signal_space(model.output_info), signal_space(model.input_info))
+        self.model = model
+        self.dt = dt
+        n_outputs = len(model.output_info)
+        n_inputs = len(model.input_info)
+        self.target = np.zeros(n_outputs) if target is None else np.asarray(target, dtype=float)
+        self.Q = np.eye(n_outputs) if Q is None else np.asarray(Q, dtype=float)
+        self.R = np.eye(n_inputs) if R is None else np.asarray(R, dtype=float)
+        self.max_steps = max_steps
+        self.low = self.single_observation_space.low
+        self.high = self.single_observation_space.high
+        self.action_low = self.single_action_space.low
+        self.action_high = self.single_action_space.high
+
+        self.C = model.C.copy()
+        self.D = model.D.copy()
+        if A is None and B is None:
+            self.Ad, self.Bd = zoh_discretize(model.A, model.B, dt)
+            self.batched = False
+        else:
+            A = np.broadcast_to(model.A if A is None else A, (num_envs,) + model.A.shape)
+            B = np.broadcast_to(model.B if B is None else B, (num_envs,) + model.B.shape)
+            self.Ad, self.Bd = zoh_discretize_batch(A, B, dt)
+            self.batched = True
+
+        self.init_states = np.tile(np.asarray(model._init_state, dtype=float), (num_envs, 1))
+        self.states = self.init_states.copy()
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self._actions = np.zeros((num_envs, n_inputs))
+
+    def reset_wait(self, seed=None, options=None):
+        """
+        Reset all instances to the initial state, or to options['state'] of
+        shape (num_envs, n_states) if given.
+        """
+        if options is not None and 'state' in options:
+            self.init_states = np.array(options['state'], dtype=float).reshape(self.init_states.shape)
+        self.states = self.init_states.copy()
+        self.steps[:] = 0
+        return self.states @ self.C.T, {}
+
+    def step_async(self, actions):
+        np.clip(actions, self.action_low, self.action_high, out=self._actions)
+
+    def step_wait(self):
+        u = self._actions
+        if self.batched:
+            self.states = np.einsum('kij,kj->ki', self.Ad, self.states) + np.einsum('kij,kj->ki', self.Bd, u)
+        else:
+            self.states = self.states @ self.Ad.T + u @ self.Bd.T
+        observations = self.states @ self.C.T + u @ self.D.T
+        self.steps += 1
+
+        rewards = quadratic_reward(observations, u, self.target, self.Q, self.R)
+        terminated = np.any((observations < self.low) | (observations > self.high), axis=1)
+        truncated = self.steps >= self.max_steps
+        infos = {}
+
+        done = terminated | truncated
+        if np.any(done):
+            final = np.empty(self.num_envs, dtype=object)
+            for k in np.flatnonzero(done):
+                final[k] = observations[k].copy()
+            infos['final_observation'] = final
+            infos['_final_observation'] = done
+            # Auto-reset finished instances
+            self.states[done] = self.init_states[done]
+            self.steps[done] = 0
+            observations[done] = self.states[done] @ self.C.T
+        return observations, rewards, terminated, truncated, infos
@@ -1,12 +1,32 @@
 import numpy as np
 from scipy.constants import g, pi
-from scipy.signal import StateSpace
 from src.model.Model import Model, Signal, Parameter
+from src.utils.integrators import integrate
 
 
 class Crane1D(Model):
-    def __init__(self):
-        self.sys = None
+    # Position/velocity pairs of the state vector, used by semi-implicit integrators
+    positions = [0, 2, 4]
+    velocities = [1, 3, 5]
+
+    # Constant structure of the linearized state-space matrices
+    matrix_template = {'A': [[0, 1, 0, 0, 0, 0],
+                             [0, 0, 0, 0, 0, 0],
+                             [0, 0, 0, 1, 0, 0],
+                             [0, 0, 0, 0, 0, 0],
+                             [0, 0, 0, 0, 0, 1],
+                             [0, 0, 0, 0, 0, 0]],
+                       'B': np.zeros((6, 2)),
+                       'C': np.eye(6),
+                       'D': np.zeros((6, 2))}
+    # Entries depending on cart mass m_c, payload mass m_p and sling length l
+    matrix_entries = {('A', 1, 2): 'm_p * g / m_c',
+                      ('A', 3, 2): '-g * (m_c + m_p) / m_c / l',
+                      ('B', 1, 0): '1 / m_c',
+                      ('B', 3, 0): '-1 / m_c / l',
+                      ('B', 5, 1): '1 / 2 / m_p'}
+
+    def __init__(self, profiler=None):
         self.input  = [Signal('Drive force on cart', 'N', -2, 2, 'F_x'),
                        Signal('Drive force on payload', 'N', -2, 2, 'F_l')]
         self.output = [Signal('Cart position', 'm', 0, 2, 'x'),
@@ -18,7 +38,7 @@ class Crane1D(Model):
         self.parameters = [Parameter('Cart mass', 'kg', 1, 'm_c'),
                            Parameter('Payload mass', 'kg', 2, 'm_p')]
         init_state = [0, 0, 0, 0, 0.1, 0]
-        super().__init__(init_state)
+        super().__init__(init_state, profiler)
 
     def update_matrices(self, payload_mass=None, sling_length=None):
         if payload_mass is None:
@@ -29,36 +49,82 @@ class Crane1D(Model):
         self.set_param('Payload mass', payload_mass)
         self.state[4] = sling_length
 
+        self.update_matrix_entries(m_c=cart_mass, m_p=payload_mass, l=sling_length)
+
+    def dynamics(self, states, inputs, payload_mass=None, cart_mass=None, xp=np):
+        """
+        Nonlinear right-hand side of the crane equations of motion.
+
+        Vectorized over leading batch dimensions; masses may be scalars or
+        arrays broadcastable to the batch shape. The array namespace xp selects
+        the backend, e.g. torch for tensors, so every backend shares these physics.
+
+        Parameters:
+        states (numpy.ndarray): States, shape (..., 6).
+        inputs (numpy.ndarray): Drive forces, shape (..., 2).
+        payload_mass (float or numpy.ndarray): Defaults to the 'Payload mass' parameter.
+        cart_mass (float or numpy.ndarray): Defaults to the 'Cart mass' parameter.
+        xp (module): Array namespace providing sin, cos and stack, numpy by default.
+
+        Returns:
+        numpy.ndarray: State derivatives, shape (..., 6), of the type of xp.
+        """
+        if payload_mass is None:
+            payload_mass = self.get_param('Payload mass')
+        if cart_mass is None:
+            cart_mass = self.get_param('Cart mass')
+        if xp is np:
+            states = np.asarray(states, dtype=float)
+            inputs = np.asarray(inputs, dtype=float)
+        v_x = states[..., 1]
+        alpha = states[..., 2]
+        omega = states[..., 3]
+        length = states[..., 4]
+        v_l = states[..., 5]
+        force_x = inputs[..., 0]
+        force_l = inputs[..., 1]
+        sin_a = xp.sin(alpha)
+        cos_a = xp.cos(alpha)
+
+        # Cart with a pendulum of variable length, angle measured from the vertical
+        a_x = (force_x + payload_mass * sin_a * (g * cos_a + length * omega ** 2)) \
+            / (cart_mass + payload_mass * sin_a ** 2)
+        a_alpha = -(a_x * cos_a + g * sin_a + 2 * v_l * omega) / length
+        a_l = force_l / 2 / payload_mass
+
+        derivatives = (v_x, a_x, omega, a_alpha, v_l, a_l)
+        if xp is np:
+            return np.stack(np.broadcast_arrays(*derivatives), axis=-1)
+        return xp.stack(xp.broadcast_tensors(*derivatives), dim=-1)
+
+    def simulate_nonlinear(self, states, u, dt, method='rk4', substeps=1, payload_mass=None):
+        """
+        Integrate the nonlinear dynamics of N cranes with fixed-step integrators.
+
+        The internal state of the model is not modified.
+
+        Parameters:
+        states (numpy.ndarray): Initial states, shape (N, 6).
+        u (numpy.ndarray): Inputs, shape (N, T, 2), held over every control step.
+        dt (float): Control step.
+        method (str): 'rk4' or 'semi_implicit_euler'.
+        substeps (int): Number of integrator steps per control step.
+        payload_mass (float or numpy.ndarray): Scalar or per-instance payload masses, shape (N,).
+
+        Returns:
+        numpy.ndarray: States after every control step, shape (N, T, 6).
+        """
+        if payload_mass is None:
+            payload_mass = self.get_param('Payload mass')
+        cart_mass = self.get_param('Cart mass')
+
+        def rhs(x, u_k):
+            return self.dynamics(x, u_k, payload_mass=payload_mass, cart_mass=cart_mass)
 
-        matrix_a = [[0, 1, 0, 0, 0, 0],
-             [0, 0, payload_mass * g / cart_mass, 0, 0, 0],
-             [0, 0, 0, 1, 0, 0],
-             [0, 0, -g*(cart_mass + payload_mass) / cart_mass / sling_length, 0, 0, 0],
-             [0, 0, 0, 0, 0, 1],
-             [0, 0, 0, 0, 0, 0]]
-
-        matrix_b = [[0, 0],
-             [1 / cart_mass, 0],
-             [0, 0],
-             [-1 / cart_mass / sling_length, 0],
-             [0, 0],
-             [0, 1 / 2 / payload_mass]]
-
-        matrix_c = [[1, 0, 0, 0, 0, 0],
-             [0, 1, 0, 0, 0, 0],
-             [0, 0, 1, 0, 0, 0],
-             [0, 0, 0, 1, 0, 0],
-             [0, 0, 0, 0, 1, 0],
-             [0, 0, 0, 0, 0, 1]]
-
-        matrix_d = [[0, 0],
-             [0, 0],
-             [0, 0],
-             [0, 0],
-             [0, 0],
-             [0, 0]]
-
-        self.sys = StateSpace(matrix_a, matrix_b, matrix_c, matrix_d)
+        kwargs = {}
+        if method == 'semi_implicit_euler':
+            kwargs = {'positions': self.positions, 'velocities': self.velocities}
+        return integrate(rhs, np.array(states, dtype=float, ndmin=2), u, dt, method, substeps, **kwargs)
 
 
 if __name__ == "__main__":
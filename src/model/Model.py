@@ -1,9 +1,17 @@
+import numbers
+import operator
 import numpy as np
+from collections import namedtuple
+from contextlib import contextmanager
 from dataclasses import dataclass
 from abc import abstractmethod
-import pandas as pd
-from scipy.signal import lsim
-from src.utils.helpers import get_signal_info
+from src.utils.helpers import describe_signals
+from src.utils.discretization import zoh_discretize, zoh_discretize_batch
+from src.utils.lti import block_matrices, simulate_blocks, simulate_fft
+from src.utils.ringbuffer import RingBufferLogger
+from src.utils.derivative import get_backend
+from src.utils.expressions import compile_matrix_builder, symbol_identifier
+from src.utils.profiling import MODEL_STAGES, LOGGER_STAGES, Profiler
 from abc import ABC, abstractmethod
 
 
@@ -14,6 +22,14 @@ class Signal:
     min:  float
     max:  float
     symbol: str
+    # Incremented on every creation or change of any Signal. The counter is
+    # class-global, so any Signal, also an unrelated one, invalidates every
+    # cached SignalInfo of Model and Algorithm (rebuilt on the next access)
+    revision = 0
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        Signal.revision += 1
 
 @dataclass
 class Parameter:
@@ -23,21 +39,235 @@ class Parameter:
     symbol: str
 
 
+StateMatrices = namedtuple('StateMatrices', ['A', 'B', 'C', 'D'])
+
+
 class Model(ABC):
-    def __init__(self, init_state=None):
+    _input = None
+    _output = None
+    # Cached (Signal.revision, SignalInfo) of the input and output signals
+    _input_info = None
+    _output_info = None
+    _sys = None
+    # Live state-space matrices, updated in place
+    A = None
+    B = None
+    C = None
+    D = None
+    # Incremented on every change of the matrices
+    matrices_version = 0
+    # Declarative description of the matrices for subclasses:
+    # matrix_template maps 'A'..'D' to the constant structure and
+    # matrix_entries maps (matrix, row, column) to an expression of the
+    # Parameter symbols and state symbols
+    matrix_template = None
+    matrix_entries = {}
+    # Symbols of the state vector, the output symbols when None
+    state_symbols = None
+    # Compiled matrix builders shared by all instances of a class
+    _builders = {}
+    profiler = None
+    # Clip inputs to the min/max of the input signals in simulate, step and simulate_batch
+    saturate_inputs = True
+
+    def __init__(self, init_state=None, profiler=None):
         self.state = None
+        self._zoh = None
+        self._blocks = None
+        self._buffers = None
+        self._backends = {}
+        self.backend = get_backend('lsim')
+        self._param_index = {p.name: i for i, p in enumerate(getattr(self, 'parameters', []))}
         if init_state is None:
             raise ValueError("No initial state provided!")
         self._init_state = init_state
         self.init_state(init_state)
+        self._init_matrices()
         self.update_matrices()
+        if profiler is not None:
+            self.set_profiler(profiler)
+
+    def set_profiler(self, profiler):
+        """
+        Time integration and matrix updates with a Profiler, or stop timing with None.
+        Without a profiler the methods run unwrapped.
+        """
+        if self.profiler is not None:
+            self.profiler.uninstrument(self, MODEL_STAGES)
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.instrument(self, MODEL_STAGES)
+
+    def __getstate__(self):
+        state = Profiler.unprofiled_state(self, MODEL_STAGES)
+        # The generated builder cannot be pickled, it is compiled again from matrix_entries
+        state.pop('_matrix_builder', None)
+        return state
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.matrix_template is not None:
+            self._matrix_builder = self._compiled_builder()[0]
 
     @abstractmethod
     def update_matrices(self):
         """Abstract method to calculate state-space matrixes"""
         pass
 
+    def _compiled_builder(self):
+        """Matrix builder and its variables, compiled once per model class"""
+        cls = type(self)
+        if cls not in Model._builders:
+            Model._builders[cls] = compile_matrix_builder(self.matrix_entries)
+        return Model._builders[cls]
+
+    def _init_matrices(self):
+        """Allocate the matrices from the template and compile the parametric entries"""
+        if self.matrix_template is None:
+            return
+        self._template = {name: np.array(self.matrix_template[name], dtype=float) for name in 'ABCD'}
+        for name in 'ABCD':
+            setattr(self, name, self._template[name].copy())
+        self._matrix_builder, variables = self._compiled_builder()
+
+        # Where the default value of every variable is read from
+        sources = {}
+        for i, p in enumerate(getattr(self, 'parameters', [])):
+            sources[symbol_identifier(p.symbol)] = ('parameter', i)
+        state_symbols = self.state_symbols
+        if state_symbols is None:
+            state_symbols = [signal.symbol for signal in self.output]
+        for i, symbol in enumerate(state_symbols):
+            sources.setdefault(symbol_identifier(symbol), ('state', i))
+        missing = [name for name in variables if name not in sources]
+        if missing:
+            raise ValueError(f"Unknown symbols in matrix expressions: {', '.join(missing)}!")
+        self._matrix_variables = {name: sources[name] for name in variables}
+
+    def matrix_values(self, **values):
+        """
+        Values of all variables of the matrix expressions.
+
+        Parameters:
+        values: Values by symbol, scalars or arrays. Missing symbols take the
+            current parameter values and state.
+
+        Returns:
+        dict: Value of every variable.
+        """
+        for name in values:
+            if name not in self._matrix_variables:
+                raise ValueError(f"Unknown symbol '{name}'!")
+        result = {}
+        for name, (source, index) in self._matrix_variables.items():
+            if name in values:
+                result[name] = values[name]
+            elif source == 'parameter':
+                result[name] = self.parameters[index].value
+            else:
+                result[name] = self.state[index]
+        return result
+
+    def update_matrix_entries(self, **values):
+        """
+        Write the parametric entries of the matrices in place.
+
+        Parameters:
+        values: Values by symbol, missing symbols take the current parameter values and state.
+        """
+        self._matrix_builder(self.A, self.B, self.C, self.D, **self.matrix_values(**values))
+        self.matrices_version += 1
+
+    def evaluate_matrices(self, **values):
+        """
+        Evaluate the matrices for one point or a batch of parameter values
+        without changing the model.
+
+        Parameters:
+        values: Values by symbol, arrays are broadcast against each other.
+            Missing symbols take the current parameter values and state.
+
+        Returns:
+        StateMatrices: Arrays of shape batch_shape + matrix shape.
+        """
+        values = self.matrix_values(**values)
+        shape = np.broadcast_shapes(*(np.shape(value) for value in values.values()))
+        matrices = [np.array(np.broadcast_to(self._template[name], shape + self._template[name].shape))
+                    for name in 'ABCD']
+        self._matrix_builder(*matrices, **values)
+        return StateMatrices(*matrices)
+
+    @property
+    def matrices(self):
+        """Live (A, B, C, D) arrays, changed in place by update_matrices"""
+        return StateMatrices(self.A, self.B, self.C, self.D)
+
+    @property
+    def sys(self):
+        """StateSpace of the current matrices, built only when requested after a change"""
+        if self._sys is None or self._sys_version != self.matrices_version:
+            if self.A is None:
+                return None
+            from scipy.signal import StateSpace
+            self._sys = StateSpace(self.A.copy(), self.B.copy(), self.C.copy(), self.D.copy())
+            self._sys_version = self.matrices_version
+        return self._sys
+
+    @sys.setter
+    def sys(self, value):
+        self._sys = value
+        if value is None:
+            return
+        # Models assigning a StateSpace directly keep working through the arrays
+        self.A = np.array(value.A, dtype=float)
+        self.B = np.array(value.B, dtype=float)
+        self.C = np.array(value.C, dtype=float)
+        self.D = np.array(value.D, dtype=float)
+        self.matrices_version += 1
+        self._sys_version = self.matrices_version
+
+    @property
+    def input(self):
+        """Input signals, assign a new list to change them"""
+        return self._input
+
+    @input.setter
+    def input(self, signals):
+        self._input = signals
+        self._input_info = None
+
+    @property
+    def output(self):
+        """Output signals, assign a new list to change them"""
+        return self._output
+
+    @output.setter
+    def output(self, signals):
+        self._output = signals
+        self._output_info = None
+
+    @property
+    def input_info(self):
+        """
+        Precomputed SignalInfo of the inputs, rebuilt when self.input is
+        assigned or when any Signal is created or changed, since Signal.revision
+        is class-global.
+        """
+        if self._input_info is None or self._input_info[0] != Signal.revision:
+            self._input_info = (Signal.revision, describe_signals(self.input))
+        return self._input_info[1]
+
+    @property
+    def output_info(self):
+        """
+        Precomputed SignalInfo of the outputs, rebuilt when self.output is
+        assigned or when any Signal is created or changed, since Signal.revision
+        is class-global.
+        """
+        if self._output_info is None or self._output_info[0] != Signal.revision:
+            self._output_info = (Signal.revision, describe_signals(self.output))
+        return self._output_info[1]
+
     def init_state(self, init_state):
         """Function run at the init of the object, set initial state"""
         self.state = np.array(init_state)
@@ -45,11 +275,52 @@ class Model(ABC):
     def check_state(self, new_state=None):
         if new_state is None:
             new_state = self.state
-        min_state = np.array([param.min for param in self.output])
-        max_state = np.array([param.max for param in self.output])
-        if any(new_state < min_state) or any(new_state > max_state):
+        if np.any(self.state_violations(new_state)):
             raise ValueError("State out of bounds!")
 
+    def state_violations(self, states=None, out=None):
+        """
+        Mark state entries outside the min/max of the signal descriptions.
+
+        Parameters:
+        states (numpy.ndarray): State (n,) or batch of states (N, n), the current state by default.
+        out (numpy.ndarray): Optional boolean array for the mask.
+
+        Returns:
+        numpy.ndarray: Boolean mask with the shape of states.
+        """
+        if states is None:
+            states = self.state
+        info = self.output_info
+        mask = np.less(states, info.min, out=out)
+        mask |= np.greater(states, info.max)
+        return mask
+
+    def violated(self, states=None):
+        """
+        Check the bounds for a single state or per instance of a batch.
+
+        Returns:
+        numpy.ndarray or bool: True for every state (row) with any entry out of bounds.
+        """
+        return np.any(self.state_violations(states), axis=-1)
+
+    def saturate(self, u, out=None):
+        """
+        Clip inputs to the min/max of the input signals.
+
+        Parameters:
+        u (numpy.ndarray): Input (m,) or inputs of any batch shape (..., m).
+        out (numpy.ndarray): Optional array for the result, may be u itself.
+
+        Returns:
+        numpy.ndarray: Saturated inputs.
+        """
+        info = self.input_info
+        # maximum/minimum are cheaper than np.clip for the small single-step vectors
+        out = np.maximum(u, info.min, out=out)
+        return np.minimum(out, info.max, out=out)
+
     def set_state(self, new_state):
         self.check_state(new_state)
         self.state = new_state
@@ -59,55 +330,342 @@ class Model(ABC):
 
     def create_init_dict(self):
         # Create input dataframe
-        signal_info = get_signal_info(self.input)
-        input_data = {name: [] for name in signal_info['name']}
+        input_data = {name: [] for name in self.input_info.names}
         # Create output dataframe
-        signal_info = get_signal_info(self.output)
-        output_data = {name: [] for name in signal_info['name']}
+        output_data = {name: [] for name in self.output_info.names}
         return input_data, output_data
 
-    def simulate(self, u, dt=None, t=None):
+    def create_loggers(self, capacity):
+        """
+        Create preallocated ring-buffer loggers for input and output signals.
+
+        Parameters:
+        capacity (int): Number of steps kept by each logger.
+
+        Returns:
+        tuple: Input and output RingBufferLogger.
+        """
+        loggers = RingBufferLogger(self.input, capacity), RingBufferLogger(self.output, capacity)
+        if self.profiler is not None:
+            for logger in loggers:
+                self.profiler.instrument(logger, LOGGER_STAGES)
+        return loggers
+
+    def discretize(self, dt):
+        """
+        Zero-order-hold discretization of the current state-space system.
+
+        The result is kept until the matrices or the time step change.
+
+        Parameters:
+        dt (float): Sampling time.
+
+        Returns:
+        tuple: Discrete matrices (Ad, Bd).
+        """
+        if self._zoh is None or self._zoh[0] != self.matrices_version or self._zoh[1] != dt:
+            self._zoh = (self.matrices_version, dt) + zoh_discretize(self.A, self.B, dt)
+        return self._zoh[2], self._zoh[3]
+
+    def set_backend(self, name, **options):
+        """
+        Select the integration backend used by simulate(u, dt=dt).
+
+        Parameters:
+        name (str): 'lsim', 'zoh', 'rk4' or 'solve_ivp'.
+        options: Backend options, e.g. substeps for 'rk4' or rtol for 'solve_ivp'.
+        """
+        self.backend = get_backend(name, **options)
+
+    def get_backend(self, method=None):
+        """Return the selected backend, or a backend kept per method name"""
+        if method is None:
+            return self.backend
+        if method not in self._backends:
+            self._backends[method] = get_backend(method)
+        return self._backends[method]
+
+    def simulate(self, u, dt=None, t=None, method=None, t_eval=None):
+        """
+        Simulate the model for one control step dt, or over a time vector t with lsim.
+
+        Parameters:
+        u (list or numpy.ndarray): Input, or one input per time point when t is given.
+            Inputs are clipped to the input signal bounds if saturate_inputs is set.
+        dt (float): Control step.
+        t (numpy.ndarray): Time vector of a trajectory simulation.
+        method (str): Integration backend for this call ('lsim', 'zoh', 'rk4',
+            'solve_ivp'), the backend chosen with set_backend by default. A time
+            vector t is simulated with 'lsim' (default), or for a uniform t with
+            'block' or 'fft' through simulate_trajectory; other methods raise ValueError.
+            Note the input hold: 'lsim' interpolates the inputs linearly between
+            the time points (lsim with interp=True), while 'block' and 'fft' hold
+            every input until the next time point (zero-order hold, equal to lsim
+            with interp=False). Both agree only for piecewise constant inputs
+            sampled at t.
+        t_eval (numpy.ndarray): Times in [0, dt] at which outputs are sampled,
+            for backends with dense output.
+
+        Returns:
+        tuple: Input and output data, dicts of the last values for a control
+        step, DataFrames for a time vector or t_eval.
+        """
         if t is None:
-            # Ensure u is a 2D array and repeat the input for each time step
-            u = np.array([u, u])  # Repeat the input u for two time steps (t[0] and t[1])
-            # Define the time span for the simulation (2 time steps)
-            t = np.array([0, dt])
+            return self._simulate_step(u, dt, method, t_eval)
+        if method not in (None, 'lsim', 'block', 'fft'):
+            raise ValueError(f"Method '{method}' is not supported with a time vector t, "
+                             "use 'lsim', 'block' or 'fft'!")
+        if t_eval is not None:
+            raise ValueError("t_eval is only supported for a single control step dt!")
+        t = np.asarray(t, dtype=float)
+        if method in ('block', 'fft'):
+            steps = np.diff(t)
+            if len(t) < 2 or not np.allclose(steps, steps[0]):
+                raise ValueError(f"Method '{method}' needs a uniform time vector!")
+            return self.simulate_trajectory(u, steps[0], steps=len(t), method=method, as_frame=True)
+        if len(u) == len(self.input):
+            u = np.broadcast_to(np.asarray(u, dtype=float), (len(t), len(self.input)))
         else:
-            if len(u) == len(self.input):
-                u = np.array([u for ti in t])
-            else:
-                u = np.array(u)
+            u = np.array(u)
         # Check the dimensions of the input matrix u
-        _, columns_b = np.array(self.sys.B).shape
+        _, columns_b = self.B.shape
         if columns_b != u.shape[1]:
             raise ValueError("Inputs shape not equal!")
+        if self.saturate_inputs:
+            u = self.saturate(u)
 
         # Solve the differential equations and calculate output
+        from scipy.signal import lsim
+        import pandas as pd
         t, y, states = lsim(self.sys, u, t, X0=self.state)
 
         # Update the internal state to the new state after the simulation
         self.state = states[-1]  # Take the last state (after dt)
 
-        input_info = get_signal_info(self.input)
-        output_info = get_signal_info(self.output)
-        if dt is not None:
-            u = u[-1]
-            y = y[-1]
-            input_data = dict(zip(input_info['name'].to_list(), u))
-            output_data = dict(zip(output_info['name'].to_list(), y))
-        else:
-            input_data = pd.DataFrame(columns=input_info['name'], data=u)
-            output_data = pd.DataFrame(columns=output_info['name'], data=y)
+        input_data = pd.DataFrame(columns=list(self.input_info.names), data=u)
+        output_data = pd.DataFrame(columns=list(self.output_info.names), data=y)
+        return input_data, output_data
+
+    def simulate_trajectory(self, u, dt, steps=None, method='block', block_size=256, as_frame=False):
+        """
+        Open-loop simulation of a long input sequence with zero-order hold.
+
+        The outputs are sampled like lsim with interp=False, y_k = C x_k + D u_k
+        starting from the current state, every input is held for one sample. 'block' propagates blocks of block_size samples
+        with precomputed lifted matrices, so the cost is a few large matrix
+        products, and moves the state to the last sample. 'fft' convolves the
+        inputs with the impulse response and only returns outputs, the state
+        is not changed.
+
+        Parameters:
+        u (numpy.ndarray): Inputs (T, n_inputs), or one input held for steps samples.
+        dt (float): Sampling time.
+        steps (int): Number of samples when a single input is given.
+        method (str): 'block' or 'fft'.
+        block_size (int): Samples per block of the 'block' method.
+        as_frame (bool): Return input and output DataFrames like simulate.
+
+        Returns:
+        numpy.ndarray or tuple: Outputs (T, n_outputs), or input and output DataFrames.
+        """
+        u = np.asarray(u, dtype=float)
+        if u.ndim == 1:
+            if steps is None:
+                raise ValueError("Number of steps needed for a single input!")
+            u = np.broadcast_to(u, (steps, len(u)))
+        if u.shape[1] != self.B.shape[1]:
+            raise ValueError("Inputs shape not equal!")
+        if self.saturate_inputs:
+            u = self.saturate(u)
+
+        Ad, Bd = self.discretize(dt)
+        match method:
+            case 'block':
+                blocks = self._blocks
+                if blocks is None or blocks[:3] != (self.matrices_version, dt, block_size):
+                    blocks = self._blocks = (self.matrices_version, dt, block_size,
+                                             block_matrices(Ad, Bd, self.C, self.D, block_size))
+                y, self.state = simulate_blocks(blocks[3], np.asarray(self.state, dtype=float), u)
+            case 'fft':
+                y = simulate_fft(Ad, Bd, self.C, self.D, np.asarray(self.state, dtype=float), u)
+            case _:
+                raise ValueError(f"Unknown trajectory method '{method}'!")
+
+        if not as_frame:
+            return y
+        import pandas as pd
+        input_data = pd.DataFrame(columns=list(self.input_info.names), data=u)
+        output_data = pd.DataFrame(columns=list(self.output_info.names), data=y)
+        return input_data, output_data
+
+    def _simulate_step(self, u, dt, method, t_eval):
+        if dt is None:
+            raise ValueError("No time step or time vector provided!")
+        u = np.asarray(u, dtype=float)
+        if self.B.shape[1] != u.shape[0]:
+            raise ValueError("Inputs shape not equal!")
+        if self.saturate_inputs:
+            u = self.saturate(u)
+
+        backend = self.get_backend(method)
+        if t_eval is None:
+            self.state = backend.step(self, u, dt)
+            y = self.C @ self.state + self.D @ u
+            input_data = dict(zip(self.input_info.names, u))
+            output_data = dict(zip(self.output_info.names, y))
+            return input_data, output_data
 
+        self.state, samples = backend.step(self, u, dt, t_eval=t_eval)
+        y = samples @ self.C.T + u @ self.D.T
+        import pandas as pd
+        index = pd.Index(np.asarray(t_eval, dtype=float), name='time')
+        input_data = pd.DataFrame(columns=list(self.input_info.names), data=np.tile(u, (len(index), 1)), index=index)
+        output_data = pd.DataFrame(columns=list(self.output_info.names), data=y, index=index)
         return input_data, output_data
 
+    def step(self, u, dt, out=None):
+        """
+        Advance the state by one zero-order-hold step without allocating.
+
+        The state is updated in place in a buffer owned by the model and the
+        output is written into out (or an internal buffer that is overwritten
+        by the next step).
+
+        Parameters:
+        u (numpy.ndarray): Input vector, saturated if saturate_inputs is set.
+        dt (float): Sampling time.
+        out (numpy.ndarray): Optional array for the output vector.
+
+        Returns:
+        numpy.ndarray: Output vector.
+        """
+        Ad, Bd = self.discretize(dt)
+        buffers = self._buffers
+        if buffers is None or buffers[0].shape[0] != Ad.shape[0] \
+                or buffers[2].shape[0] != self.C.shape[0] or buffers[4].shape[0] != Bd.shape[1]:
+            buffers = self._buffers = (np.empty(Ad.shape[0]), np.empty(Ad.shape[0]),
+                                       np.empty(self.C.shape[0]), np.empty(self.C.shape[0]),
+                                       np.empty(Bd.shape[1]))
+        state, work, output, feedthrough, saturated = buffers
+        if self.state is not state:
+            np.copyto(state, self.state)
+            self.state = state
+        if out is None:
+            out = output
+        if self.saturate_inputs:
+            u = self.saturate(u, out=saturated)
+
+        # np.dot writes into out directly, matmul allocates gufunc buffers per call
+        np.dot(Ad, state, out=work)
+        np.dot(Bd, u, out=state)
+        np.add(state, work, out=state)
+        np.dot(self.C, state, out=out)
+        np.dot(self.D, u, out=feedthrough)
+        np.add(out, feedthrough, out=out)
+        return out
+
+    def simulate_batch(self, states, u, dt, A=None, B=None, as_frame=False):
+        """
+        Simulate N instances of the model at once with zero-order-hold steps.
+
+        The internal state of the model is not modified. Instances share the
+        output matrices C and D of the model, while A and B may be given per
+        instance (e.g. for different payload masses or sling lengths).
+
+        Parameters:
+        states (numpy.ndarray): Initial states, shape (N, n_states).
+        u (numpy.ndarray): Inputs, shape (N, T, n_inputs), saturated if saturate_inputs is set.
+        dt (float): Sampling time.
+        A (numpy.ndarray): System matrix (n, n) or stack (N, n, n), defaults to self.A.
+        B (numpy.ndarray): Input matrix (n, m) or stack (N, n, m), defaults to self.B.
+        as_frame (bool): Return a DataFrame indexed by (instance, step).
+
+        Returns:
+        numpy.ndarray or pandas.DataFrame: Structured array with fields
+        'instance', 'step' and one field per input and output signal.
+        """
+        states = np.array(states, dtype=float, ndmin=2)
+        u = np.asarray(u, dtype=float)
+        if u.ndim != 3 or u.shape[0] != states.shape[0]:
+            raise ValueError("Inputs shape not equal!")
+        batch, steps, n_inputs = u.shape
+        A = self.A if A is None else np.asarray(A, dtype=float)
+        B = self.B if B is None else np.asarray(B, dtype=float)
+        if B.shape[-1] != n_inputs or states.shape[1] != A.shape[-1]:
+            raise ValueError("Inputs shape not equal!")
+        if self.saturate_inputs:
+            u = self.saturate(u)
+
+        C = self.C
+        D = self.D
+        y = np.empty((batch, steps, C.shape[0]))
+        if A.ndim == 2 and B.ndim == 2:
+            # Shared system - plain matrix products over the whole batch
+            Ad, Bd = zoh_discretize(A, B, dt)
+            Bu = u @ Bd.T
+            for k in range(steps):
+                states = states @ Ad.T + Bu[:, k]
+                y[:, k] = states @ C.T
+        else:
+            A = np.broadcast_to(A, (batch,) + A.shape[-2:])
+            B = np.broadcast_to(B, (batch,) + B.shape[-2:])
+            Ad, Bd = zoh_discretize_batch(A, B, dt)
+            Bu = np.einsum('nij,ntj->nti', Bd, u)
+            for k in range(steps):
+                states = np.einsum('nij,nj->ni', Ad, states) + Bu[:, k]
+                y[:, k] = states @ C.T
+        y += u @ D.T
+
+        input_names = list(self.input_info.names)
+        output_names = list(self.output_info.names)
+        dtype = [('instance', np.int64), ('step', np.int64)] \
+            + [(name, float) for name in input_names + output_names]
+        data = np.empty(batch * steps, dtype=dtype)
+        data['instance'] = np.repeat(np.arange(batch), steps)
+        data['step'] = np.tile(np.arange(steps), batch)
+        for i, name in enumerate(input_names):
+            data[name] = u[:, :, i].ravel()
+        for i, name in enumerate(output_names):
+            data[name] = y[:, :, i].ravel()
+
+        if as_frame:
+            import pandas as pd
+            return pd.DataFrame(data).set_index(['instance', 'step'])
+        return data
+
+    @contextmanager
+    def preserved(self):
+        """
+        Context manager restoring the state, parameters and matrices on exit,
+        e.g. around offline sweeps calling update_matrices.
+        """
+        state = np.array(self.state, copy=True)
+        parameters = [p.value for p in self.parameters]
+        try:
+            yield self
+        finally:
+            for p, value in zip(self.parameters, parameters):
+                p.value = value
+            self.state = state
+            self.update_matrices()
+
+    def param_index(self, parameter_name):
+        """Index of the parameter in self.parameters, None if unknown"""
+        return self._param_index.get(parameter_name)
+
+    def _parameter(self, parameter_name):
+        # Integer-like indices (also numpy integers) or names
+        if isinstance(parameter_name, numbers.Integral):
+            return self.parameters[operator.index(parameter_name)]
+        index = self._param_index.get(parameter_name)
+        if index is None:
+            raise KeyError(f"Unknown parameter '{parameter_name}'!")
+        return self.parameters[index]
+
     def get_param(self, parameter_name):
-        for p in self.parameters:
-            if parameter_name == p.name:
-                return p.value
+        """Value of the parameter given by name or index, KeyError if the name is unknown"""
+        return self._parameter(parameter_name).value
 
     def set_param(self, parameter_name, value):
-        for p in self.parameters:
-            if parameter_name == p.name:
-                p.value = value
-                #self.update_matrices()
\ No newline at end of file
+        """Set the value of the parameter given by name or index, KeyError if the name is unknown"""
+        self._parameter(parameter_name).value = value
\ No newline at end of file
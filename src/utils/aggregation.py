@@ -1,4 +1,4 @@
-from src.utils.plots import plot_signals
+from src.utils.plots import plot_signals, decimate_array
 from src.utils.helpers import get_git_repo_path
 import datetime
 import os
@@ -16,17 +16,46 @@ def create_new_directory_and_get_its_path():
     os.mkdir(save_path)
     return save_path
 
-def aggregate_simulation_data(simulation_data, signals, data_names):
+def aggregate_simulation_data(simulation_data, signals, data_names, renderer=None, profiler=None):
     """
     Aggregate all simulation data, create plots and signals trace
     :param simulation_data: array of df with signal trace and its names
     :param signals: array of signals descriptions
     :param plot_names: array of name of the plot to be saved
+    :param renderer: optional PlotRenderer, plots are then rendered in the background
+    :param profiler: optional Profiler, its stage summary is saved as profile.csv
     """
     save_path = create_new_directory_and_get_its_path()
+    if profiler is not None:
+        profiler.save(save_path + 'profile.csv')
 
     for data, signal, name in zip(simulation_data, signals, data_names):
         file_save_path = save_path + name
-        plot_signals(data=data, signals=signal, save_path=file_save_path)
+        if renderer is None:
+            plot_signals(data=data, signals=signal, save_path=file_save_path)
+        else:
+            renderer.submit(data, signal, file_save_path)
         data.to_csv(file_save_path + '.csv')
-        data.to_excel(file_save_path + '.xlsx')
\ No newline at end of file
+        data.to_excel(file_save_path + '.xlsx')
+
+
+def aggregate_streamed_data(writers, signals, export_formats=(), plot=True, renderer=None):
+    """
+    Finish streamed simulation data, create plots and optionally export text files
+    :param writers: array of StreamingWriter with signal traces
+    :param signals: array of signals descriptions
+    :param export_formats: formats passed to StreamingWriter.export, e.g. ('csv', 'xlsx')
+    :param plot: create plots next to the data files
+    :param renderer: optional PlotRenderer, plots are then rendered in the background
+    """
+    for writer, signal in zip(writers, signals):
+        writer.close()
+        if plot:
+            # Decimated straight from the memmap, the full trace is never loaded
+            traces = decimate_array(writer.load(), writer.names)
+            if renderer is None:
+                plot_signals(data=traces, signals=signal, save_path=writer.path)
+            else:
+                renderer.submit(traces, signal, writer.path)
+        if export_formats:
+            writer.export(export_formats)
@@ -1,24 +1,166 @@
-from scipy.integrate import odeint
+from abc import ABC, abstractmethod
 import numpy as np
+from src.utils.integrators import rk4_step
 
 
-def derivative(self, u, dt):
-    u = np.array(u)
+def derivative(model, x, u):
+    """
+    State derivative dx/dt = A x + B u of the current linear model.
+    """
+    return model.A @ x + model.B @ u
 
-    _, columns_B = np.array(self.ss.B).shape
-    if columns_B != u.shape[0]:
-        raise ValueError("Inputs shape not equal!")
 
-    def state_derivative(x, t, A, B, u):
-        # Compute the state derivatives
-        dxdt = A @ x + B @ u  # Use matrix multiplication
-        return dxdt
+class IntegrationBackend(ABC):
+    """Advances the state of a Model over one control step with a constant input"""
+    dense_output = False
 
-    # Initial conditions for the state variables
-    x0 = self.state  # Initial state vector
-    # Define the time span for the simulation
-    t = np.array([0, dt])  # From 0 to 10 seconds, 1000 points
-    # Solve the differential equations using odeint
-    x = odeint(state_derivative, x0, t, args=(self.ss.A, self.ss.B, u))
-    # Calculate the output
-    y = np.array([self.ss.C @ xi + self.ss.D @ u for xi, ti in zip(x, t)])  # Output computation
\ No newline at end of file
+    def reset(self):
+        """Forget any state kept between control steps."""
+        pass
+
+    @abstractmethod
+    def step(self, model, u, dt, t_eval=None):
+        """
+        Integrate the model from its current state over one control step.
+
+        Parameters:
+        model (Model): Integrated model, its state is not modified.
+        u (numpy.ndarray): Input held over the step.
+        dt (float): Control step.
+        t_eval (numpy.ndarray): Times in [0, dt] at which states are sampled,
+            only for backends with dense output.
+
+        Returns:
+        numpy.ndarray: State after the step, and if t_eval is given also the
+        sampled states of shape (len(t_eval), n_states).
+        """
+        pass
+
+
+class LsimBackend(IntegrationBackend):
+    def step(self, model, u, dt, t_eval=None):
+        if t_eval is not None:
+            raise ValueError("Backend 'lsim' has no dense output!")
+        from scipy.signal import lsim
+        _, _, states = lsim(model.sys, np.array([u, u]), np.array([0, dt]), X0=model.state)
+        return states[-1]
+
+
+class ZOHBackend(IntegrationBackend):
+    def step(self, model, u, dt, t_eval=None):
+        if t_eval is not None:
+            raise ValueError("Backend 'zoh' has no dense output!")
+        # Exact discrete-time update of the state over one sampling period
+        Ad, Bd = model.discretize(dt)
+        return Ad @ model.state + Bd @ u
+
+
+class RK4Backend(IntegrationBackend):
+    def __init__(self, substeps=1):
+        self.substeps = substeps
+
+    def step(self, model, u, dt, t_eval=None):
+        if t_eval is not None:
+            raise ValueError("Backend 'rk4' has no dense output!")
+        A = model.A
+        B = model.B
+        h = dt / self.substeps
+        x = np.asarray(model.state, dtype=float)
+        for _ in range(self.substeps):
+            x = rk4_step(lambda x_k, u_k: A @ x_k + B @ u_k, x, u, h)
+        return x
+
+
+class SolveIvpBackend(IntegrationBackend):
+    dense_output = True
+    # Solver classes of scipy.integrate, imported on first use
+    solvers = ('RK45', 'RK23', 'DOP853')
+
+    def __init__(self, method='RK45', rtol=1e-6, atol=1e-9):
+        """
+        Adaptive Runge-Kutta backend whose step size carries over between
+        control steps. Every control step creates a solver bounded by the
+        step, seeded with the last adapted step size as first_step, so the
+        initial step selection is not repeated. Time continues from step to step.
+
+        Parameters:
+        method (str): 'RK45', 'RK23' or 'DOP853'.
+        rtol (float): Relative tolerance.
+        atol (float): Absolute tolerance.
+        """
+        if method not in self.solvers:
+            raise ValueError(f"Unknown solver '{method}'!")
+        self.method = method
+        self.rtol = rtol
+        self.atol = atol
+        self.solver = None
+        self.t = 0.0
+        self.step_size = None
+        self._A = None
+        self._B = None
+        self._u = None
+
+    def reset(self):
+        self.solver = None
+        self.t = 0.0
+        self.step_size = None
+
+    def _fun(self, t, x):
+        return self._A @ x + self._B @ self._u
+
+    def step(self, model, u, dt, t_eval=None):
+        if t_eval is not None:
+            t_eval = np.asarray(t_eval, dtype=float)
+            if np.any((t_eval < 0) | (t_eval > dt)):
+                raise ValueError("t_eval must lie within the control step [0, dt]!")
+        self._A = model.A.copy()
+        self._B = model.B.copy()
+        self._u = np.asarray(u, dtype=float)
+        if self.solver is not None and not np.array_equal(self.solver.y, model.state):
+            # The state was changed outside of the backend
+            self.reset()
+        import scipy.integrate
+        solver_class = getattr(scipy.integrate, self.method)
+        first_step = None if self.step_size is None else min(self.step_size, dt)
+        t_start = self.t
+        solver = self.solver = solver_class(self._fun, t_start, np.array(model.state, dtype=float),
+                                            t_start + dt, first_step=first_step,
+                                            rtol=self.rtol, atol=self.atol)
+
+        samples = None
+        if t_eval is not None:
+            t_eval = t_start + t_eval
+            samples = np.empty((len(t_eval), len(solver.y)))
+            sampled = t_eval <= t_start
+            samples[sampled] = solver.y
+        while solver.status == 'running':
+            message = solver.step()
+            if solver.status == 'failed':
+                raise RuntimeError(message)
+            # The last step is cut at the bound, keep the adapted size of the others
+            if solver.status == 'running' or self.step_size is None:
+                self.step_size = solver.step_size
+            if t_eval is not None:
+                in_step = (t_eval > solver.t_old) & (t_eval <= solver.t) & ~sampled
+                if np.any(in_step):
+                    samples[in_step] = solver.dense_output()(t_eval[in_step]).T
+                    sampled |= in_step
+        self.t = solver.t
+        if t_eval is None:
+            return solver.y.copy()
+        return solver.y.copy(), samples
+
+
+BACKENDS = {'lsim': LsimBackend,
+            'zoh': ZOHBackend,
+            'rk4': RK4Backend,
+            'solve_ivp': SolveIvpBackend}
+
+
+def get_backend(name, **options):
+    """
+    Create an integration backend by name: 'lsim', 'zoh', 'rk4' or 'solve_ivp'.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown simulation method '{name}'!")
+    return BACKENDS[name](**options)
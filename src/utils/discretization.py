@@ -0,0 +1,74 @@
+from functools import lru_cache
+import numpy as np
+from scipy.linalg import expm
+
+
+ZOH_CACHE_SIZE = 256
+
+
+def zoh_discretize(A, B, dt):
+    """
+    Zero-order-hold discretization of a continuous-time system (A, B).
+
+    Results are cached on the matrix contents and the time step, so repeated
+    calls for the same system only cost a hash lookup.
+
+    Parameters:
+    A (numpy.ndarray): System dynamics matrix.
+    B (numpy.ndarray): Input matrix.
+    dt (float): Sampling time.
+
+    Returns:
+    tuple: Read-only discrete matrices (Ad, Bd).
+    """
+    A = np.ascontiguousarray(A, dtype=float)
+    B = np.ascontiguousarray(B, dtype=float)
+    if A.ndim != 2 or A.shape[0] != A.shape[1] or B.ndim != 2 or B.shape[0] != A.shape[0]:
+        raise ValueError("Matrices shape not compatible!")
+    return _zoh_cached(A.tobytes(), B.tobytes(), A.shape[0], B.shape[1], float(dt))
+
+
+@lru_cache(maxsize=ZOH_CACHE_SIZE)
+def _zoh_cached(a_bytes, b_bytes, n_states, n_inputs, dt):
+    A = np.frombuffer(a_bytes, dtype=float).reshape(n_states, n_states)
+    B = np.frombuffer(b_bytes, dtype=float).reshape(n_states, n_inputs)
+    # exp([[A, B], [0, 0]] * dt) = [[Ad, Bd], [0, I]]
+    augmented = np.zeros((n_states + n_inputs, n_states + n_inputs))
+    augmented[:n_states, :n_states] = A * dt
+    augmented[:n_states, n_states:] = B * dt
+    exponential = expm(augmented)
+    Ad = np.ascontiguousarray(exponential[:n_states, :n_states])
+    Bd = np.ascontiguousarray(exponential[:n_states, n_states:])
+    Ad.flags.writeable = False
+    Bd.flags.writeable = False
+    return Ad, Bd
+
+
+def clear_zoh_cache():
+    """Drop all cached discretizations."""
+    _zoh_cached.cache_clear()
+
+
+def zoh_discretize_batch(A, B, dt):
+    """
+    Zero-order-hold discretization of a stack of continuous-time systems.
+
+    Parameters:
+    A (numpy.ndarray): Stack of system dynamics matrices, shape (N, n, n).
+    B (numpy.ndarray): Stack of input matrices, shape (N, n, m).
+    dt (float): Sampling time.
+
+    Returns:
+    tuple: Discrete matrices (Ad, Bd) with shapes (N, n, n) and (N, n, m).
+    """
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    if A.ndim != 3 or B.ndim != 3 or A.shape[0] != B.shape[0] \
+            or A.shape[1] != A.shape[2] or B.shape[1] != A.shape[1]:
+        raise ValueError("Matrices shape not compatible!")
+    batch, n_states, n_inputs = B.shape
+    augmented = np.zeros((batch, n_states + n_inputs, n_states + n_inputs))
+    augmented[:, :n_states, :n_states] = A * dt
+    augmented[:, :n_states, n_states:] = B * dt
+    exponential = expm(augmented)
+    return exponential[:, :n_states, :n_states], exponential[:, :n_states, n_states:]
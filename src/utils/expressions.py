@@ -0,0 +1,51 @@
+import ast
+import numpy as np
+from scipy import constants
+
+# Names available in matrix expressions besides the model symbols
+NAMESPACE = {'np': np, 'g': constants.g, 'pi': np.pi, 'e': np.e,
+             'sin': np.sin, 'cos': np.cos, 'tan': np.tan, 'exp': np.exp, 'log': np.log,
+             'sqrt': np.sqrt, 'abs': np.abs, 'arctan2': np.arctan2}
+
+
+def symbol_identifier(symbol):
+    """
+    Python identifier of a Signal/Parameter symbol, e.g. '\\alpha' -> 'alpha'.
+    Returns None if the symbol cannot be used in expressions.
+    """
+    identifier = symbol.lstrip('\\')
+    return identifier if identifier.isidentifier() else None
+
+
+def expression_variables(expression):
+    """Names used in the expression that are not provided by NAMESPACE"""
+    names = {node.id for node in ast.walk(ast.parse(expression, mode='eval')) if isinstance(node, ast.Name)}
+    return names - NAMESPACE.keys()
+
+
+def compile_matrix_builder(entries, matrices='ABCD'):
+    """
+    Generate one function writing all expression entries into the matrices.
+
+    The source of the function is generated from the expressions and compiled
+    once. It works on single matrices and on stacks of shape (..., rows,
+    columns) when the variables are arrays broadcastable to the stack shape.
+
+    Parameters:
+    entries (dict): Maps (matrix, row, column) to an expression string.
+    matrices (str): Names of the matrix arguments.
+
+    Returns:
+    tuple: builder(A, B, C, D, **variables) and the sorted names of the variables.
+    """
+    variables = sorted(set().union(*(expression_variables(expression) for expression in entries.values())))
+    lines = [f"def builder({', '.join(matrices)}, {', '.join(variables)}):" if variables
+             else f"def builder({', '.join(matrices)}):"]
+    for (name, row, column), expression in entries.items():
+        if name not in matrices:
+            raise ValueError(f"Unknown matrix '{name}'!")
+        lines.append(f"    {name}[..., {int(row)}, {int(column)}] = {expression}")
+    lines.append("    pass")
+    namespace = dict(NAMESPACE)
+    exec(compile('\n'.join(lines), '<matrix builder>', 'exec'), namespace)
+    return namespace['builder'], variables
@@ -1,9 +1,82 @@
 import subprocess
-import pandas as pd
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SignalInfo:
+    """Precomputed, immutable description of a list of signals"""
+    signals: tuple
+    names: tuple
+    units: tuple
+    min: np.ndarray
+    max: np.ndarray
+    symbols: tuple
+    index: dict
+    symbol_index: dict
+
+    @classmethod
+    def from_signals(cls, signals):
+        signals = tuple(signals)
+        # Plain signal-like objects without a symbol are accepted for plotting
+        symbols = tuple(getattr(sig, 'symbol', None) for sig in signals)
+        min_vals = np.array([sig.min for sig in signals], dtype=float)
+        max_vals = np.array([sig.max for sig in signals], dtype=float)
+        min_vals.flags.writeable = False
+        max_vals.flags.writeable = False
+        return cls(signals=signals,
+                   names=tuple(sig.name for sig in signals),
+                   units=tuple(sig.unit for sig in signals),
+                   min=min_vals,
+                   max=max_vals,
+                   symbols=symbols,
+                   index={sig.name: i for i, sig in enumerate(signals)},
+                   symbol_index={symbol: i for i, symbol in enumerate(symbols)})
+
+    def __len__(self):
+        return len(self.signals)
+
+    def lookup(self, signal_name, signal_attribute):
+        """Return attribute ('unit', 'min', 'max', 'symbol') of a signal or None"""
+        i = self.index.get(signal_name)
+        if i is None:
+            return None
+        match signal_attribute:
+            case 'unit':
+                return self.units[i]
+            case 'min':
+                return self.min[i]
+            case 'max':
+                return self.max[i]
+            case 'symbol':
+                return self.symbols[i]
+        return None
+
+    def by_symbol(self, symbol):
+        """Return the signal with the given symbol"""
+        return self.signals[self.symbol_index[symbol]]
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame({'name': list(self.names),
+                             'unit': list(self.units),
+                             'min': self.min,
+                             'max': self.max,
+                             'symbol': list(self.symbols)})
+
+
+def describe_signals(signals):
+    """
+    Return the SignalInfo of the signals, a SignalInfo is returned as it is.
+    """
+    if isinstance(signals, SignalInfo):
+        return signals
+    return SignalInfo.from_signals(signals)
 
 
 def get_signal_info(signals):
     """Creates a dataframe with signal information"""
+    import pandas as pd
     names = []
     units = []
     min_vals = []
@@ -24,6 +97,8 @@ def get_signal_info(signals):
                          'symbol': symbols})
 
 def find_signal_info(signals, signal_name, signal_attribute):
+    if isinstance(signals, SignalInfo):
+        return signals.lookup(signal_name, signal_attribute)
     for sig in signals:
         if sig.name == signal_name:
             match signal_attribute:
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def rk4_step(rhs, x, u, dt):
+    """
+    Classic fourth order Runge-Kutta step with the input held constant.
+
+    Parameters:
+    rhs (callable): rhs(x, u) -> dx/dt, vectorized over leading batch dimensions.
+    x (numpy.ndarray): State, shape (n,) or (N, n).
+    u (numpy.ndarray): Input, shape (m,) or (N, m).
+    dt (float): Step size.
+
+    Returns:
+    numpy.ndarray: State after the step.
+    """
+    k1 = rhs(x, u)
+    k2 = rhs(x + dt / 2 * k1, u)
+    k3 = rhs(x + dt / 2 * k2, u)
+    k4 = rhs(x + dt * k3, u)
+    return x + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def semi_implicit_euler_step(rhs, x, u, dt, positions, velocities):
+    """
+    Semi-implicit (symplectic) Euler step for mechanical systems: velocities
+    are updated first and positions use the new velocities.
+
+    Parameters:
+    rhs (callable): rhs(x, u) -> dx/dt, vectorized over leading batch dimensions.
+    x (numpy.ndarray): State, shape (n,) or (N, n).
+    u (numpy.ndarray): Input, shape (m,) or (N, m).
+    dt (float): Step size.
+    positions (list): State indices of positions.
+    velocities (list): State indices of the matching velocities.
+
+    Returns:
+    numpy.ndarray: State after the step.
+    """
+    x_new = np.array(x, dtype=float)
+    x_new[..., velocities] += dt * rhs(x, u)[..., velocities]
+    x_new[..., positions] += dt * x_new[..., velocities]
+    return x_new
+
+
+def integrate(rhs, x0, u, dt, method='rk4', substeps=1, **kwargs):
+    """
+    Fixed-step integration of a batch of trajectories with piecewise constant inputs.
+
+    Parameters:
+    rhs (callable): rhs(x, u) -> dx/dt, vectorized over leading batch dimensions.
+    x0 (numpy.ndarray): Initial states, shape (N, n).
+    u (numpy.ndarray): Inputs, shape (N, T, m), held over every control step.
+    dt (float): Control step.
+    method (str): 'rk4' or 'semi_implicit_euler'.
+    substeps (int): Number of integrator steps per control step.
+    kwargs: Extra arguments of the step function (positions/velocities).
+
+    Returns:
+    numpy.ndarray: States after every control step, shape (N, T, n).
+    """
+    match method:
+        case 'rk4':
+            step = rk4_step
+        case 'semi_implicit_euler':
+            step = semi_implicit_euler_step
+        case _:
+            raise ValueError(f"Unknown integration method '{method}'!")
+    x = np.array(x0, dtype=float)
+    u = np.asarray(u, dtype=float)
+    h = dt / substeps
+    states = np.empty(u.shape[:2] + x.shape[-1:])
+    for k in range(u.shape[1]):
+        u_k = u[:, k]
+        for _ in range(substeps):
+            x = step(rhs, x, u_k, h, **kwargs)
+        states[:, k] = x
+    return states
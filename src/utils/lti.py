@@ -0,0 +1,121 @@
+import numpy as np
+
+
+def block_matrices(Ad, Bd, C, D, block):
+    """
+    Lifted matrices propagating a discrete system over a block of samples.
+
+    For a block starting in state x with inputs U = [u_0, ..., u_{L-1}]
+    flattened to length L*m, the outputs are Y = observability @ x +
+    toeplitz @ U (flattened to length L*p) and the state after the block is
+    Ad^L @ x + controllability @ U.
+
+    Parameters:
+    Ad (numpy.ndarray): Discrete system matrix (n, n).
+    Bd (numpy.ndarray): Discrete input matrix (n, m).
+    C (numpy.ndarray): Output matrix (p, n).
+    D (numpy.ndarray): Feedthrough matrix (p, m).
+    block (int): Number of samples L of one block.
+
+    Returns:
+    tuple: powers Ad^k (L + 1, n, n), observability (L*p, n), toeplitz (L*p, L*m)
+    and controllability (n, L*m).
+    """
+    n, m = Bd.shape
+    p = C.shape[0]
+    powers = np.empty((block + 1, n, n))
+    powers[0] = np.eye(n)
+    for k in range(block):
+        powers[k + 1] = Ad @ powers[k]
+    # Markov parameters C Ad^(k-1) Bd, D for k = 0
+    impulse = np.empty((block, p, m))
+    impulse[0] = D
+    impulse[1:] = C @ powers[:block - 1] @ Bd
+    observability = (C @ powers[:block]).reshape(block * p, n)
+    toeplitz = np.zeros((block, p, block, m))
+    for k in range(block):
+        toeplitz[k, :, :k + 1] = np.moveaxis(impulse[k::-1], 0, 1)
+    controllability = np.moveaxis(powers[block - 1::-1] @ Bd, 0, 1).reshape(n, block * m)
+    return powers, observability, toeplitz.reshape(block * p, block * m), controllability
+
+
+def simulate_blocks(matrices, x0, u):
+    """
+    Simulate a discrete LTI system over a long input sequence block by block.
+
+    The block start states follow from one product of all input blocks with
+    the controllability matrix and a short recursion over the blocks; all
+    outputs are then two matrix products.
+
+    Parameters:
+    matrices (tuple): Result of block_matrices.
+    x0 (numpy.ndarray): Initial state (n,).
+    u (numpy.ndarray): Inputs (T, m).
+
+    Returns:
+    tuple: Outputs (T, p) and the state at the last sample.
+    """
+    powers, observability, toeplitz, controllability = matrices
+    block = len(powers) - 1
+    steps, m = u.shape
+    n = len(x0)
+    p = observability.shape[0] // block
+    blocks = -(-steps // block)
+    padded = np.zeros((blocks * block, m))
+    padded[:steps] = u
+    padded = padded.reshape(blocks, block * m)
+
+    driven = padded @ controllability.T
+    starts = np.empty((blocks, n))
+    starts[0] = x0
+    transition = powers[block]
+    for b in range(1, blocks):
+        starts[b] = transition @ starts[b - 1] + driven[b - 1]
+    y = starts @ observability.T + padded @ toeplitz.T
+
+    # State at the last sample from the start of its block, Bd is the last column block
+    last = steps - 1 - (blocks - 1) * block
+    state = powers[last] @ starts[-1]
+    if last:
+        inputs = padded[-1].reshape(block, m)[:last]
+        state += np.einsum('kij,kj->i', powers[last - 1::-1] @ controllability[:, -m:], inputs)
+    return y.reshape(blocks * block, p)[:steps], state
+
+
+def simulate_fft(Ad, Bd, C, D, x0, u):
+    """
+    Outputs of a discrete LTI system as free response plus FFT convolution
+    of the inputs with the impulse response.
+
+    Parameters:
+    Ad, Bd, C, D (numpy.ndarray): Discrete state-space matrices.
+    x0 (numpy.ndarray): Initial state (n,).
+    u (numpy.ndarray): Inputs (T, m).
+
+    Returns:
+    numpy.ndarray: Outputs (T, p).
+    """
+    from scipy.signal import fftconvolve
+    steps = len(u)
+    n = len(x0)
+    # Ad^k [x0, Bd] for all k, computed in blocks of sqrt(T) powers
+    block = max(int(np.sqrt(steps)), 1)
+    powers = np.empty((block, n, n))
+    powers[0] = np.eye(n)
+    for k in range(1, block):
+        powers[k] = Ad @ powers[k - 1]
+    step_block = Ad @ powers[-1]
+    columns = np.column_stack((x0, Bd))
+    propagated = np.empty((-(-steps // block) * block, n, columns.shape[1]))
+    start = columns
+    for b in range(0, len(propagated), block):
+        propagated[b:b + block] = powers @ start
+        start = step_block @ start
+    propagated = C @ propagated[:steps]
+
+    y = np.ascontiguousarray(propagated[:, :, 0])
+    impulse = np.empty((steps, C.shape[0], Bd.shape[1]))
+    impulse[0] = D
+    impulse[1:] = propagated[:steps - 1, :, 1:]
+    y += fftconvolve(impulse, u[:, None, :], axes=0)[:steps].sum(axis=2)
+    return y
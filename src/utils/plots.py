@@ -1,16 +1,74 @@
-from src.utils.helpers import find_signal_info
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from src.utils.helpers import describe_signals
+import numpy as np
 
 
 # Set constants for plots
 LABEL_FONTSIZE = 20
 TICK_FONTSIZE = 16
+# Two points (min and max) per pixel column of a 10 inch wide axis at 100 dpi
+MAX_PLOT_POINTS = 2000
 
-# Set global font properties
-plt.rcParams['font.family'] = 'serif'  # or 'sans-serif', 'monospace', etc.
-plt.rcParams['font.serif'] = ['Times New Roman']  # Specify the font name if using serif
+_fonts_set = False
 
-def plot_signals(data, signals, save_path, fig_shape=None):
+
+def _pyplot():
+    """Import pyplot on first use and set the global font properties once"""
+    global _fonts_set
+    import matplotlib.pyplot as plt
+    if not _fonts_set:
+        plt.rcParams['font.family'] = 'serif'  # or 'sans-serif', 'monospace', etc.
+        plt.rcParams['font.serif'] = ['Times New Roman']  # Specify the font name if using serif
+        _fonts_set = True
+    return plt
+
+
+def decimate_minmax(x, y, max_points=MAX_PLOT_POINTS):
+    """
+    Downsample a trace keeping the minimum and maximum of every bucket,
+    so peaks stay visible in the plot.
+
+    Parameters:
+    x (numpy.ndarray): Sample positions, None for the sample index.
+    y (numpy.ndarray): Sample values, e.g. a column of a memmap, which is
+        read bucket by bucket and not copied as a whole.
+    max_points (int): Maximal number of returned points.
+
+    Returns:
+    tuple: Decimated (x, y).
+    """
+    y = np.asarray(y, dtype=float)
+    buckets = max_points // 2
+    if len(y) <= max_points or buckets < 1:
+        return (np.arange(len(y)) if x is None else np.asarray(x)), np.array(y)
+    edges = np.linspace(0, len(y), buckets + 1).astype(int)
+    starts = edges[:-1]
+    # Index of the min and max inside every bucket
+    idx_min = np.array([s + np.argmin(y[s:e]) for s, e in zip(starts, edges[1:])])
+    idx_max = np.array([s + np.argmax(y[s:e]) for s, e in zip(starts, edges[1:])])
+    indices = np.sort(np.concatenate((idx_min, idx_max)))
+    return (indices if x is None else np.asarray(x)[indices]), y[indices]
+
+
+def decimate_data(data, max_points=MAX_PLOT_POINTS):
+    """
+    Min/max decimation of every column of a DataFrame. Columns are decimated
+    separately, so the result is a dict of column name -> (x, y).
+    """
+    return {name: decimate_minmax(data.index.to_numpy(), data[name].to_numpy(), max_points)
+            for name in data.columns}
+
+
+def decimate_array(data, names, max_points=MAX_PLOT_POINTS):
+    """
+    Min/max decimation of every column of a (steps, n_signals) array, e.g.
+    the memmap of a StreamingWriter, over the sample index. Only the kept
+    samples are copied, the result is a dict of name -> (x, y).
+    """
+    return {name: decimate_minmax(None, data[:, i], max_points) for i, name in enumerate(names)}
+
+
+def plot_signals(data, signals, save_path, fig_shape=None, max_points=MAX_PLOT_POINTS):
     signal_no = len(signals)
     if fig_shape is None:
         ncols = 2
@@ -23,18 +81,77 @@ def plot_signals(data, signals, save_path, fig_shape=None):
         nrows = fig_shape[0]
         ncols = fig_shape[1]
 
+    if isinstance(data, dict):
+        traces = data
+    else:
+        traces = decimate_data(data, max_points)
+
+    info = describe_signals(signals)
+    plt = _pyplot()
     fig, axs = plt.subplots(nrows, ncols, figsize=(10 * ncols, 5 * nrows))
-    # Flatten the 2D array of subplots to simplify indexing
-    axs = axs.flatten()
+    try:
+        # Flatten the 2D array of subplots to simplify indexing
+        axs = axs.flatten()
+
+        for i, (sig_name, (x, y)) in enumerate(traces.items()):
+            axs[i].plot(x, y)
+            axs[i].set_xlabel('Time [s]', fontsize=LABEL_FONTSIZE)
+            unit = info.lookup(sig_name, 'unit')
+            axs[i].set_ylabel(sig_name + ' [' + unit + ']', fontsize=LABEL_FONTSIZE)
+            axs[i].grid(color='gray', linestyle='--', linewidth=0.5)
+            axs[i].tick_params(axis='both', which='major', labelsize=TICK_FONTSIZE)
+
+        plt.savefig(save_path + ".pdf")
+        plt.savefig(save_path + ".jpg")
+    finally:
+        plt.close(fig)
+
+
+def _init_render_worker():
+    # Workers only write files, never show windows
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+class PlotRenderer:
+    def __init__(self, max_workers=None):
+        """
+        Render plot_signals jobs in a background process pool.
+
+        Traces are decimated before they are sent to a worker, so the
+        transferred data does not grow with the episode length.
+
+        Parameters:
+        max_workers (int): Number of rendering processes.
+        """
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_render_worker)
+        self.futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-    for i, sig_name in enumerate(data.columns):
-        axs[i].plot(data[sig_name])
-        axs[i].set_xlabel('Time [s]', fontsize=LABEL_FONTSIZE)
-        unit = find_signal_info(signals, sig_name, 'unit')
-        axs[i].set_ylabel(sig_name + ' [' + unit + ']', fontsize=LABEL_FONTSIZE)
-        axs[i].grid(color='gray', linestyle='--', linewidth=0.5)
-        axs[i].tick_params(axis='both', which='major', labelsize=TICK_FONTSIZE)
+    def submit(self, data, signals, save_path, fig_shape=None, max_points=MAX_PLOT_POINTS):
+        """
+        Queue a plot_signals job and return its Future.
+        """
+        future = self.executor.submit(plot_signals, decimate_data(data, max_points), list(signals),
+                                      save_path, fig_shape, max_points)
+        self.futures.append(future)
+        return future
 
+    def wait(self):
+        """
+        Wait for all queued jobs and raise the first rendering error, if any.
+        """
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
 
-    plt.savefig(save_path + ".pdf")
-    plt.savefig(save_path + ".jpg")
\ No newline at end of file
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self.executor.shutdown()
@@ -0,0 +1,167 @@
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter_ns
+import numpy as np
+
+# Stages timed by Model.set_profiler and Algorithm.set_profiler
+MODEL_STAGES = {'simulate': 'integration',
+                'step': 'integration',
+                'simulate_batch': 'integration',
+                'update_matrices': 'matrix update'}
+ALGORITHM_STAGES = {'compute_gains': 'gain computation',
+                    'update_state_matrices': 'gain computation',
+                    'control_input': 'control law',
+                    'filter_gains': 'logging'}
+LOGGER_STAGES = {'log': 'logging'}
+
+
+class StageTimer:
+    # Power-of-two histogram buckets of the call durations in ns
+    buckets = 64
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.histogram = [0] * self.buckets
+        # Depth of the wrapped calls of the stage currently running
+        self.active = 0
+
+    def record(self, elapsed):
+        self.calls += 1
+        self.total += elapsed
+        if self.min is None or elapsed < self.min:
+            self.min = elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        self.histogram[min(elapsed.bit_length(), self.buckets - 1)] += 1
+
+    def percentile(self, q):
+        """Upper bound in ns of the bucket holding the q-th percentile of the durations"""
+        if not self.calls:
+            return 0
+        bucket = int(np.searchsorted(np.cumsum(self.histogram), q / 100 * self.calls))
+        return min(2 ** bucket, self.max)
+
+
+class Profiler:
+    def __init__(self):
+        """
+        Per-stage timers of a closed-loop run based on perf_counter_ns.
+
+        Stages are timed by wrapping methods of the profiled objects, so
+        objects without a profiler run their methods unchanged.
+        """
+        self.stages = {}
+
+    def record(self, stage, elapsed):
+        """
+        Record one duration of a stage.
+
+        Parameters:
+        stage (str): Stage name.
+        elapsed (int): Duration in ns.
+        """
+        timer = self.stages.get(stage)
+        if timer is None:
+            timer = self.stages[stage] = StageTimer()
+        timer.record(elapsed)
+
+    @contextmanager
+    def time(self, stage):
+        """Context manager timing the enclosed block as one call of the stage"""
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(stage, perf_counter_ns() - start)
+
+    def wrap(self, function, stage):
+        """
+        Return function timed as the stage. Calls made while the stage is
+        already being timed (e.g. compute_gains inside update_state_matrices)
+        are part of the outer call and are not recorded again.
+        """
+        timer = self.stages.get(stage)
+        if timer is None:
+            timer = self.stages[stage] = StageTimer()
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            if timer.active:
+                return function(*args, **kwargs)
+            timer.active += 1
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timer.record(perf_counter_ns() - start)
+                timer.active -= 1
+        timed.__profiled__ = True
+        return timed
+
+    def instrument(self, obj, stages):
+        """
+        Time methods of an object by replacing them with timed wrappers on the instance.
+
+        Parameters:
+        obj (object): Profiled object.
+        stages (dict): Maps method names to stage names.
+        """
+        for name, stage in stages.items():
+            method = getattr(obj, name, None)
+            if method is not None and not getattr(method, '__profiled__', False):
+                setattr(obj, name, self.wrap(method, stage))
+
+    @staticmethod
+    def uninstrument(obj, stages):
+        """Remove the timed wrappers installed by instrument"""
+        for name in stages:
+            if getattr(obj.__dict__.get(name), '__profiled__', False):
+                delattr(obj, name)
+
+    @staticmethod
+    def unprofiled_state(obj, stages):
+        """
+        Instance state of a profiled object without the timed wrappers and
+        the profiler, for __getstate__. Bound wrappers cannot be pickled, so
+        copies sent to other processes (e.g. the sweep workers) are not profiled.
+        """
+        state = obj.__dict__.copy()
+        for name in stages:
+            if getattr(state.get(name), '__profiled__', False):
+                del state[name]
+        state.pop('profiler', None)
+        return state
+
+    def reset(self):
+        self.stages.clear()
+
+    def summary(self):
+        """
+        Summary table of all stages sorted by total time.
+
+        Returns:
+        pandas.DataFrame: Calls, total, mean, min, max and histogram percentiles per stage.
+        """
+        import pandas as pd
+        rows = []
+        for stage, timer in self.stages.items():
+            if not timer.calls:
+                continue
+            rows.append({'Stage': stage,
+                         'Calls': timer.calls,
+                         'Total [ms]': timer.total / 1e6,
+                         'Mean [us]': timer.total / timer.calls / 1e3,
+                         'Min [us]': timer.min / 1e3,
+                         'p50 [us]': timer.percentile(50) / 1e3,
+                         'p95 [us]': timer.percentile(95) / 1e3,
+                         'Max [us]': timer.max / 1e3})
+        columns = ['Stage', 'Calls', 'Total [ms]', 'Mean [us]', 'Min [us]', 'p50 [us]', 'p95 [us]', 'Max [us]']
+        summary = pd.DataFrame(rows, columns=columns)
+        return summary.sort_values('Total [ms]', ascending=False).set_index('Stage')
+
+    def save(self, path):
+        """Write the summary table as csv"""
+        self.summary().to_csv(path)
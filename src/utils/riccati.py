@@ -0,0 +1,184 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scipy.linalg import cho_solve, solve_continuous_are, solve_continuous_lyapunov
+
+
+def quantized_key(*matrices, tol=1e-9):
+    """
+    Create a hashable key from the contents of the matrices rounded to a
+    grid of spacing tol, so matrices differing by float noise below tol
+    (away from the grid boundaries) give the same key.
+
+    Parameters:
+    matrices (numpy.ndarray): Matrices identifying the problem.
+    tol (float): Absolute quantization step of the entries.
+
+    Returns:
+    tuple: Shapes and bytes of the quantized matrices.
+    """
+    key = []
+    for matrix in matrices:
+        # Adding 0.0 maps -0.0 to 0.0 so both give the same bytes
+        rounded = np.round(np.asarray(matrix, dtype=float) / tol) + 0.0
+        key.append(rounded.shape)
+        key.append(rounded.tobytes())
+    return tuple(key)
+
+
+class RiccatiCache:
+    def __init__(self, maxsize=128):
+        """
+        Bounded least-recently-used cache of Riccati solutions.
+
+        Parameters:
+        maxsize (int): Maximal number of stored solutions.
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+def newton_kleinman(A, B, Q, R, R_factor, P0, tol=1e-10, max_iter=20):
+    """
+    Solve the continuous algebraic Riccati equation with Newton-Kleinman
+    iterations seeded from an approximate solution P0.
+
+    Parameters:
+    A (numpy.ndarray): System dynamics matrix.
+    B (numpy.ndarray): Input matrix.
+    Q (numpy.ndarray): State cost matrix.
+    R (numpy.ndarray): Input cost matrix.
+    R_factor (tuple): Cholesky factorization of R from scipy.linalg.cho_factor.
+    P0 (numpy.ndarray): Initial guess, e.g. the solution for a nearby system.
+    tol (float): Relative tolerance on the change of P between iterations.
+    max_iter (int): Maximal number of iterations.
+
+    Returns:
+    numpy.ndarray: Solution P, or None if the initial gain is not stabilizing
+    or the iterations did not converge.
+    """
+    P = P0
+    K = cho_solve(R_factor, B.T @ P)
+    if np.max(np.linalg.eigvals(A - B @ K).real) >= 0:
+        return None
+    for _ in range(max_iter):
+        closed_loop = A - B @ K
+        P_new = solve_continuous_lyapunov(closed_loop.T, -(Q + K.T @ R @ K))
+        P_new = (P_new + P_new.T) / 2
+        converged = np.linalg.norm(P_new - P) <= tol * max(np.linalg.norm(P_new), 1.0)
+        P = P_new
+        K = cho_solve(R_factor, B.T @ P)
+        if converged:
+            return P
+    return None
+
+
+def _lyapunov_batch(closed_loop, M):
+    """Solve closed_loop^T P + P closed_loop = -M for a batch through the Kronecker form"""
+    batch, n, _ = closed_loop.shape
+    identity = np.eye(n)
+    transposed = np.swapaxes(closed_loop, 1, 2)
+    operator = np.einsum('bik,jl->bijkl', transposed, identity) \
+        + np.einsum('ik,bjl->bijkl', identity, transposed)
+    P = np.linalg.solve(operator.reshape(batch, n * n, n * n), -M.reshape(batch, n * n, 1))
+    P = P.reshape(batch, n, n)
+    return (P + np.swapaxes(P, 1, 2)) / 2
+
+
+def care_residual(A, B, Q, R, P):
+    """
+    Relative residual of the continuous algebraic Riccati equation for a batch.
+    """
+    PB = P @ B
+    residual = np.swapaxes(A, 1, 2) @ P + P @ A - PB @ np.linalg.solve(R, np.swapaxes(PB, 1, 2)) + Q
+    return np.linalg.norm(residual, axis=(1, 2)) / np.maximum(np.linalg.norm(Q, axis=(1, 2)), 1.0)
+
+
+def solve_care_batch(A, B, Q, R, refine=2, tol=1e-8, max_workers=None):
+    """
+    Solve the continuous algebraic Riccati equation for a stack of systems.
+
+    The stable invariant subspaces of all Hamiltonian matrices are computed
+    with one batched eigendecomposition, refined with batched Newton-Kleinman
+    iterations, and systems whose residual stays above tol are solved with
+    scipy.linalg.solve_continuous_are in a thread pool.
+
+    Parameters:
+    A (numpy.ndarray): System matrices (N, n, n).
+    B (numpy.ndarray): Input matrices (N, n, m).
+    Q (numpy.ndarray): State cost (n, n) or (N, n, n).
+    R (numpy.ndarray): Input cost (m, m) or (N, m, m).
+    refine (int): Number of Newton-Kleinman refinement iterations.
+    tol (float): Relative residual above which the full solver is used.
+    max_workers (int): Threads of the fallback pool.
+
+    Returns:
+    tuple: Gains K (N, m, n) and solutions P (N, n, n).
+    """
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    batch, n, m = B.shape
+    Q = np.broadcast_to(np.asarray(Q, dtype=float), (batch, n, n))
+    R = np.broadcast_to(np.asarray(R, dtype=float), (batch, m, m))
+    Bt = np.swapaxes(B, 1, 2)
+    R_inv_Bt = np.linalg.solve(R, Bt)
+
+    # Hamiltonian [[A, -B R^-1 B^T], [-Q, -A^T]] and its stable eigenvectors
+    hamiltonian = np.empty((batch, 2 * n, 2 * n))
+    hamiltonian[:, :n, :n] = A
+    hamiltonian[:, :n, n:] = -B @ R_inv_Bt
+    hamiltonian[:, n:, :n] = -Q
+    hamiltonian[:, n:, n:] = -np.swapaxes(A, 1, 2)
+    eigenvalues, eigenvectors = np.linalg.eig(hamiltonian)
+    order = np.argsort(eigenvalues.real, axis=1)[:, :n]
+    valid = np.sum(eigenvalues.real < 0, axis=1) == n
+    stable = np.take_along_axis(eigenvectors, order[:, None, :], axis=2)
+    U1 = stable[:, :n]
+    U2 = stable[:, n:]
+    valid &= np.abs(np.linalg.det(U1)) > 1e-12
+    U1[~valid] = np.eye(n)
+    P = np.real(np.swapaxes(np.linalg.solve(np.swapaxes(U1, 1, 2), np.swapaxes(U2, 1, 2)), 1, 2))
+    P = (P + np.swapaxes(P, 1, 2)) / 2
+
+    refined = np.flatnonzero(valid)
+    try:
+        for _ in range(refine):
+            K = R_inv_Bt[refined] @ P[refined]
+            P[refined] = _lyapunov_batch(A[refined] - B[refined] @ K,
+                                         Q[refined] + np.swapaxes(K, 1, 2) @ R[refined] @ K)
+    except np.linalg.LinAlgError:
+        valid[:] = False
+
+    failed = ~valid | ~(care_residual(A, B, Q, R, P) <= tol)
+    indices = np.flatnonzero(failed)
+    if len(indices):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            solutions = executor.map(lambda i: solve_continuous_are(A[i], B[i], Q[i], R[i]), indices)
+            for i, solution in zip(indices, solutions):
+                P[i] = solution
+    return R_inv_Bt @ P, P
@@ -0,0 +1,55 @@
+import numpy as np
+
+
+class RingBufferLogger:
+    def __init__(self, signals, capacity):
+        """
+        Fixed-size logger of signal values backed by a preallocated array.
+
+        Once the capacity is reached the oldest rows are overwritten, so
+        logging never allocates.
+
+        Parameters:
+        signals (list of Signal): Description of logged signals (one column each).
+        capacity (int): Number of rows kept.
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive!")
+        self.names = [sig.name for sig in signals]
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, len(self.names)))
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def log(self, values):
+        """
+        Write one row of values in signal order.
+
+        Parameters:
+        values (numpy.ndarray): New values of all signals.
+        """
+        self.buffer[self.count % self.capacity] = values
+        self.count += 1
+
+    def clear(self):
+        self.count = 0
+
+    def to_array(self):
+        """
+        Returns:
+        numpy.ndarray: Copy of the kept rows ordered from oldest to newest.
+        """
+        if self.count <= self.capacity:
+            return self.buffer[:self.count].copy()
+        start = self.count % self.capacity
+        return np.concatenate((self.buffer[start:], self.buffer[:start]))
+
+    def to_dataframe(self):
+        """
+        Returns:
+        pandas.DataFrame: Kept rows with signal names as columns.
+        """
+        import pandas as pd
+        return pd.DataFrame(self.to_array(), columns=self.names)
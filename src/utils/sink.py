@@ -0,0 +1,161 @@
+import json
+import numpy as np
+
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+NPY_HEADER_SIZE = 128
+
+
+def _pyarrow():
+    """Import pyarrow and its Parquet module on first use of the Parquet format"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Writing Parquet files requires pyarrow.") from None
+    return pyarrow
+
+
+def _npy_header(rows, columns):
+    """Fixed-size .npy v1.0 header, so it can be rewritten in place when rows change"""
+    header = repr({'descr': '<f8', 'fortran_order': False, 'shape': (rows, columns)})
+    header = header.ljust(NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - 1) + '\n'
+    return NPY_MAGIC + len(header).to_bytes(2, 'little') + header.encode('latin1')
+
+
+class StreamingWriter:
+    def __init__(self, path, signals, chunk_size=4096, file_format='npy'):
+        """
+        Write signal values step by step, flushing fixed-size chunks to disk.
+
+        Only one chunk is kept in memory, so memory use does not depend on
+        the episode length. With file_format='npy' rows are appended to a
+        .npy file that can be opened with np.load(..., mmap_mode='r'); with
+        file_format='parquet' every chunk becomes a Parquet row group
+        (requires pyarrow). Signal names and units are saved to path + '.json'.
+
+        Parameters:
+        path (str): Output path without extension.
+        signals (list of Signal): Description of written signals (one column each).
+        chunk_size (int): Number of rows buffered before a flush.
+        file_format (str): 'npy' or 'parquet'.
+        """
+        if file_format not in ('npy', 'parquet'):
+            raise ValueError(f"Unknown file format '{file_format}'!")
+        if file_format == 'parquet':
+            _pyarrow()
+        self.path = path
+        self.file_format = file_format
+        self.file_path = path + '.' + file_format
+        self.names = [sig.name for sig in signals]
+        self.units = [sig.unit for sig in signals]
+        self.chunk = np.empty((chunk_size, len(self.names)))
+        self.buffered = 0
+        self.rows = 0
+        self.closed = False
+
+        with open(path + '.json', 'w') as file:
+            json.dump({'names': self.names, 'units': self.units}, file)
+        if file_format == 'npy':
+            self._file = open(self.file_path, 'wb')
+            self._file.write(_npy_header(0, len(self.names)))
+        else:
+            pyarrow = _pyarrow()
+            schema = pyarrow.schema([(name, pyarrow.float64()) for name in self.names])
+            self._file = pyarrow.parquet.ParquetWriter(self.file_path, schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, values):
+        """
+        Write one row of values, given in signal order or as a dict keyed by signal name.
+        """
+        row = self.chunk[self.buffered]
+        if isinstance(values, dict):
+            for i, name in enumerate(self.names):
+                row[i] = values[name]
+        else:
+            row[:] = values
+        self.buffered += 1
+        if self.buffered == len(self.chunk):
+            self.flush()
+
+    def write_many(self, rows):
+        """
+        Write a block of rows of shape (steps, n_signals).
+        """
+        rows = np.asarray(rows, dtype=float)
+        start = 0
+        while start < len(rows):
+            count = min(len(rows) - start, len(self.chunk) - self.buffered)
+            self.chunk[self.buffered:self.buffered + count] = rows[start:start + count]
+            self.buffered += count
+            start += count
+            if self.buffered == len(self.chunk):
+                self.flush()
+
+    def flush(self):
+        if self.buffered == 0:
+            return
+        data = self.chunk[:self.buffered]
+        if self.file_format == 'npy':
+            self._file.write(data.astype('<f8', copy=False).tobytes())
+            # Keep the header consistent, so a partially written file stays readable
+            position = self._file.tell()
+            self._file.seek(0)
+            self._file.write(_npy_header(self.rows + self.buffered, len(self.names)))
+            self._file.seek(position)
+            self._file.flush()
+        else:
+            pyarrow = _pyarrow()
+            columns = [pyarrow.array(data[:, i]) for i in range(len(self.names))]
+            self._file.write_table(pyarrow.Table.from_arrays(columns, names=self.names))
+        self.rows += self.buffered
+        self.buffered = 0
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self._file.close()
+        self.closed = True
+
+    def load(self):
+        """
+        Returns:
+        numpy.ndarray: Written rows, memory-mapped for the npy format.
+        """
+        self.flush()
+        if self.file_format == 'npy':
+            return np.load(self.file_path, mmap_mode='r')
+        return _pyarrow().parquet.read_table(self.file_path).to_pandas().to_numpy()
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(np.asarray(self.load()), columns=self.names)
+
+    def export(self, formats=('csv',), chunk_size=65536):
+        """
+        Export written data to text formats. CSV is written chunk by chunk;
+        XLSX needs the whole table in memory and is slow for long runs.
+
+        Parameters:
+        formats (tuple): Any of 'csv' and 'xlsx'.
+        chunk_size (int): Number of rows converted at once for CSV.
+        """
+        import pandas as pd
+        data = self.load()
+        for file_format in formats:
+            if file_format == 'csv':
+                for start in range(0, max(len(data), 1), chunk_size):
+                    block = pd.DataFrame(np.asarray(data[start:start + chunk_size]), columns=self.names,
+                                         index=range(start, start + len(data[start:start + chunk_size])))
+                    block.to_csv(self.path + '.csv', mode='w' if start == 0 else 'a', header=start == 0)
+            elif file_format == 'xlsx':
+                self.to_dataframe().to_excel(self.path + '.xlsx')
+            else:
+                raise ValueError(f"Unknown export format '{file_format}'!")
@@ -0,0 +1,159 @@
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+
+# Read-only sweep definition, set once per worker process by the pool initializer
+_worker_definition = None
+
+
+def closed_loop_episode(model, controller, steps, dt, desired=None):
+    """
+    Run a closed-loop episode with control = desired - controller.control_input(state).
+    Inputs are saturated before stepping if the model saturates its inputs,
+    so the returned inputs are the ones that were applied.
+
+    Parameters:
+    model (Model): Simulated model, stepped in place.
+    controller (Algorithm): Controller providing the feedback.
+    steps (int): Number of control steps.
+    dt (float): Sampling time.
+    desired (numpy.ndarray): Desired input offset, zeros by default.
+
+    Returns:
+    tuple: Inputs (steps, n_inputs) and outputs (steps, n_outputs) arrays.
+    """
+    n_inputs = len(model.input_info)
+    desired = np.zeros(n_inputs) if desired is None else np.asarray(desired, dtype=float)
+    inputs = np.empty((steps, n_inputs))
+    outputs = np.empty((steps, len(model.output_info)))
+    feedback = np.empty(n_inputs)
+    for k in range(steps):
+        controller.control_input(model.state, out=feedback)
+        np.subtract(desired, feedback, out=inputs[k])
+        if model.saturate_inputs:
+            model.saturate(inputs[k], out=inputs[k])
+        model.step(inputs[k], dt, out=outputs[k])
+    return inputs, outputs
+
+
+def parameter_grid(grid):
+    """
+    Expand a dict of parameter name -> list of values into a list of candidate dicts.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def _jsonable(params):
+    return {name: value.item() if isinstance(value, np.generic) else value for name, value in params.items()}
+
+
+def _params_key(params):
+    return json.dumps(_jsonable(params), sort_keys=True)
+
+
+def _init_worker(definition):
+    global _worker_definition
+    _worker_definition = definition
+
+
+def _evaluate(params, definition):
+    model_factory, controller_factory, cost, steps, dt, desired = definition
+    model = model_factory()
+    controller = controller_factory(model, **params)
+    inputs, outputs = closed_loop_episode(model, controller, steps, dt, desired)
+    return float(cost(inputs, outputs))
+
+
+def _evaluate_chunk(chunk):
+    return [(params, _evaluate(params, _worker_definition)) for params in chunk]
+
+
+def load_results(results_path):
+    """
+    Read finished sweep results from a JSON lines file.
+
+    Returns:
+    list: (params, cost) pairs.
+    """
+    results = []
+    if results_path is None or not os.path.exists(results_path):
+        return results
+    with open(results_path) as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                results.append((record['params'], record['cost']))
+    return results
+
+
+def run_sweep(model_factory, controller_factory, grid, cost, steps, dt,
+              desired=None, max_workers=None, chunksize=1, results_path=None):
+    """
+    Evaluate a closed-loop cost for every parameter combination of the grid
+    in a process pool, yielding results as they complete.
+
+    The factories, cost function and episode settings are sent once to every
+    worker, tasks only carry chunks of parameter dicts. Factories and cost
+    must be picklable (module-level functions).
+
+    Parameters:
+    model_factory (callable): model_factory() -> Model.
+    controller_factory (callable): controller_factory(model, **params) -> Algorithm.
+    grid (dict): Parameter name -> list of values.
+    cost (callable): cost(inputs, outputs) -> float.
+    steps (int): Number of control steps per episode.
+    dt (float): Sampling time.
+    desired (numpy.ndarray): Desired input offset of the closed loop.
+    max_workers (int): Number of processes, 0 runs in the current process.
+    chunksize (int): Number of candidates per task.
+    results_path (str): Optional JSON lines file; finished results found in it
+        are yielded first and not recomputed, new results are appended.
+
+    Yields:
+    tuple: (params, cost) for every candidate.
+    """
+    definition = (model_factory, controller_factory, cost, steps, dt, desired)
+    finished = load_results(results_path)
+    done_keys = set()
+    for params, value in finished:
+        done_keys.add(_params_key(params))
+        yield params, value
+
+    pending = [params for params in parameter_grid(grid) if _params_key(params) not in done_keys]
+    chunks = [pending[i:i + chunksize] for i in range(0, len(pending), chunksize)]
+    results_file = open(results_path, 'a') if results_path is not None else None
+    try:
+        if max_workers == 0:
+            _init_worker(definition)
+            completed = (_evaluate_chunk(chunk) for chunk in chunks)
+            yield from _record(completed, results_file)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(definition,)) as executor:
+                futures = [executor.submit(_evaluate_chunk, chunk) for chunk in chunks]
+                completed = (future.result() for future in as_completed(futures))
+                yield from _record(completed, results_file)
+    finally:
+        if results_file is not None:
+            results_file.close()
+
+
+def _record(completed, results_file):
+    for chunk_results in completed:
+        for params, value in chunk_results:
+            if results_file is not None:
+                results_file.write(json.dumps({'params': _jsonable(params), 'cost': value}) + '\n')
+                results_file.flush()
+            yield params, value
+
+
+def best_parameters(results):
+    """
+    Return the (params, cost) pair with the lowest cost.
+    """
+    return min(results, key=lambda result: result[1])
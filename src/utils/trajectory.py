@@ -0,0 +1,204 @@
+import json
+import os
+import sys
+import numpy as np
+
+
+MAGIC = b'RLTRAJ01'
+HEADER_ALIGNMENT = 64
+# Episode index next to the store: one (episode, first record, length) row per episode
+INDEX_SUFFIX = '.index'
+INDEX_DTYPE = np.dtype([('episode', '<i8'), ('start', '<i8'), ('length', '<i8')])
+
+
+def _field_names(groups):
+    return [group + '/' + sig['name'] for group, signals in groups.items() for sig in signals]
+
+
+def _encode_bound(value):
+    # Standard JSON has no infinity, non-finite bounds are stored as 'inf', '-inf' or 'nan'
+    value = float(value)
+    return value if np.isfinite(value) else str(value)
+
+
+class TrajectoryStore:
+    def __init__(self, path):
+        """
+        Open a trajectory store written by TrajectoryStore.create.
+
+        The file holds a small JSON header with the Signal metadata followed
+        by fixed-dtype structured records (episode, step and one float64
+        field per signal), which are accessed through np.memmap, so slicing
+        a time window or a single signal does not copy or parse anything.
+        The first record and length of every episode are kept in an index
+        file next to the store (path + '.index').
+
+        Parameters:
+        path (str): Path of the store file.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError("Not a trajectory store file!")
+            header_size = int.from_bytes(file.read(8), 'little')
+            self.header = json.loads(file.read(header_size).decode('utf-8'))
+        self.offset = _aligned(len(MAGIC) + 8 + header_size)
+        self.groups = self.header['groups']
+        self.dtype = np.dtype([('episode', '<i8'), ('step', '<i8')]
+                              + [(name, '<f8') for name in _field_names(self.groups)])
+        self.index_path = path + INDEX_SUFFIX
+        self._load_index()
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            self.index = np.fromfile(self.index_path, dtype=INDEX_DTYPE)
+        else:
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        indexed = int(self.index['start'][-1] + self.index['length'][-1]) if len(self.index) else 0
+        if indexed != len(self):
+            # Index missing or behind the records (e.g. older files), rebuilt with one scan
+            episodes = np.asarray(self.records(columns=['episode'])['episode'])
+            starts = np.flatnonzero(np.diff(episodes, prepend=episodes[:1] - 1))
+            self.index = np.zeros(len(starts), dtype=INDEX_DTYPE)
+            self.index['episode'] = episodes[starts]
+            self.index['start'] = starts
+            self.index['length'] = np.diff(starts, append=len(episodes))
+            self.index.tofile(self.index_path)
+        # Files written before duplicates were rejected resolve to the first segment
+        self._positions = {}
+        for i, episode in enumerate(self.index['episode']):
+            self._positions.setdefault(int(episode), i)
+
+    @classmethod
+    def create(cls, path, signals, data_names):
+        """
+        Create an empty store for groups of signals, e.g. input, output and gain.
+
+        Parameters:
+        path (str): Path of the store file.
+        signals (list): Lists of Signal, one per group.
+        data_names (list): Group names, e.g. ['input', 'output', 'gain'].
+
+        Returns:
+        TrajectoryStore: Opened store.
+        """
+        groups = {name: [{'name': sig.name, 'unit': sig.unit, 'min': _encode_bound(sig.min),
+                          'max': _encode_bound(sig.max), 'symbol': sig.symbol} for sig in group]
+                  for name, group in zip(data_names, signals)}
+        header = json.dumps({'groups': groups}, allow_nan=False).encode('utf-8')
+        with open(path + INDEX_SUFFIX, 'wb'):
+            pass
+        with open(path, 'wb') as file:
+            file.write(MAGIC)
+            file.write(len(header).to_bytes(8, 'little'))
+            file.write(header)
+            file.write(b'\0' * (_aligned(file.tell()) - file.tell()))
+        return cls(path)
+
+    def __len__(self):
+        return (os.path.getsize(self.path) - self.offset) // self.dtype.itemsize
+
+    @property
+    def episodes(self):
+        return np.unique(self.index['episode'])
+
+    def append_episode(self, data, episode=None):
+        """
+        Append one episode of data at the end of the store.
+
+        Parameters:
+        data (list): Per group either a (steps, n_signals) array or a DataFrame
+            with signal names as columns, in the order of the groups.
+        episode (int): Episode number, next free number by default. Numbers
+            already in the store raise ValueError.
+
+        Returns:
+        int: Episode number.
+        """
+        if episode is None:
+            episode = int(self.index['episode'].max()) + 1 if len(self.index) else 0
+        elif int(episode) in self._positions:
+            raise ValueError(f"Episode {episode} is already stored!")
+        episode = int(episode)
+        steps = len(data[0])
+        records = np.zeros(steps, dtype=self.dtype)
+        records['episode'] = episode
+        records['step'] = np.arange(steps)
+        for (group, signals), values in zip(self.groups.items(), data):
+            if len(values) != steps:
+                raise ValueError("All groups must have the same number of steps!")
+            # A DataFrame can only be passed if pandas was imported by the caller
+            if 'pandas' in sys.modules and isinstance(values, sys.modules['pandas'].DataFrame):
+                for sig in signals:
+                    records[group + '/' + sig['name']] = values[sig['name']].to_numpy()
+            else:
+                values = np.asarray(values, dtype=float).reshape(steps, len(signals))
+                for i, sig in enumerate(signals):
+                    records[group + '/' + sig['name']] = values[:, i]
+        entry = np.array([(episode, len(self), steps)], dtype=INDEX_DTYPE)
+        with open(self.path, 'ab') as file:
+            file.write(records.tobytes())
+        with open(self.index_path, 'ab') as file:
+            file.write(entry.tobytes())
+        self.index = np.concatenate((self.index, entry))
+        self._positions[episode] = len(self.index) - 1
+        return episode
+
+    def records(self, columns=None, mode='r'):
+        """
+        Memory-mapped view of all records.
+
+        Parameters:
+        columns (list): Field names ('group/signal name', 'episode', 'step') to keep,
+            all fields by default. Selecting fields does not copy data.
+        mode (str): np.memmap mode, 'r' or 'r+'.
+
+        Returns:
+        numpy.ndarray: Structured array (memmap view).
+        """
+        if len(self) == 0:
+            records = np.zeros(0, dtype=self.dtype)
+        else:
+            records = np.memmap(self.path, dtype=self.dtype, mode=mode, offset=self.offset, shape=(len(self),))
+        if columns is None:
+            return records
+        return records[list(columns)]
+
+    def signals(self, group):
+        """
+        Signal descriptions of a group stored in the header.
+        """
+        from src.model.Model import Signal
+        return [Signal(**dict(sig, min=float(sig['min']), max=float(sig['max']))) for sig in self.groups[group]]
+
+    def signal(self, group, name):
+        """
+        Memory-mapped trace of one signal over all records.
+        """
+        return self.records()[group + '/' + name]
+
+    def episode(self, episode, group=None, as_frame=False):
+        """
+        Records of one episode, optionally only of one group of signals.
+
+        Episodes are stored contiguously, so this is a slice of the memmap
+        at the position kept in the episode index.
+        """
+        position = self._positions.get(episode)
+        if position is None:
+            raise KeyError(f"Episode {episode} not found!")
+        start = int(self.index['start'][position])
+        records = self.records()[start:start + int(self.index['length'][position])]
+        if group is not None:
+            records = records[[group + '/' + sig['name'] for sig in self.groups[group]]]
+        if not as_frame:
+            return records
+        import pandas as pd
+        frame = pd.DataFrame(np.asarray(records))
+        if group is not None:
+            frame.columns = [sig['name'] for sig in self.groups[group]]
+        return frame
+
+
+def _aligned(size):
+    return -(-size // HEADER_ALIGNMENT) * HEADER_ALIGNMENT
@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+from scipy.linalg import solve_discrete_are
+from src.algorithm.DLQR import DLQR
+from src.algorithm.FiniteHorizonLQR import FiniteHorizonLQR
+from src.model.Crane1D import Crane1D
+from src.utils.discretization import zoh_discretize
+
+
+@pytest.fixture
+def crane():
+    return Crane1D()
+
+
+def test_dlqr_gain(crane):
+    """Test the discrete gain against the DARE solution."""
+    dlqr = DLQR(crane.sys.A, crane.sys.B, np.eye(6), np.eye(2), 0.1, crane.output)
+    Ad, Bd = zoh_discretize(crane.sys.A, crane.sys.B, 0.1)
+    P = solve_discrete_are(Ad, Bd, np.eye(6), np.eye(2))
+    K = np.linalg.solve(np.eye(2) + Bd.T @ P @ Bd, Bd.T @ P @ Ad)
+    np.testing.assert_allclose(dlqr.K, K, rtol=1e-8)
+    assert np.max(np.abs(np.linalg.eigvals(Ad - Bd @ dlqr.K))) < 1
+
+
+def test_dlqr_update_uses_cache(crane):
+    """Test that returning to a previous system reuses the cached gain."""
+    dlqr = DLQR(crane.sys.A, crane.sys.B, np.eye(6), np.eye(2), 0.1)
+    K = dlqr.K
+    A, B = crane.sys.A, crane.sys.B
+    crane.update_matrices(sling_length=0.5)
+    dlqr.update_state_matrices(crane.sys.A, crane.sys.B)
+    dlqr.update_state_matrices(A, B)
+    assert dlqr.K is K
+
+
+def test_finite_horizon_converges_to_dlqr(crane):
+    """Test that the first gain of a long horizon equals the infinite-horizon gain."""
+    dlqr = DLQR(crane.sys.A, crane.sys.B, np.eye(6), np.eye(2), 0.1)
+    finite = FiniteHorizonLQR(crane.sys.A, crane.sys.B, np.eye(6), np.eye(2), 0.1, horizon=400)
+    assert finite.K_seq.shape == (400, 2, 6)
+    np.testing.assert_allclose(finite.K_seq[0], dlqr.K, rtol=1e-6, atol=1e-8)
+
+
+def test_finite_horizon_schedule(crane):
+    """Test time-varying gains for a known sling length schedule."""
+    lengths = np.linspace(0.2, 0.8, 20)
+    finite = FiniteHorizonLQR.from_schedule(crane, np.eye(6), np.eye(2), 0.1, {'sling_length': lengths})
+    assert finite.horizon == 20
+    np.testing.assert_array_equal(crane.get_state(), [0, 0, 0, 0, 0.1, 0])
+
+    # Last step only weights the terminal cost
+    crane.update_matrices(sling_length=lengths[-1])
+    Ad, Bd = zoh_discretize(crane.sys.A, crane.sys.B, 0.1)
+    K_last = np.linalg.solve(np.eye(2) + Bd.T @ Bd, Bd.T @ Ad)
+    np.testing.assert_allclose(finite.K_seq[-1], K_last, rtol=1e-8)
+
+    x = np.array([1, 0, 0, 0, 0.5, 0])
+    np.testing.assert_array_equal(finite.control_input(x, k=5), finite.K_seq[5] @ x)
+    np.testing.assert_array_equal(finite.K, finite.K_seq[0])
@@ -0,0 +1,105 @@
+import pytest
+import numpy as np
+from src.algorithm.ExplicitMPC import ExplicitMPC
+from src.algorithm.MPC import MPC
+from src.model.Crane1D import Crane1D
+
+
+LOWER = [0, -0.5, -0.2, -0.5, 0.4, -0.1]
+UPPER = [2, 0.5, 0.2, 0.5, 0.6, 0.1]
+RESOLUTION = [4, 2, 3, 1, 1, 1]
+
+
+@pytest.fixture(scope='module')
+def explicit():
+    crane = Crane1D()
+    crane.update_matrices(sling_length=0.5)
+    mpc = MPC.from_model(crane, np.diag([10, 1, 10, 1, 10, 1]), 0.1 * np.eye(2), 0.05, horizon=10)
+    mpc.reference = np.array([1, 0, 0, 0, 0.5, 0])
+    return ExplicitMPC(mpc, LOWER, UPPER, RESOLUTION, max_workers=0, max_depth=2)
+
+
+def test_law_matches_online_mpc_at_cell_centers(explicit):
+    """At the centers of unsplit cells the tabulated law reproduces the online solution."""
+    mpc = explicit.mpc
+    centers = explicit.cell_centers()
+    assert explicit.feasible.all()
+    unsplit = explicit.split_dim[explicit.roots] < 0
+    assert unsplit.any() and not unsplit.all()
+    for x in centers[unsplit]:
+        mpc.reset()
+        np.testing.assert_allclose(-explicit.control_input(x), mpc.solve(x)[0], atol=1e-3)
+    # Batch evaluation gives the same feedback as single states
+    np.testing.assert_allclose(explicit.control_input(centers),
+                               np.array([explicit.control_input(x) for x in centers]))
+
+
+def test_law_matches_online_mpc_on_random_states(explicit):
+    """On random states the clipped law respects the input bounds and splitting cells reduces the error."""
+    mpc = explicit.mpc
+    states = np.random.default_rng(0).uniform(LOWER, UPPER, (200, 6))
+    expected = []
+    for x in states:
+        mpc.reset()
+        expected.append(mpc.solve(x)[0])
+    u = -explicit.control_input(states)
+    assert np.all(u >= mpc.u_min) and np.all(u <= mpc.u_max)
+    errors = np.max(np.abs(u - expected), axis=1)
+    # Law of the grid cell only, without splits
+    cells = explicit.roots[explicit.cell_index(states)]
+    unsplit = np.clip(np.einsum('nij,nj->ni', explicit.gains[cells], states) + explicit.offsets[cells],
+                      mpc.u_min, mpc.u_max)
+    unsplit_errors = np.max(np.abs(unsplit - expected), axis=1)
+    assert np.median(errors) < 1e-3
+    assert np.percentile(errors, 95) < np.percentile(unsplit_errors, 95)
+
+    bound = explicit.error_bound()
+    assert bound['cells'] == np.count_nonzero(explicit.split_dim < 0) > len(explicit.roots)
+    assert bound['max_abs'] >= np.percentile(errors, 95)
+    assert 0 <= bound['failed'] <= bound['cells']
+
+
+def test_cell_index():
+    """States map to their grid cell, states outside the region to the nearest boundary cell."""
+    laws = {'gains': np.zeros((8, 1, 2)), 'offsets': np.zeros((8, 1)), 'feasible': np.ones(8, bool),
+            'errors': np.zeros(8), 'roots': np.arange(8), 'split_dim': np.full(8, -1),
+            'split_value': np.zeros(8), 'children': np.full((8, 2), -1),
+            'u_min': np.array([-1.0]), 'u_max': np.array([1.0]), 'K': np.zeros((1, 2))}
+    explicit = ExplicitMPC(None, [0, 0], [1, 2], [2, 4], laws=laws)
+    assert explicit.cell_index(np.array([0.25, 0.5])) == 0 * 4 + 1
+    assert explicit.cell_index(np.array([0.75, 1.9])) == 1 * 4 + 3
+    np.testing.assert_array_equal(explicit.cell_index(np.array([[-5, -5], [5, 5]])), [0, 7])
+    np.testing.assert_array_equal(explicit.law_index(np.array([[-5, -5], [5, 5]])), [0, 7])
+
+
+def test_law_index_descends_split_cells():
+    """States of a split cell use the law of the half holding them, the output is clipped."""
+    laws = {'gains': np.zeros((3, 1, 1)), 'offsets': np.array([[0.0], [-5.0], [0.5]]),
+            'feasible': np.ones(3, bool), 'errors': np.array([1.0, 0, 0]), 'roots': np.array([0]),
+            'split_dim': np.array([0, -1, -1]), 'split_value': np.array([0.5, 0, 0]),
+            'children': np.array([[1, 2], [-1, -1], [-1, -1]]),
+            'u_min': np.array([-1.0]), 'u_max': np.array([1.0]), 'K': np.zeros((1, 1))}
+    explicit = ExplicitMPC(None, [0], [1], 1, tol=0.1, laws=laws)
+    np.testing.assert_array_equal(explicit.law_index(np.array([[0.2], [0.7]])), [1, 2])
+    np.testing.assert_allclose(explicit.control_input(np.array([[0.2], [0.7]])), [[1.0], [-0.5]])
+    assert explicit.error_bound() == {'max_abs': 0.0, 'cells': 2, 'failed': 0}
+
+
+def test_save_load_and_parallel_generation(explicit, tmp_path):
+    """Laws generated in worker processes survive a save/load round trip."""
+    parallel = ExplicitMPC(explicit.mpc, LOWER, UPPER, RESOLUTION, max_workers=2, chunksize=5, max_depth=2)
+    np.testing.assert_allclose(parallel.gains, explicit.gains, atol=1e-8)
+    np.testing.assert_array_equal(parallel.children, explicit.children)
+
+    path = tmp_path / 'law.npz'
+    parallel.save(path)
+    loaded = ExplicitMPC.load(path)
+    x = np.array([0.3, 0.1, 0.05, 0, 0.5, 0])
+    np.testing.assert_array_equal(loaded.control_input(x), parallel.control_input(x))
+    assert loaded.error_bound() == parallel.error_bound()
+    with pytest.raises(ValueError):
+        loaded.compute_gains()
+
+
+if __name__ == "__main__":
+    pytest.main()
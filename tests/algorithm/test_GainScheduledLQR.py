@@ -0,0 +1,92 @@
+import pytest
+import numpy as np
+from scipy.linalg import solve_continuous_are
+from src.algorithm.GainScheduledLQR import GainScheduledLQR
+from src.model.Crane1D import Crane1D
+
+
+@pytest.fixture
+def crane():
+    return Crane1D()
+
+
+@pytest.fixture
+def lqr(crane):
+    grid = {'sling_length': np.linspace(0.1, 1, 10),
+            'payload_mass': np.array([1.0, 2.0, 3.0])}
+    return GainScheduledLQR(crane, np.eye(6), np.eye(2), grid, crane.output)
+
+
+def exact_gain(sling_length, payload_mass):
+    crane = Crane1D()
+    crane.update_matrices(payload_mass=payload_mass, sling_length=sling_length)
+    P = solve_continuous_are(crane.sys.A, crane.sys.B, np.eye(6), np.eye(2))
+    return crane.sys.B.T @ P
+
+
+def test_table_shape(lqr):
+    """Test that the gain table covers the whole grid."""
+    assert lqr.K_table.shape == (10, 3, 2, 6)
+    assert lqr.P_table.shape == (10, 3, 6, 6)
+
+
+def test_model_preserved(crane, lqr):
+    """Test that building the table does not change the model."""
+    np.testing.assert_array_equal(crane.get_state(), [0, 0, 0, 0, 0.1, 0])
+    assert crane.get_param('Payload mass') == 2
+
+
+def test_gain_at_grid_point(lqr):
+    """Test that the gain at a grid node equals the exact solution."""
+    lqr.update_schedule(sling_length=0.5, payload_mass=2.0)
+    np.testing.assert_allclose(lqr.K, exact_gain(0.5, 2.0), atol=1e-8)
+
+
+def test_gain_interpolation(lqr):
+    """Test that the interpolated gain stays within the reported error bound."""
+    bound = lqr.error_bound()
+    lqr.update_schedule(sling_length=0.43, payload_mass=1.7)
+    error = np.linalg.norm(lqr.K - exact_gain(0.43, 1.7))
+    assert error <= bound['max_abs'] * 1.5
+    assert bound['max_rel'] < 0.05
+
+
+def test_control_input(lqr):
+    """Test control input calculation."""
+    x = np.array([1, 0, 0.1, 0, 0.5, 0])
+    np.testing.assert_array_equal(lqr.control_input(x), lqr.K @ x)
+
+
+def test_invalid_grid(crane):
+    """Test that a grid with a single point is rejected."""
+    with pytest.raises(ValueError):
+        GainScheduledLQR(crane, np.eye(6), np.eye(2), {'sling_length': [0.5]})
+
+
+def test_control_input_does_not_allocate(lqr):
+    """The feedback written into out allocates no temporary arrays."""
+    import tracemalloc
+    x = np.array([0.5, 0, 0.1, 0, 0.5, 0])
+    out = np.empty(2)
+
+    def loop(steps):
+        for _ in range(steps):
+            lqr.control_input(x, out=out)
+
+    def idle(steps):
+        for _ in range(steps):
+            pass
+
+    def peak(function):
+        function(200)
+        tracemalloc.start()
+        function(10)
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        function(2000)
+        highest = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return highest - baseline
+
+    assert peak(loop) - peak(idle) < 64
+    np.testing.assert_allclose(out, lqr.K @ x)
@@ -83,3 +83,139 @@ def test_create_init_dict(lqr):
     assert isinstance(init_dict, dict), "Output should be a dictionary."
     assert '$K_{s_1}$' in init_dict, "Init dict should contain '$K_{s_1}$'."
     assert len(init_dict) > 0, "Init dict should not be empty."
+
+
+def test_compute_gains_cached(lqr):
+    """Test that solving the same problem twice hits the cache."""
+    K = lqr.K
+    lqr.update_state_matrices(np.array([[0, 0], [0, 1]]), np.array([[1], [1]]))
+    assert lqr.K is K, "Cached gain should be reused."
+    assert lqr.cache.hits == 1
+
+
+def test_cache_tolerance():
+    """Matrices differing by float noise below cache_tol share the cached gain, which is read-only."""
+    A = np.array([[0, 1], [2, -1]], dtype=float)
+    B = np.array([[0], [1]], dtype=float)
+    lqr = LQR(A, B, np.eye(2), np.eye(1), cache_tol=1e-6)
+    K = lqr.K
+    lqr.update_state_matrices(A + 3e-8, B)
+    assert lqr.K is K and lqr.cache.hits == 1
+    lqr.update_state_matrices(A + 1e-3, B)
+    assert lqr.K is not K
+    with pytest.raises(ValueError):
+        lqr.K[0, 0] = 1
+
+
+def test_warm_start_matches_full_solve():
+    """Test that the Newton-Kleinman warm start gives the exact solution."""
+    A = np.array([[0, 1], [2, -1]], dtype=float)
+    B = np.array([[0], [1]], dtype=float)
+    warm = LQR(A, B, np.eye(2), np.eye(1), cache_size=0)
+    full = LQR(A, B, np.eye(2), np.eye(1), cache_size=0, warm_start_tol=0)
+    A_new = A + np.array([[0, 0], [0.05, 0]])
+    warm.update_state_matrices(A_new, B)
+    full.update_state_matrices(A_new, B)
+    np.testing.assert_allclose(warm.P, full.P, rtol=1e-8)
+    np.testing.assert_allclose(warm.K, full.K, rtol=1e-8)
+
+
+def test_cache_eviction():
+    """Test that the cache keeps only the most recent solutions."""
+    B = np.array([[0], [1]], dtype=float)
+    lqr = LQR(np.array([[0, 1], [0, 0]], dtype=float), B, np.eye(2), np.eye(1), cache_size=2)
+    for a in [1.0, 2.0, 3.0]:
+        lqr.update_state_matrices(np.array([[0, 1], [a, 0]]), B)
+    assert len(lqr.cache) == 2
+
+
+def test_closed_loop_step_does_not_allocate():
+    """Test that the steady-state control loop allocates no temporary arrays."""
+    import tracemalloc
+    from src.model.Crane1D import Crane1D
+
+    crane = Crane1D()
+    lqr = LQR(crane.sys.A, crane.sys.B, np.eye(6), np.eye(2), crane.output)
+    desired = np.array([2.0, 0.5])
+    feedback = np.empty(2)
+    control = np.empty(2)
+    output = np.empty(6)
+    u_log, y_log = crane.create_loggers(100)
+
+    def loop(steps, temporary=False):
+        for _ in range(steps):
+            lqr.control_input(crane.state, out=feedback)
+            np.subtract(desired, feedback, out=control)
+            crane.step(control, 0.01, out=output)
+            u_log.log(control)
+            y_log.log(output)
+            if temporary:
+                desired * 2
+
+    def idle(steps, temporary=False):
+        for _ in range(steps):
+            pass
+
+    def peak(function, temporary=False):
+        # Highest traced memory above the start of the loop, freed temporaries included
+        function(200, temporary)
+        tracemalloc.start()
+        function(10, temporary)
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        function(2000, temporary)
+        current, highest = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return current - baseline, highest - baseline
+
+    idle_peak = peak(idle)[1]
+    retained, loop_peak = peak(loop)
+    assert retained < 512, "Control loop should not accumulate allocations."
+    # Interpreter integers of the logger counters stay below one 2-element array
+    assert loop_peak - idle_peak < 160, "Control loop should not allocate temporaries."
+    assert peak(loop, temporary=True)[1] - idle_peak >= 160
+    assert len(y_log) == 100
+
+
+def test_controller_copies_model_matrices():
+    """Controllers keep their own matrices although model.A and model.B are updated in place."""
+    from src.model.Crane1D import Crane1D
+    crane = Crane1D()
+    lqr = LQR(crane.A, crane.B, np.eye(6), np.eye(2))
+    A, K = crane.A.copy(), lqr.K.copy()
+    crane.update_matrices(sling_length=0.8)
+    np.testing.assert_array_equal(lqr.A, A)
+    lqr.update_state_matrices(crane.A, crane.B)
+    crane.update_matrices(sling_length=0.1)
+    assert not np.allclose(lqr.K, K)
+    np.testing.assert_array_equal(lqr.K, LQR(lqr.A, lqr.B, np.eye(6), np.eye(2)).K)
+    assert not np.array_equal(lqr.A, crane.A)
+
+
+def test_compute_gains_batch():
+    """Test batched gains against single solves."""
+    from src.model.Crane1D import Crane1D
+    crane = Crane1D()
+    A, B = [], []
+    for sling_length in np.linspace(0.1, 1, 10):
+        crane.update_matrices(sling_length=sling_length)
+        A.append(crane.sys.A)
+        B.append(crane.sys.B)
+    K, P = LQR.compute_gains_batch(np.array(A), np.array(B), np.eye(6), np.eye(2))
+    assert K.shape == (10, 2, 6)
+    for i in (0, 9):
+        single = LQR(A[i], B[i], np.eye(6), np.eye(2))
+        np.testing.assert_allclose(K[i], single.K, rtol=1e-7, atol=1e-9)
+        np.testing.assert_allclose(P[i], single.P, rtol=1e-7, atol=1e-9)
+
+    gains = LQR.filter_gains_batch(K, crane.output)
+    assert gains.shape == (10, 6)
+    assert gains.columns[0] == '$K_{x}$'
+
+
+def test_compute_gains_batch_matches_fixture_gain():
+    """Test the batched solver on the fixture system mixed with another one."""
+    A = np.array([[[0, 0], [0, 1]], [[1, 1], [0, 1]]], dtype=float)
+    B = np.array([[[1], [1]], [[0], [1]]], dtype=float)
+    K, _ = LQR.compute_gains_batch(A, B, np.eye(2), np.eye(1))
+    np.testing.assert_array_almost_equal(K[0], [[-1.0, 4.2360]], decimal=4)
@@ -0,0 +1,111 @@
+import pytest
+import numpy as np
+from src.algorithm.MPC import MPC, condensed_matrices
+from src.algorithm.FiniteHorizonLQR import FiniteHorizonLQR
+from src.model.Crane1D import Crane1D
+from src.utils.discretization import zoh_discretize
+
+
+@pytest.fixture
+def crane():
+    return Crane1D()
+
+
+def test_unconstrained_matches_finite_horizon_lqr(crane):
+    """Without bounds the first MPC input is the finite-horizon LQR input."""
+    mpc = MPC(crane.A, crane.B, np.eye(6), np.eye(2), 0.1, horizon=20)
+    finite = FiniteHorizonLQR(crane.A, crane.B, np.eye(6), np.eye(2), 0.1, horizon=20)
+    np.testing.assert_allclose(mpc.K, finite.K_seq[0], rtol=1e-6, atol=1e-9)
+    x = np.array([0.5, 0, 0.1, 0, 0.5, 0])
+    np.testing.assert_allclose(mpc.control_input(x), finite.K_seq[0] @ x, rtol=1e-6, atol=1e-9)
+    assert mpc.iterations == 0
+
+
+def test_matrices_are_copied(crane):
+    """Updating the model in place does not change the matrices of the controller."""
+    mpc = MPC(crane.A, crane.B, np.eye(6), np.eye(2), 0.1, horizon=5)
+    A = crane.A.copy()
+    crane.update_matrices(sling_length=0.8)
+    np.testing.assert_array_equal(mpc.A, A)
+
+
+def test_condensed_matrices(crane):
+    """Stacked predictions match stepping the discrete system."""
+    Ad, Bd = zoh_discretize(crane.A, crane.B, 0.1)
+    Sx, Su = condensed_matrices(Ad, Bd, 5)
+    x = np.array([0.5, 0, 0.1, 0, 0.5, 0])
+    U = np.random.default_rng(0).normal(size=(5, 2))
+    expected = []
+    for u in U:
+        x = Ad @ x + Bd @ u
+        expected.append(x)
+    np.testing.assert_allclose(Sx @ np.array([0.5, 0, 0.1, 0, 0.5, 0]) + Su @ U.ravel(), np.ravel(expected))
+
+
+def test_bounds_are_respected(crane):
+    """Inputs stay within the +-2 N limits and predicted states within the signal bounds."""
+    mpc = MPC.from_model(crane, np.diag([10, 1, 10, 1, 10, 1]), 0.1 * np.eye(2), 0.05, horizon=30)
+    mpc.reference = np.array([0.5, 0, 0, 0, 0.5, 0])
+    crane.init_state(np.array([1.5, 0, 0.1, 0, 0.5, 0]))
+    saturated = False
+    for _ in range(200):
+        U = mpc.solve(crane.state)
+        assert mpc.converged
+        assert np.all(np.abs(U) <= 2 + 1e-3)
+        saturated |= np.any(np.abs(U[0]) > 2 - 1e-3)
+        crane.step(U[0], 0.05)
+        assert not crane.violated()
+    assert saturated
+    np.testing.assert_allclose(crane.state, mpc.reference, atol=1e-3)
+
+
+def test_update_state_matrices_uses_cache(crane):
+    """Returning to a previous system reuses its condensed QP data."""
+    mpc = MPC.from_model(crane, np.eye(6), np.eye(2), 0.1)
+    qp = mpc.qp
+    A, B = crane.A.copy(), crane.B.copy()
+    crane.update_matrices(sling_length=0.5)
+    mpc.update_state_matrices(crane.A.copy(), crane.B.copy())
+    assert mpc.qp is not qp
+    mpc.update_state_matrices(A, B)
+    assert mpc.qp is qp
+
+
+def test_incremental_condense_matches_rebuild(crane):
+    """After a change of B only the powers of Ad are reused, the QP data equals a fresh build."""
+    mpc = MPC.from_model(crane, np.eye(6), np.eye(2), 0.1, horizon=10)
+    powers = mpc._powers[1]
+    mpc.update_state_matrices(crane.A, 2 * crane.B)
+    assert mpc._powers[1] is powers
+    crane.update_matrices(sling_length=0.5)
+    mpc.update_state_matrices(crane.A, crane.B)
+    assert mpc._powers[1] is not powers
+    fresh = MPC.from_model(crane, np.eye(6), np.eye(2), 0.1, horizon=10)
+    for name in ('H', 'F', 'W', 'G', 'Sx', 'lower', 'upper', 'K'):
+        np.testing.assert_allclose(mpc.qp[name], fresh.qp[name], rtol=1e-12, atol=1e-14)
+
+
+@pytest.mark.parametrize("horizon", [20, 50])
+def test_iterations_with_active_constraints(crane, horizon):
+    """With saturated inputs and a changing sling length the ADMM converges within a few dozen iterations."""
+    mpc = MPC.from_model(crane, np.diag([10, 1, 10, 1, 10, 1]), 0.01 * np.eye(2), 0.05, horizon=horizon)
+    mpc.reference = np.array([0.5, 0, 0, 0, 0.5, 0])
+    crane.init_state(np.array([1.5, 0, 0.1, 0, 0.5, 0]))
+    iterations = []
+    for k in range(100):
+        if k % 5 == 0:
+            crane.update_matrices(sling_length=0.5 + 0.002 * k)
+            mpc.update_state_matrices(crane.A, crane.B)
+        U = mpc.solve(crane.state)
+        assert mpc.converged
+        iterations.append(mpc.iterations)
+        crane.step(U[0], 0.05)
+    iterations = np.array(iterations)
+    constrained = iterations[iterations > 0]
+    assert len(constrained) >= 20
+    assert np.median(constrained) <= 40
+    assert constrained.max() <= 100
+
+
+if __name__ == "__main__":
+    pytest.main()
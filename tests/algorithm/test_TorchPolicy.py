@@ -0,0 +1,102 @@
+import pytest
+import numpy as np
+torch = pytest.importorskip('torch')
+from src.algorithm.LQR import LQR
+from src.algorithm.TorchPolicy import TorchPolicy, crane_dynamics, rollout
+from src.model.Crane1D import Crane1D
+from src.model.Model import Model
+
+
+@pytest.fixture
+def crane():
+    return Crane1D()
+
+
+@pytest.fixture
+def policy(crane):
+    return TorchPolicy(LQR(crane.A, crane.B, np.eye(6), np.eye(2), crane.output))
+
+
+@pytest.fixture
+def states():
+    rng = np.random.default_rng(0)
+    return np.column_stack((rng.uniform(-0.5, 0.5, 8), np.zeros(8), rng.uniform(-0.1, 0.1, 8),
+                            np.zeros(8), rng.uniform(0.4, 0.6, 8), np.zeros(8)))
+
+
+def test_gain_tensor_shares_memory(policy):
+    """K_tensor wraps the gain array of the LQR without copying."""
+    K = policy.K_tensor
+    assert K.data_ptr() == policy.algorithm.K.ctypes.data
+    assert policy.K_tensor is K
+    policy.algorithm.Q = 2 * np.eye(6)
+    policy.compute_gains()
+    assert policy.K_tensor.data_ptr() == policy.algorithm.K.ctypes.data
+
+
+def test_batch_control_input_matches_lqr(policy, states):
+    """Batched feedback equals K @ x of every state, for tensors and arrays."""
+    expected = states @ policy.algorithm.K.T
+    np.testing.assert_allclose(policy.control_input(torch.from_numpy(states)).numpy(), expected)
+    np.testing.assert_allclose(policy.control_input(states), expected)
+    np.testing.assert_allclose(policy.control_input(states[0]), policy.algorithm.control_input(states[0]))
+    out = np.empty((len(states), 2))
+    assert policy.control_input(states, out=out) is out
+    np.testing.assert_allclose(out, expected)
+
+
+def test_residual_is_added_to_input(policy, states):
+    """The residual policy shifts the applied input u = -K x + residual(x)."""
+    policy.residual = lambda x: torch.ones(len(x), 2, dtype=x.dtype)
+    np.testing.assert_allclose(policy.control_input(states), states @ policy.algorithm.K.T - 1)
+
+
+def test_torch_dynamics_match_numpy(crane):
+    """The torch right-hand side equals Crane1D.dynamics on random states and inputs."""
+    rng = np.random.default_rng(1)
+    states = rng.uniform(-1, 1, (32, 6))
+    states[:, 4] = rng.uniform(0.1, 1, 32)
+    inputs = rng.uniform(-2, 2, (32, 2))
+    crane.set_param('Payload mass', 1.5)
+    derivatives = crane_dynamics(crane)(torch.from_numpy(states), torch.from_numpy(inputs))
+    np.testing.assert_allclose(derivatives.numpy(), crane.dynamics(states, inputs), rtol=1e-12, atol=1e-14)
+
+
+def test_rk4_rollout_requires_crane(crane, policy, states):
+    """The nonlinear rollout rejects models other than Crane1D."""
+    class Linear(Model):
+        def update_matrices(self):
+            pass
+    model = Linear(np.zeros(6))
+    model.input = crane.input
+    with pytest.raises(TypeError):
+        crane_dynamics(model)
+    with pytest.raises(TypeError):
+        rollout(policy, model, torch.from_numpy(states), 1, 0.02)
+
+
+def test_rk4_rollout_matches_nonlinear_simulation(crane, policy, states):
+    """The torch rollout reproduces Crane1D.simulate_nonlinear for the same inputs."""
+    u, x = rollout(policy, crane, torch.from_numpy(states), 50, 0.02, substeps=2)
+    expected = crane.simulate_nonlinear(states, u.numpy(), 0.02, substeps=2)
+    np.testing.assert_allclose(x.numpy(), expected, rtol=1e-9, atol=1e-12)
+    assert np.all(u.numpy() <= crane.input_info.max) and np.all(u.numpy() >= crane.input_info.min)
+
+
+def test_zoh_rollout_matches_simulate_batch(crane, policy, states):
+    """The linear rollout reproduces simulate_batch for the same inputs."""
+    u, x = rollout(policy, crane, torch.from_numpy(states), 50, 0.02, method='zoh')
+    result = crane.simulate_batch(states, u.numpy(), 0.02)
+    outputs = np.stack([result[signal.name] for signal in crane.output], axis=-1).reshape(x.shape)
+    np.testing.assert_allclose(x.numpy(), outputs, rtol=1e-9, atol=1e-12)
+
+
+def test_rollout_is_differentiable(crane, policy, states):
+    """Gradients of an episode cost reach the parameters of the residual policy."""
+    residual = torch.nn.Linear(6, 2, dtype=torch.float64)
+    policy.residual = residual
+    _, x = rollout(policy, crane, torch.from_numpy(states), 20, 0.02)
+    (x[:, -1] ** 2).sum().backward()
+    assert residual.weight.grad is not None
+    with pytest.raises(ValueError):
+        rollout(policy, crane, torch.from_numpy(states), 1, 0.02, method='euler')
@@ -0,0 +1,22 @@
+import pytest
+from benchmarks.bench import compare, run_benchmarks
+
+
+def test_run_benchmarks():
+    """Benchmarks report timings per size of their scaling curve."""
+    results = run_benchmarks(['model_step', 'append_new_values'], min_time=0.001, repeat=1, quick=True)
+    assert set(results) == {'model_step', 'append_new_values[100]'}
+    assert results['model_step']['median'] > 0
+    assert results['append_new_values[100]']['size'] == 100
+
+
+def test_compare_flags_regressions():
+    """Benchmarks slower than the baseline by more than the threshold are flagged."""
+    baseline = {'fast': {'median': 1.0}, 'slow': {'median': 1.0}}
+    results = {'fast': {'median': 1.1}, 'slow': {'median': 1.5}, 'new': {'median': 1.0}}
+    rows = {name: regression for name, _, _, _, regression in compare(results, baseline, threshold=0.2)}
+    assert rows == {'fast': False, 'slow': True}
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,65 @@
+import pytest
+import numpy as np
+from src.model.Crane1D import Crane1D
+from src.environment.ModelEnv import ModelEnv
+from src.environment.VectorModelEnv import VectorModelEnv
+
+
+START = np.array([1, 0, 0, 0, 0.5, 0])
+
+
+@pytest.fixture
+def env():
+    return ModelEnv(Crane1D(), dt=0.1, target=[2, 0, 0, 0, 0.5, 0], max_steps=5)
+
+
+def test_spaces(env):
+    """Test that spaces are derived from the signal bounds."""
+    np.testing.assert_array_equal(env.action_space.low, [-2, -2])
+    np.testing.assert_array_equal(env.action_space.high, [2, 2])
+    assert env.observation_space.shape == (6,)
+    assert env.observation_space.high[0] == 2
+
+
+def test_step_and_truncation(env):
+    """Test stepping until the episode is truncated."""
+    observation, _ = env.reset(options={'state': START})
+    np.testing.assert_array_equal(observation, START)
+    for i in range(5):
+        observation, reward, terminated, truncated, _ = env.step(np.array([0.1, 0]))
+        assert reward < 0
+        assert not terminated
+    assert truncated
+
+
+def test_action_clipped(env):
+    """Test that actions are saturated at the input bounds."""
+    env.reset(options={'state': START})
+    clipped, *_ = env.step(np.array([2, 0]))
+    env.reset(options={'state': START})
+    saturated, *_ = env.step(np.array([10, 0]))
+    np.testing.assert_array_equal(clipped, saturated)
+
+
+def test_vector_env_matches_single(env):
+    """Test that the vectorized environment matches a single environment."""
+    vector = VectorModelEnv(Crane1D(), 3, dt=0.1, target=[2, 0, 0, 0, 0.5, 0], max_steps=5)
+    observations, _ = vector.reset(options={'state': np.tile(START, (3, 1))})
+    env.reset(options={'state': START})
+    actions = np.array([[0.1, 0], [0.1, 0], [0.1, 0]])
+    for _ in range(3):
+        observations, rewards, *_ = vector.step(actions)
+        observation, reward, *_ = env.step(actions[0])
+    np.testing.assert_allclose(observations[1], observation)
+    assert rewards[1] == pytest.approx(reward)
+
+
+def test_vector_env_auto_reset():
+    """Test that terminated instances are reset automatically."""
+    vector = VectorModelEnv(Crane1D(), 2, dt=0.1, max_steps=100)
+    vector.reset(options={'state': [[1.99, 0.9, 0, 0, 0.5, 0], START]})
+    observations, _, terminated, truncated, infos = vector.step(np.array([[2, 0], [0, 0]]))
+    np.testing.assert_array_equal(terminated, [True, False])
+    assert infos['_final_observation'][0]
+    assert infos['final_observation'][0][0] > 2
+    np.testing.assert_array_equal(observations[0], [1.99, 0.9, 0, 0, 0.5, 0])
@@ -43,6 +43,149 @@ def test_simulate(crane):
     np.testing.assert_array_equal(np.round(result, 4), expected_output)
     assert crane.get_state() is not None, "State after simulation is None!"
 
+def test_simulate_zoh_matches_lsim(crane):
+    """Test that the zero-order-hold stepping matches lsim."""
+    reference = Crane1D()
+    u = [1, 0.5]
+    dt = 0.1
+    for _ in range(20):
+        _, output_zoh = crane.simulate(u=u, dt=dt, method='zoh')
+        _, output_lsim = reference.simulate(u=u, dt=dt)
+    np.testing.assert_allclose(crane.get_state(), reference.get_state(), rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(list(output_zoh.values()), list(output_lsim.values()), rtol=1e-6, atol=1e-9)
+
+
+def test_discretize_is_cached(crane):
+    """Test that the discretization is reused until the system changes."""
+    Ad, Bd = crane.discretize(0.1)
+    assert crane.discretize(0.1)[0] is Ad
+    crane.update_matrices(sling_length=0.5)
+    assert crane.discretize(0.1)[0] is not Ad
+
+
+def test_simulate_batch(crane):
+    """Test that batch simulation matches stepping single instances."""
+    rng = np.random.default_rng(0)
+    u = rng.uniform(-1, 1, size=(3, 5, 2))
+    lengths = [0.2, 0.5, 0.8]
+    states, A, B = [], [], []
+    for length in lengths:
+        crane.update_matrices(sling_length=length)
+        states.append(crane.get_state().copy())
+        A.append(crane.sys.A)
+        B.append(crane.sys.B)
+    data = crane.simulate_batch(states, u, dt=0.1, A=np.array(A), B=np.array(B))
+
+    for i, length in enumerate(lengths):
+        single = Crane1D()
+        single.update_matrices(sling_length=length)
+        for k in range(5):
+            _, output = single.simulate(u[i, k], dt=0.1, method='zoh')
+        row = data[(data['instance'] == i) & (data['step'] == 4)][0]
+        np.testing.assert_allclose([row[name] for name in output], list(output.values()), atol=1e-12)
+
+
+def test_simulate_batch_as_frame(crane):
+    """Test the DataFrame output of batch simulation with a shared system."""
+    frame = crane.simulate_batch(np.tile(crane.get_state(), (4, 1)), np.zeros((4, 3, 2)), dt=0.1, as_frame=True)
+    assert frame.shape == (12, 8)
+    assert frame.index.names == ['instance', 'step']
+
+
+def test_dynamics_linearization(crane):
+    """Test that the nonlinear dynamics linearize to the state-space matrices."""
+    crane.update_matrices(sling_length=0.5)
+    x0 = np.array([0, 0, 0, 0, 0.5, 0])
+    u0 = np.zeros(2)
+    eps = 1e-6
+    f0 = crane.dynamics(x0, u0)
+    jacobian_a = np.array([(crane.dynamics(x0 + eps * e, u0) - f0) / eps for e in np.eye(6)]).T
+    jacobian_b = np.array([(crane.dynamics(x0, u0 + eps * e) - f0) / eps for e in np.eye(2)]).T
+    np.testing.assert_allclose(jacobian_a, crane.sys.A, atol=1e-5)
+    np.testing.assert_allclose(jacobian_b, crane.sys.B, atol=1e-5)
+
+
+def test_simulate_nonlinear(crane):
+    """Test fixed-step integration of a batch against an adaptive solver."""
+    from scipy.integrate import solve_ivp
+    x0 = np.array([[0, 0, 0.3, 0, 0.5, 0], [0, 0, -0.1, 0, 0.8, 0]])
+    u = np.tile([0.5, 0.1], (2, 100, 1))
+    reference = solve_ivp(lambda t, x: crane.dynamics(x, u[0, 0]), (0, 1), x0[0], rtol=1e-10, atol=1e-12)
+
+    states = crane.simulate_nonlinear(x0, u, 0.01)
+    assert states.shape == (2, 100, 6)
+    np.testing.assert_allclose(states[0, -1], reference.y[:, -1], atol=1e-5)
+
+    states = crane.simulate_nonlinear(x0, u, 0.01, method='semi_implicit_euler', substeps=10)
+    np.testing.assert_allclose(states[0, -1], reference.y[:, -1], atol=5e-3)
+
+
+def test_simulate_nonlinear_payload_batch(crane):
+    """Test per-instance payload masses."""
+    x0 = np.tile([0, 0, 0.1, 0, 0.5, 0], (2, 1))
+    u = np.zeros((2, 10, 2))
+    states = crane.simulate_nonlinear(x0, u, 0.01, payload_mass=np.array([1.0, 3.0]))
+    single = crane.simulate_nonlinear(x0[:1], u[:1], 0.01, payload_mass=3.0)
+    np.testing.assert_allclose(states[1], single[0])
+
+
+@pytest.mark.parametrize("method, options", [('zoh', {}), ('rk4', {'substeps': 20}), ('solve_ivp', {})])
+def test_simulate_backends_match_lsim(crane, method, options):
+    """Test that every integration backend matches lsim."""
+    reference = Crane1D()
+    crane.set_backend(method, **options)
+    for u in ([1, 0.5], [-0.5, 0.2], [0.3, -0.1]):
+        crane.simulate(u=u, dt=0.1)
+        reference.simulate(u=u, dt=0.1)
+    np.testing.assert_allclose(crane.get_state(), reference.get_state(), rtol=1e-5, atol=1e-7)
+
+
+def test_solve_ivp_backend_continues_across_steps(crane):
+    """Test that time and the adapted step size carry over between control steps."""
+    crane.set_backend('solve_ivp')
+    crane.simulate(u=[1, 0], dt=0.1)
+    step_size = crane.backend.step_size
+    assert step_size is not None
+    crane.simulate(u=[0, 0], dt=0.1)
+    assert crane.backend.t == pytest.approx(0.2)
+    assert crane.backend.solver.t == pytest.approx(0.2)
+
+    crane.set_state(np.array([1, 0, 0, 0, 0.5, 0]))
+    crane.simulate(u=[0, 0], dt=0.1)
+    assert crane.backend.t == pytest.approx(0.1)
+
+
+def test_solve_ivp_dense_output(crane):
+    """Test sampling outputs within a control step."""
+    reference = Crane1D()
+    t_eval = np.linspace(0, 0.1, 11)
+    _, output = crane.simulate(u=[1, 0.5], dt=0.1, method='solve_ivp', t_eval=t_eval)
+    _, expected = reference.simulate(u=[1, 0.5], t=t_eval)
+    assert output.shape == (11, 6)
+    np.testing.assert_allclose(output.to_numpy(), expected.to_numpy(), rtol=1e-5, atol=1e-7)
+    np.testing.assert_allclose(crane.get_state(), reference.get_state(), rtol=1e-5, atol=1e-7)
+    with pytest.raises(ValueError):
+        crane.simulate(u=[1, 0.5], dt=0.1, method='solve_ivp', t_eval=[0.005, 0.5])
+
+
+def test_signal_info_cache_invalidation(crane):
+    """Signal info is reused until the list is assigned or a Signal is modified."""
+    info = crane.input_info
+    assert crane.input_info is info
+    crane.input[0].max = 5
+    assert crane.input_info is not info
+    assert crane.input_info.max[0] == 5
+    crane.output = crane.output[:3]
+    assert len(crane.output_info) == 3
+
+
+@pytest.mark.parametrize("method", ['zoh', 'rk4', 'solve_ivp'])
+def test_simulate_time_vector_rejects_step_methods(crane, method):
+    """Step backends are not silently replaced by lsim for a time vector."""
+    with pytest.raises(ValueError):
+        crane.simulate([1, 0], t=np.linspace(0, 1, 11), method=method)
+
+
 def test_update_matrices(crane):
     """Test if the matrices are updated correctly."""
     crane.update_matrices(payload_mass=3, sling_length=0.8)
@@ -65,6 +208,135 @@ def test_update_matrices(crane):
     np.testing.assert_array_equal(crane.sys.B, expected_b)
 
 
+def test_update_matrices_in_place(crane):
+    """Matrices are updated in place and the StateSpace is only rebuilt after a change."""
+    A, B = crane.A, crane.B
+    sys = crane.sys
+    assert crane.sys is sys
+    crane.update_matrices(payload_mass=3, sling_length=0.8)
+    assert crane.A is A and crane.B is B
+    assert crane.matrices.A is A
+    assert crane.sys is not sys
+    np.testing.assert_array_equal(crane.sys.A, A)
+    np.testing.assert_array_equal(crane.sys.B, B)
+
+
+def test_discretize_follows_matrix_updates(crane):
+    """The discretization cache is invalidated by in-place matrix updates."""
+    Ad, _ = crane.discretize(0.1)
+    crane.update_matrices(sling_length=0.5)
+    Ad_new, _ = crane.discretize(0.1)
+    assert not np.array_equal(Ad, Ad_new)
+
+
+def test_evaluate_matrices_batch(crane):
+    """Batch evaluation of the compiled matrix expressions matches update_matrices."""
+    masses = np.array([1.0, 2.0, 3.0])
+    lengths = np.array([[0.2], [0.5]])
+    A, B, C, D = crane.evaluate_matrices(m_p=masses, l=lengths)
+    assert A.shape == (2, 3, 6, 6) and B.shape == (2, 3, 6, 2) and C.shape == (2, 3, 6, 6)
+    for i, length in enumerate(lengths[:, 0]):
+        for j, mass in enumerate(masses):
+            crane.update_matrices(payload_mass=mass, sling_length=length)
+            np.testing.assert_allclose(A[i, j], crane.A)
+            np.testing.assert_allclose(B[i, j], crane.B)
+
+
+def test_evaluate_matrices_unknown_symbol(crane):
+    """Symbols not used by the matrix expressions are rejected."""
+    with pytest.raises(ValueError):
+        crane.evaluate_matrices(m_x=1.0)
+
+
+def test_param_index(crane):
+    """Parameters are accessible by name and by index."""
+    index = crane.param_index('Payload mass')
+    crane.set_param(index, 4)
+    assert crane.get_param('Payload mass') == 4
+    assert crane.get_param(index) == 4
+    assert crane.get_param(np.int64(index)) == 4
+    crane.set_param(np.int64(index), 3)
+    assert crane.get_param('Payload mass') == 3
+    with pytest.raises(KeyError):
+        crane.get_param('Unknown')
+    with pytest.raises(KeyError):
+        crane.set_param('Unknown', 1)
+
+
+def test_state_violations_batch(crane):
+    """Bound violations are marked per entry and per instance of a batch."""
+    states = np.tile(crane.state, (3, 1))
+    states[1, 0] = -1.0
+    states[2, 4] = 2.0
+    mask = crane.state_violations(states)
+    assert mask.shape == (3, 6)
+    assert mask.sum() == 2 and mask[1, 0] and mask[2, 4]
+    np.testing.assert_array_equal(crane.violated(states), [False, True, True])
+    assert not crane.violated()
+
+
+def test_inputs_are_saturated(crane):
+    """Drive forces beyond the +-2 N limits are clipped in simulate, step and simulate_batch."""
+    reference = Crane1D()
+    inputs, _ = crane.simulate([5, -3], dt=0.1, method='zoh')
+    assert list(inputs.values()) == [2, -2]
+    reference.simulate([2, -2], dt=0.1, method='zoh')
+    np.testing.assert_allclose(crane.state, reference.state)
+
+    crane.step(np.array([10.0, 0.0]), 0.1)
+    reference.step(np.array([2.0, 0.0]), 0.1)
+    np.testing.assert_allclose(crane.state, reference.state)
+
+    data = crane.simulate_batch(crane.state, np.full((1, 3, 2), 4.0), 0.1)
+    np.testing.assert_array_equal(data['Drive force on cart'], 2.0)
+
+    crane.saturate_inputs = False
+    inputs, _ = crane.simulate([5, -3], dt=0.1, method='zoh')
+    assert list(inputs.values()) == [5, -3]
+
+
+@pytest.mark.parametrize('method', ['block', 'fft'])
+def test_simulate_trajectory_matches_steps(crane, method):
+    """Block and FFT trajectory simulation match zero-order-hold steps."""
+    reference = Crane1D()
+    u = np.random.default_rng(0).uniform(-1, 1, (1000, 2))
+    expected = np.empty((len(u), 6))
+    for k in range(len(u)):
+        expected[k] = reference.state
+        reference.step(u[k], 0.01)
+    state = expected[-1]
+
+    y = crane.simulate_trajectory(u, 0.01, method=method, block_size=64)
+    np.testing.assert_allclose(y, expected, atol=1e-9)
+    if method == 'block':
+        np.testing.assert_allclose(crane.state, state, atol=1e-9)
+
+
+def test_simulate_block_matches_lsim(crane):
+    """With a constant input the block method of simulate matches lsim."""
+    reference = Crane1D()
+    t = np.linspace(0, 2, 201)
+    inputs, output = crane.simulate([1, 0.5], t=t, method='block')
+    _, expected = reference.simulate([1, 0.5], t=t)
+    assert list(inputs.columns) == list(crane.input_info.names)
+    np.testing.assert_allclose(output.to_numpy(), expected.to_numpy(), atol=1e-8)
+    np.testing.assert_allclose(crane.state, reference.state, atol=1e-8)
+
+
+@pytest.mark.parametrize("method", ['block', 'fft'])
+def test_simulate_varying_input_is_zero_order_hold(crane, method):
+    """With a varying input block and fft match lsim with zero-order hold (interp=False)."""
+    from scipy.signal import lsim
+    t = np.linspace(0, 1, 11)
+    u = np.column_stack((np.where(t < 0.5, 1.0, -1.0), 0.5 * np.sin(5 * t)))
+    expected = lsim(crane.sys, u, t, X0=crane.state, interp=False)[1]
+    _, output = crane.simulate(u, t=t, method=method)
+    np.testing.assert_allclose(output.to_numpy(), expected, atol=1e-9)
+    if method == 'block':
+        _, interpolated = Crane1D().simulate(u, t=t)
+        assert not np.allclose(output.to_numpy(), interpolated.to_numpy(), atol=1e-3)
+
+
 def test_set_param(crane):
     """Test setting parameter values."""
     crane.set_param('Cart mass', 2)
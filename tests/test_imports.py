@@ -0,0 +1,40 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# Import time budget of the core Model/LQR path in seconds, about twice the measured time
+IMPORT_BUDGET = 1.0
+HEAVY_MODULES = ['pandas', 'matplotlib', 'openpyxl', 'pyarrow', 'scipy.signal', 'scipy.integrate']
+
+
+def run_python(code, *options):
+    return subprocess.run([sys.executable, *options, '-c', code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+
+
+def test_core_path_does_not_import_heavy_modules():
+    """Models, controllers, sweeps and aggregation import heavy dependencies only on first use."""
+    code = ("import sys\n"
+            "import src.model.Crane1D, src.algorithm.LQR, src.algorithm.DLQR, src.utils.sweep, src.utils.aggregation, src.utils.sink\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    assert run_python(code).stdout.strip() == ''
+
+
+def test_core_path_import_time():
+    """Cumulative import time of Crane1D and LQR measured with -X importtime stays in budget."""
+    stderr = run_python("import src.model.Crane1D, src.algorithm.LQR", '-X', 'importtime').stderr
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        # Top-level imports are not indented
+        if not name[1:].startswith(' ') and cumulative.strip().isdigit():
+            total += int(cumulative)
+    assert 0 < total / 1e6 < IMPORT_BUDGET
+
+
+if __name__ == "__main__":
+    pytest.main()
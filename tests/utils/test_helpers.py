@@ -0,0 +1,33 @@
+import numpy as np
+from src.model.Model import Signal
+from src.utils.helpers import SignalInfo, describe_signals, find_signal_info, get_signal_info
+
+
+SIGNALS = [Signal('Cart position', 'm', 0, 2, 'x'),
+           Signal('Sway angle', 'rad', -1, 1, '\\alpha')]
+
+
+def test_signal_info_fields():
+    """Test that the precomputed description matches the signals."""
+    info = SignalInfo.from_signals(SIGNALS)
+    assert info.names == ('Cart position', 'Sway angle')
+    np.testing.assert_array_equal(info.min, [0, -1])
+    np.testing.assert_array_equal(info.max, [2, 1])
+    assert info.index['Sway angle'] == 1
+    assert info.by_symbol('x') is SIGNALS[0]
+    assert info.to_dataframe()['name'].equals(get_signal_info(SIGNALS)['name'])
+
+
+def test_describe_signals():
+    """Test that signal lists are described and descriptions are passed through."""
+    info = describe_signals(SIGNALS)
+    assert info.names == ('Cart position', 'Sway angle')
+    assert describe_signals(info) is info
+
+
+def test_find_signal_info_with_signal_info():
+    """Test lookup through the precomputed description."""
+    info = SignalInfo.from_signals(SIGNALS)
+    assert find_signal_info(info, 'Sway angle', 'unit') == 'rad'
+    assert find_signal_info(info, 'Cart position', 'max') == 2
+    assert find_signal_info(info, 'Unknown', 'unit') is None
@@ -4,7 +4,7 @@ import numpy as np
 import os
 from unittest.mock import patch
 import matplotlib.pyplot as plt
-from src.utils.plots import plot_signals
+from src.utils.plots import plot_signals, decimate_minmax, PlotRenderer
 
 
 # Define the missing find_signal_info function
@@ -126,3 +126,40 @@ def test_find_signal_info(mock_data):
 
     # Test invalid attribute
     assert find_signal_info(signals, 'Signal1', 'invalid_attr') is None
+
+
+def test_plot_signals_closes_figure(mock_data, save_path):
+    """
+    Test that no figure is left open after saving.
+    """
+    data, signals = mock_data
+    plot_signals(data, signals, save_path)
+    assert plt.get_fignums() == [], "Figure should be closed after saving."
+
+
+def test_decimate_minmax_keeps_extremes():
+    """
+    Test that min/max decimation bounds the number of points and keeps peaks.
+    """
+    x = np.arange(100000)
+    y = np.sin(x / 1000.0)
+    y[12345] = 5.0
+    x_dec, y_dec = decimate_minmax(x, y, max_points=200)
+    assert len(y_dec) <= 200
+    assert y_dec.max() == 5.0
+    assert y_dec.min() == y.min()
+    assert np.all(np.diff(x_dec) >= 0)
+
+
+def test_plot_renderer(mock_data, tmp_path):
+    """
+    Test that plots rendered in the background process pool are saved.
+    """
+    data, signals = mock_data
+    paths = [str(tmp_path / f"plot_{i}") for i in range(3)]
+    with PlotRenderer(max_workers=2) as renderer:
+        for path in paths:
+            renderer.submit(data, signals, path)
+    for path in paths:
+        assert os.path.exists(path + ".pdf"), "PDF file was not saved."
+        assert os.path.exists(path + ".jpg"), "JPG file was not saved."
@@ -0,0 +1,69 @@
+import pickle
+import pytest
+import numpy as np
+from src.model.Crane1D import Crane1D
+from src.algorithm.LQR import LQR
+from src.utils.profiling import Profiler
+
+
+def test_profiler_records_stages():
+    """Profiled model and controller record calls per stage."""
+    profiler = Profiler()
+    crane = Crane1D(profiler=profiler)
+    lqr = LQR(crane.A.copy(), crane.B.copy(), np.eye(6), np.eye(2), crane.output, profiler=profiler)
+    input_logger, output_logger = crane.create_loggers(10)
+    for _ in range(5):
+        u = lqr.control_input(crane.state)
+        crane.simulate(u, dt=0.01, method='zoh')
+        output_logger.log(crane.state)
+    crane.update_matrices(sling_length=0.5)
+    lqr.update_state_matrices(crane.A.copy(), crane.B.copy())
+
+    summary = profiler.summary()
+    assert summary.loc['integration', 'Calls'] == 5
+    assert summary.loc['control law', 'Calls'] == 5
+    assert summary.loc['logging', 'Calls'] == 5
+    assert summary.loc['matrix update', 'Calls'] == 1
+    # Initial solve plus one update, the compute_gains call nested in the update is not counted again
+    assert summary.loc['gain computation', 'Calls'] == 2
+    assert (summary['Min [us]'] <= summary['p50 [us]']).all()
+    assert (summary['p95 [us]'] <= summary['Max [us]']).all()
+
+
+def test_disabled_profiler_leaves_methods_unwrapped():
+    """Without a profiler the methods of the class are used directly."""
+    profiler = Profiler()
+    crane = Crane1D(profiler=profiler)
+    assert 'simulate' in vars(crane)
+    crane.set_profiler(None)
+    assert 'simulate' not in vars(crane)
+    crane.simulate([0, 0], dt=0.01)
+    assert 'integration' not in profiler.summary().index
+
+
+def test_profiled_objects_can_be_pickled():
+    """Copies sent to worker processes drop the timed wrappers and the profiler."""
+    profiler = Profiler()
+    crane = Crane1D(profiler=profiler)
+    lqr = LQR(crane.A.copy(), crane.B.copy(), np.eye(6), np.eye(2), crane.output, profiler=profiler)
+    crane_copy, lqr_copy = pickle.loads(pickle.dumps((crane, lqr)))
+    assert crane_copy.profiler is None and 'simulate' not in vars(crane_copy)
+    assert lqr_copy.profiler is None and 'control_input' not in vars(lqr_copy)
+    np.testing.assert_allclose(lqr_copy.control_input(crane_copy.state), lqr.control_input(crane.state))
+    assert 'simulate' in vars(crane)
+    crane_copy.update_matrices(sling_length=0.5)
+    crane.update_matrices(sling_length=0.5)
+    np.testing.assert_allclose(crane_copy.A, crane.A)
+
+
+def test_profiler_time_context():
+    """Blocks timed with the context manager count as one call."""
+    profiler = Profiler()
+    with profiler.time('custom'):
+        sum(range(1000))
+    assert profiler.stages['custom'].calls == 1
+    assert profiler.stages['custom'].total > 0
+
+
+if __name__ == "__main__":
+    pytest.main()
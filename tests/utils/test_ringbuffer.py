@@ -0,0 +1,40 @@
+import pytest
+import numpy as np
+from src.model.Model import Signal
+from src.utils.ringbuffer import RingBufferLogger
+
+
+@pytest.fixture
+def logger():
+    signals = [Signal('Sig1', 'N', 0, 1, 's_1'),
+               Signal('Sig2', 'N', 0, 1, 's_2')]
+    return RingBufferLogger(signals, 3)
+
+
+def test_log_below_capacity(logger):
+    """Test that logged rows are returned in order."""
+    logger.log(np.array([1, 2]))
+    logger.log(np.array([3, 4]))
+    assert len(logger) == 2
+    np.testing.assert_array_equal(logger.to_array(), [[1, 2], [3, 4]])
+
+
+def test_log_wraps_around(logger):
+    """Test that the oldest rows are overwritten once capacity is reached."""
+    for i in range(5):
+        logger.log(np.array([i, -i]))
+    assert len(logger) == 3
+    np.testing.assert_array_equal(logger.to_array()[:, 0], [2, 3, 4])
+
+
+def test_to_dataframe(logger):
+    """Test that columns are named after the signals."""
+    logger.log(np.array([1, 2]))
+    frame = logger.to_dataframe()
+    assert list(frame.columns) == ['Sig1', 'Sig2']
+
+
+def test_invalid_capacity():
+    """Test that zero capacity is rejected."""
+    with pytest.raises(ValueError):
+        RingBufferLogger([], 0)
@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.model.Model import Signal
+from src.utils.sink import StreamingWriter
+
+
+SIGNALS = [Signal('Sig1', 'N', 0, 1, 's_1'),
+           Signal('Sig2', 'm', 0, 1, 's_2')]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'output')
+
+
+def test_rows_flushed_in_chunks(path):
+    """Test that full chunks are written to disk and remaining rows on close."""
+    writer = StreamingWriter(path, SIGNALS, chunk_size=4)
+    for i in range(10):
+        writer.write(np.array([i, -i]))
+    assert writer.rows == 8
+    writer.close()
+    data = np.load(path + '.npy', mmap_mode='r')
+    assert data.shape == (10, 2)
+    np.testing.assert_array_equal(data[:, 0], np.arange(10))
+
+
+def test_write_dict_and_many(path):
+    """Test writing dict rows and blocks of rows."""
+    with StreamingWriter(path, SIGNALS, chunk_size=3) as writer:
+        writer.write({'Sig1': 1, 'Sig2': 2})
+        writer.write_many(np.ones((7, 2)))
+    frame = writer.to_dataframe()
+    assert list(frame.columns) == ['Sig1', 'Sig2']
+    assert len(frame) == 8
+    assert frame.iloc[0, 1] == 2
+
+
+def test_export_csv(path):
+    """Test chunked CSV export."""
+    with StreamingWriter(path, SIGNALS, chunk_size=2) as writer:
+        writer.write_many(np.arange(10).reshape(5, 2))
+    writer.export(('csv',), chunk_size=2)
+    frame = pd.read_csv(path + '.csv', index_col=0)
+    np.testing.assert_array_equal(frame.to_numpy(), np.arange(10).reshape(5, 2))
+
+
+def test_unknown_format(path):
+    """Test that unknown formats are rejected."""
+    with pytest.raises(ValueError):
+        StreamingWriter(path, SIGNALS, file_format='hdf')
+
+
+def test_parquet(path):
+    """Test writing chunks as Parquet row groups."""
+    pytest.importorskip('pyarrow')
+    with StreamingWriter(path, SIGNALS, chunk_size=3, file_format='parquet') as writer:
+        writer.write_many(np.arange(14).reshape(7, 2))
+    np.testing.assert_array_equal(writer.load(), np.arange(14).reshape(7, 2))
+
+
+def test_streamed_plots_are_decimated_from_memmap(path):
+    """Plots of streamed data get min/max decimated traces without loading a DataFrame."""
+    from unittest import mock
+    from src.utils import aggregation
+    from src.utils.plots import MAX_PLOT_POINTS
+    writer = StreamingWriter(path, SIGNALS, chunk_size=1024)
+    rows = np.zeros((50000, 2))
+    rows[12345] = [5, -5]
+    writer.write_many(rows)
+    with mock.patch.object(aggregation, 'plot_signals') as plot, \
+            mock.patch.object(StreamingWriter, 'to_dataframe', side_effect=AssertionError):
+        aggregation.aggregate_streamed_data([writer], [SIGNALS])
+    traces = plot.call_args.kwargs['data']
+    x, y = traces['Sig1']
+    assert len(y) <= MAX_PLOT_POINTS
+    assert y.max() == 5 and 12345 in x
+    assert traces['Sig2'][1].min() == -5
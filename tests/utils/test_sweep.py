@@ -0,0 +1,69 @@
+import numpy as np
+from src.algorithm.LQR import LQR
+from src.model.Crane1D import Crane1D
+from src.utils.sweep import run_sweep, parameter_grid, best_parameters, load_results, closed_loop_episode
+
+
+GRID = {'q': [0.1, 1.0, 10.0], 'r': [0.1, 1.0]}
+
+
+def model_factory():
+    return Crane1D()
+
+
+def controller_factory(model, q, r):
+    return LQR(model.sys.A, model.sys.B, q * np.eye(6), r * np.eye(2))
+
+
+def tracking_cost(inputs, outputs):
+    return float(np.sum((outputs[:, 0] - 1) ** 2) + 0.01 * np.sum(inputs ** 2))
+
+
+def sweep(**kwargs):
+    return list(run_sweep(model_factory, controller_factory, GRID, tracking_cost,
+                          steps=50, dt=0.1, desired=[1, 0], **kwargs))
+
+
+def test_parameter_grid():
+    """Test expansion of the grid into candidates."""
+    candidates = parameter_grid(GRID)
+    assert len(candidates) == 6
+    assert candidates[0] == {'q': 0.1, 'r': 0.1}
+
+
+def test_episode_records_applied_inputs():
+    """Logged inputs are the saturated inputs the model was stepped with."""
+    model = model_factory()
+    inputs, outputs = closed_loop_episode(model, controller_factory(model, 10.0, 0.1), 20, 0.1, desired=[5, 0])
+    assert np.all(inputs <= model.input_info.max) and np.all(inputs >= model.input_info.min)
+    assert np.any(inputs[:, 0] == model.input_info.max[0])
+
+    replay = model_factory()
+    for k, u in enumerate(inputs):
+        replay.step(u, 0.1)
+        np.testing.assert_allclose(replay.state, outputs[k])
+
+
+def test_parallel_matches_serial():
+    """Test that the process pool gives the same costs as a serial run."""
+    serial = dict((tuple(p.items()), c) for p, c in sweep(max_workers=0))
+    parallel = dict((tuple(p.items()), c) for p, c in sweep(max_workers=2, chunksize=2))
+    assert serial.keys() == parallel.keys()
+    for key in serial:
+        assert np.isclose(serial[key], parallel[key])
+
+
+def test_resume(tmp_path):
+    """Test that finished results are reused when the sweep is resumed."""
+    results_path = str(tmp_path / 'sweep.jsonl')
+    first = run_sweep(model_factory, controller_factory, GRID, tracking_cost,
+                      steps=50, dt=0.1, desired=[1, 0], max_workers=0, results_path=results_path)
+    next(first)
+    next(first)
+    first.close()
+    assert len(load_results(results_path)) == 2
+
+    results = sweep(max_workers=0, results_path=results_path)
+    assert len(results) == 6
+    assert len(load_results(results_path)) == 6
+    assert best_parameters(results)[1] == min(c for _, c in results)
@@ -0,0 +1,90 @@
+import pytest
+import numpy as np
+from src.model.Crane1D import Crane1D
+from src.utils.trajectory import TrajectoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    crane = Crane1D()
+    return TrajectoryStore.create(str(tmp_path / 'run.traj'), [crane.input, crane.output], ['input', 'output'])
+
+
+def episode_data(steps, offset=0):
+    u = np.arange(2 * steps, dtype=float).reshape(steps, 2) + offset
+    y = np.arange(6 * steps, dtype=float).reshape(steps, 6) + offset
+    return u, y
+
+
+def test_append_and_reload(store):
+    """Test that appended episodes are readable after reopening the store."""
+    assert store.append_episode(episode_data(5)) == 0
+    assert store.append_episode(episode_data(3, offset=100)) == 1
+    reopened = TrajectoryStore(store.path)
+    assert len(reopened) == 8
+    np.testing.assert_array_equal(reopened.episodes, [0, 1])
+    np.testing.assert_array_equal(reopened.signal('output', 'Cart position')[5:], [100, 106, 112])
+
+
+def test_episode_slice(store):
+    """Test loading a single episode and group."""
+    store.append_episode(episode_data(5))
+    store.append_episode(episode_data(3, offset=100))
+    frame = store.episode(1, group='input', as_frame=True)
+    assert list(frame.columns) == ['Drive force on cart', 'Drive force on payload']
+    np.testing.assert_array_equal(frame.to_numpy(), episode_data(3, offset=100)[0])
+    with pytest.raises(KeyError):
+        store.episode(2)
+
+
+def test_episode_index(store):
+    """Episodes are located through the index file, which is rebuilt if missing."""
+    import os
+    store.append_episode(episode_data(5))
+    store.append_episode(episode_data(3, offset=100))
+    np.testing.assert_array_equal(store.index['start'], [0, 5])
+    np.testing.assert_array_equal(store.index['length'], [5, 3])
+    os.remove(store.index_path)
+    reopened = TrajectoryStore(store.path)
+    np.testing.assert_array_equal(reopened.index, store.index)
+    np.testing.assert_array_equal(reopened.episode(1)['step'], [0, 1, 2])
+    assert reopened.append_episode(episode_data(2)) == 2
+    np.testing.assert_array_equal(TrajectoryStore(store.path).index['start'], [0, 5, 8])
+
+
+def test_duplicate_episode_is_rejected(store):
+    """Appending an existing episode number fails before and after reopening."""
+    store.append_episode(episode_data(3), episode=4)
+    with pytest.raises(ValueError):
+        store.append_episode(episode_data(1), episode=4)
+    reopened = TrajectoryStore(store.path)
+    with pytest.raises(ValueError):
+        reopened.append_episode(episode_data(1), episode=4)
+    assert len(reopened.episode(4)) == 3
+    assert reopened.append_episode(episode_data(2)) == 5
+
+
+def test_columns_are_memory_mapped(store):
+    """Test that selecting columns returns views of the memmap."""
+    store.append_episode(episode_data(4))
+    records = store.records(columns=['step', 'input/Drive force on cart'])
+    assert isinstance(records.base, np.memmap) or isinstance(records, np.memmap)
+    np.testing.assert_array_equal(records['step'], np.arange(4))
+
+
+def test_header_signals(store):
+    """Test that signal metadata is kept in the header."""
+    signals = store.signals('output')
+    assert signals[0].name == 'Cart position'
+    assert signals[3].max == np.inf
+    with open(store.path, 'rb') as file:
+        assert b'Infinity' not in file.read(4096)
+
+
+def test_append_dataframe(store):
+    """Test appending DataFrames as produced by Model.simulate."""
+    crane = Crane1D()
+    t = np.linspace(0, 1, 11)
+    u, y = crane.simulate([1, 0], t=t)
+    store.append_episode([u, y])
+    np.testing.assert_allclose(store.signal('output', 'Cart position'), y['Cart position'])